@@ -0,0 +1,46 @@
+import ipaddress
+import json
+import random
+from datetime import datetime
+from typing import Iterator, List
+
+CLASSIFICATIONS = [
+    "Attempted Information Leak",
+    "Potentially Bad Traffic",
+    "Misc activity",
+    "Attempted Administrator Privilege Gain",
+    "Detection of a Network Scan",
+]
+
+
+class AlertGenerator:
+    """Deterministic generator of IDS alert payloads in the CAQES wire format.
+
+    Each alert gets a distinct source IP so that bans observed by the fake
+    integration servers can be matched back to the alert that caused them.
+    """
+
+    def __init__(self, seed: int = 0, network: str = "10.0.0.0/8"):
+        self.random = random.Random(seed)
+        self._hosts = ipaddress.ip_network(network).hosts()
+
+    def alert(self) -> dict:
+        source_ip = str(next(self._hosts))
+        priority = self.random.choice(["1", "2", "3", "4"])
+        return {
+            "source_ip": source_ip,
+            "source_port": self.random.randint(1024, 65535),
+            "destination_ip": "192.168.1.10",
+            "destination_port": self.random.choice([22, 23, 80, 443, 1883, 8883]),
+            "priority": priority,
+            "timestamp": datetime.now().isoformat(),
+            "classification": self.random.choice(CLASSIFICATIONS),
+            "raw": f"[1:2000000:1] benchmark alert [Priority: {priority}] {source_ip}",
+        }
+
+    def alerts(self, count: int) -> Iterator[dict]:
+        for _ in range(count):
+            yield self.alert()
+
+    def payloads(self, count: int) -> List[bytes]:
+        return [json.dumps(alert).encode() for alert in self.alerts(count)]
@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    server: "FakeIntegrationServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _respond(self, body: dict, status: int = 200) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self.server.delay()
+        self._respond(self.server.route("GET", self.path, {}))
+
+    def do_POST(self):
+        body = self._read_json()
+        self.server.delay()
+        self._respond(self.server.route("POST", self.path, body))
+
+
+class FakeIntegrationServer(ThreadingHTTPServer):
+    """Threaded HTTP server emulating the EMQX and OPNsense APIs used by CAQES.
+
+    Every request is delayed by ``latency`` seconds to model the remote
+    integration. The time at which each address becomes banned is recorded in
+    ``ban_times`` (``time.perf_counter`` clock) for latency accounting.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _FakeHandler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.ban_times: Dict[str, float] = {}
+        self.request_count = 0
+        self._pending_alias: List[str] = []
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def delay(self) -> None:
+        with self.lock:
+            self.request_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def route(self, method: str, path: str, body: dict) -> dict:
+        # EMQX
+        if method == "POST" and path.endswith("/banned"):
+            self._record(body.get("who"))
+            return {}
+        # OPNsense
+        if "/diagnostics/interface/getArp" in path or "/dhcpv4/leases/searchLease" in path:
+            return {"rows": []}
+        if "/firewall/alias/getAliasUUID" in path:
+            return {"uuid": "00000000-0000-0000-0000-000000000000"}
+        if path.endswith("/firewall/alias/set"):
+            with self.lock:
+                self._pending_alias.append(body.get("alias", {}).get("content"))
+            return {"result": "saved"}
+        if path.endswith("/firewall/filter/apply"):
+            with self.lock:
+                pending, self._pending_alias = self._pending_alias, []
+            for content in pending:
+                self._record(content)
+            return {"status": "ok"}
+        return {}
+
+    def _record(self, who: str | None) -> None:
+        if who is None:
+            return
+        now = time.perf_counter()
+        with self.lock:
+            self.ban_times.setdefault(who, now)
+
+    def start(self) -> "FakeIntegrationServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
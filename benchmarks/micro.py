@@ -0,0 +1,140 @@
+"""Micro-benchmarks for the hottest pure-Python paths in the models and policies packages.
+
+Timings are normalised against a fixed pure-Python calibration workload so that
+the stored baseline can be compared across machines. Regenerate the baseline
+after an intentional performance change with:
+
+    PYTHONPATH=src python -m benchmarks.micro --update-baseline
+"""
+import argparse
+import json
+import platform
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from rule_engine import Rule
+
+from caqes_core.models import Alert, Policy, create_adapter
+from caqes_core.policies import PolicyEvaluator
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "micro.json"
+
+ALERT_DATA = {
+    "source_ip": "192.168.1.50",
+    "source_port": 51234,
+    "destination_ip": "192.168.1.10",
+    "destination_port": 1883,
+    "priority": "2",
+    "timestamp": "2025-03-01T12:00:00",
+    "classification": "Attempted Information Leak",
+    "raw": "[1:2000000:1] ET SCAN Potential MQTT scan [Priority: 2] 192.168.1.50:51234 -> 192.168.1.10:1883",
+}
+
+EVE_PAYLOAD = json.dumps({
+    "timestamp": "2025-03-01T12:00:00.000000+0000",
+    "event_type": "alert",
+    "src_ip": "192.168.1.50",
+    "src_port": 51234,
+    "dest_ip": "192.168.1.10",
+    "dest_port": 1883,
+    "proto": "TCP",
+    "alert": {
+        "gid": 1,
+        "signature_id": 2000000,
+        "rev": 1,
+        "signature": "ET SCAN Potential MQTT scan",
+        "category": "Attempted Information Leak",
+        "severity": 2,
+    },
+}).encode()
+
+RULE_TEXT = "destination_port in [1883, 8883] and classification =~ 'Attempted.*' and priority == '2'"
+
+
+def _calibration() -> int:
+    total = 0
+    lookup = {}
+    for i in range(1000):
+        lookup[i] = str(i)
+        total += len(lookup[i])
+    return total
+
+
+def _policy_evaluator(rule_count: int) -> PolicyEvaluator:
+    # Every rule misses so the evaluator has to walk the full rule list
+    rules = [f"destination_port == {70000 + i}" for i in range(rule_count)]
+    return PolicyEvaluator(Policy(name=f"bench-{rule_count}", description="benchmark", rules=rules))
+
+
+def cases() -> Dict[str, Callable[[], object]]:
+    alert = Alert(**ALERT_DATA)
+    evaluators = {count: _policy_evaluator(count) for count in (1, 10, 1000)}
+    caqes, suricata = create_adapter("caqes"), create_adapter("suricata")
+    payload = json.dumps(ALERT_DATA).encode()
+    return {
+        "alert_validate": lambda: Alert(**ALERT_DATA),
+        "alert_decode_caqes": lambda: caqes.decode(payload),
+        "alert_decode_suricata": lambda: suricata.decode(EVE_PAYLOAD),
+        "alert_model_dump": alert.model_dump,
+        "policy_evaluate_1_rule": lambda: evaluators[1].evaluate(alert),
+        "policy_evaluate_10_rules": lambda: evaluators[10].evaluate(alert),
+        "policy_evaluate_1000_rules": lambda: evaluators[1000].evaluate(alert),
+        "rule_compile": lambda: Rule(RULE_TEXT),
+    }
+
+
+def measure(fn: Callable[[], object], repeat: int = 5, min_time: float = 0.05) -> float:
+    """Return the best per-call time in seconds over ``repeat`` runs."""
+    timer = timeit.Timer(fn)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def calibrate() -> float:
+    return measure(_calibration)
+
+
+def run(names: List[str] | None = None) -> Dict[str, Dict[str, float]]:
+    unit = calibrate()
+    results = {}
+    for name, fn in cases().items():
+        if names and name not in names:
+            continue
+        seconds = measure(fn)
+        results[name] = {"seconds": seconds, "relative": seconds / unit}
+    return results
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict:
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="CAQES micro-benchmarks")
+    parser.add_argument("--update-baseline", action="store_true", help=f"write results to {BASELINE_PATH}")
+    parser.add_argument("cases", nargs="*", help="subset of cases to run")
+    args = parser.parse_args(argv)
+
+    results = run(args.cases)
+    baseline = load_baseline().get("cases", {})
+    for name, result in results.items():
+        previous = baseline.get(name, {}).get("relative")
+        change = f"{result['relative'] / previous:6.2f}x baseline" if previous else "no baseline"
+        print(f"{name:<28} {result['seconds'] * 1e6:12.2f} us  {result['relative']:10.3f} units  {change}")
+
+    if args.update_baseline:
+        document = {"python": platform.python_version(), "machine": platform.machine(), "cases": results}
+        BASELINE_PATH.write_text(json.dumps(document, indent=2) + "\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
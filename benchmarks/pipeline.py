@@ -0,0 +1,251 @@
+"""Benchmark harness for the ingest-to-quarantine pipeline.
+
+Drives ``Worker`` instances through the in-process MQTT stand-in with
+generated alerts, against fake EMQX and OPNsense servers with configurable
+latency, and reports throughput, alert-to-ban latency, CPU and RSS as JSON.
+
+    PYTHONPATH=src python -m benchmarks.pipeline --alerts 500 --num-workers 3 --output run.json
+    PYTHONPATH=src python -m benchmarks.pipeline --compare run.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from caqes_core.mq import ClientType
+from caqes_core.mq.memory.memory_client import MemoryBroker, MemoryClient
+from caqes_core.quarantine.quarantine_orchestrator import QuarantineOrchestrator
+from caqes_core.scheduling import PriorityScheduler
+from caqes_core.settings import OrchestratorSettings, SchedulerSettings, WorkerSettings
+from caqes_core.worker import Worker
+
+from .alert_generator import AlertGenerator
+from .fake_servers import FakeIntegrationServer
+
+
+def percentile(values: List[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def current_rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def build_orchestrator(args, emqx: FakeIntegrationServer | None,
+                       opnsense: FakeIntegrationServer | None) -> QuarantineOrchestrator:
+    # N-1 policies that never match followed by a catch-all, so every alert
+    # is evaluated against the full policy set before being quarantined.
+    policies = [
+        {"name": f"bench-{i}", "description": "never matches",
+         "rules": [f"destination_port == {70000 + i}"]}
+        for i in range(max(0, args.policies - 1))
+    ]
+    policies.append({"name": "bench-catch-all", "description": "matches everything", "rules": ["true"]})
+
+    config = {"protocol": [], "network": [], "policies": policies}
+    if emqx:
+        config["protocol"].append({"type": "emqx", "base_url": f"{emqx.url}/api/v5",
+                                   "api_key": "bench", "api_secret": "bench"})
+    if opnsense:
+        config["network"].append({"type": "opnsense", "base_url": opnsense.url,
+                                  "api_key": "bench", "api_secret": "bench"})
+    return QuarantineOrchestrator(settings=OrchestratorSettings(config_dict=config))
+
+
+async def run_benchmark(args) -> Dict:
+    emqx = FakeIntegrationServer(latency=args.emqx_latency_ms / 1000).start() if not args.no_emqx else None
+    opnsense = FakeIntegrationServer(latency=args.opnsense_latency_ms / 1000).start() if not args.no_opnsense else None
+    servers = {name: server for name, server in (("emqx", emqx), ("opnsense", opnsense)) if server}
+
+    broker = MemoryBroker()
+    orchestrator = build_orchestrator(args, emqx, opnsense)
+    scheduler = None
+    if not args.no_scheduler:
+        scheduler_settings = SchedulerSettings()
+        scheduler = PriorityScheduler(
+            orchestrator.quarantine,
+            weights=scheduler_settings.weights,
+            concurrency=scheduler_settings.concurrency,
+            max_queue_size=scheduler_settings.max_queue_size,
+            max_wait=scheduler_settings.max_wait,
+            overdue_every=scheduler_settings.overdue_every
+        )
+        scheduler.start()
+    worker_settings = WorkerSettings(client_type=ClientType.MEMORY, topic=args.topic)
+    workers = []
+    for _ in range(args.num_workers):
+        worker = Worker(settings=worker_settings, orchestrator=orchestrator, scheduler=scheduler)
+        worker.mq = MemoryClient(worker_settings, broker)
+        workers.append(worker)
+
+    worker_tasks = [asyncio.create_task(worker.run()) for worker in workers]
+    # Wait for every worker to connect and subscribe before publishing
+    while not all(worker.mq.subscriptions for worker in workers):
+        await asyncio.sleep(0.01)
+
+    payloads = AlertGenerator(seed=args.seed).payloads(args.alerts)
+    published_at: Dict[str, float] = {}
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    interval = 1 / args.rate if args.rate else 0
+    for payload in payloads:
+        source_ip = json.loads(payload)["source_ip"]
+        published_at[source_ip] = time.perf_counter()
+        broker.publish(args.topic, payload)
+        if interval:
+            await asyncio.sleep(interval)
+        else:
+            # Yield so delivered callbacks interleave with publishing
+            await asyncio.sleep(0)
+
+    deadline = time.perf_counter() + args.timeout
+    while time.perf_counter() < deadline:
+        if all(len(server.ban_times) >= len(published_at) for server in servers.values()):
+            break
+        await asyncio.sleep(0.01)
+    wall_elapsed = time.perf_counter() - wall_start
+    cpu_elapsed = time.process_time() - cpu_start
+
+    for task in worker_tasks:
+        task.cancel()
+    await asyncio.gather(*worker_tasks, return_exceptions=True)
+    if scheduler is not None:
+        await scheduler.stop()
+
+    integrations = {}
+    completion_times = []
+    banned_all = []
+    for source_ip, sent in published_at.items():
+        bans = [server.ban_times.get(source_ip) for server in servers.values()]
+        if bans and all(bans):
+            banned_all.append(max(bans) - sent)
+            completion_times.append(max(bans))
+    for name, server in servers.items():
+        latencies = [server.ban_times[ip] - sent for ip, sent in published_at.items() if ip in server.ban_times]
+        integrations[name] = {
+            "latency_ms": args.emqx_latency_ms if name == "emqx" else args.opnsense_latency_ms,
+            "bans": len(latencies),
+            "requests": server.request_count,
+            "ban_latency_p50_ms": _ms(percentile(latencies, 50)),
+            "ban_latency_p99_ms": _ms(percentile(latencies, 99)),
+        }
+        server.stop()
+
+    drain_time = (max(completion_times) - wall_start) if completion_times else wall_elapsed
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "alerts": args.alerts,
+            "num_workers": args.num_workers,
+            "policies": args.policies,
+            "rate": args.rate,
+            "scheduler": not args.no_scheduler,
+            "emqx_latency_ms": None if args.no_emqx else args.emqx_latency_ms,
+            "opnsense_latency_ms": None if args.no_opnsense else args.opnsense_latency_ms,
+        },
+        "results": {
+            "alerts_published": len(published_at),
+            "alerts_banned": len(banned_all),
+            "alerts_per_sec": round(len(banned_all) / drain_time, 2) if drain_time else None,
+            "ban_latency_p50_ms": _ms(percentile(banned_all, 50)),
+            "ban_latency_p99_ms": _ms(percentile(banned_all, 99)),
+            "wall_seconds": round(wall_elapsed, 3),
+            "cpu_seconds": round(cpu_elapsed, 3),
+            "cpu_utilisation": round(cpu_elapsed / wall_elapsed, 3) if wall_elapsed else None,
+            "rss_bytes": current_rss_bytes(),
+            "peak_rss_bytes": peak_rss_bytes(),
+        },
+        "integrations": integrations,
+    }
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+# Metrics where a larger value is an improvement; all others regress upwards
+HIGHER_IS_BETTER = {"alerts_per_sec"}
+COMPARED_METRICS = ["alerts_per_sec", "ban_latency_p50_ms", "ban_latency_p99_ms", "cpu_seconds", "peak_rss_bytes"]
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return a list of human readable regressions beyond ``tolerance``."""
+    regressions = []
+    for metric in COMPARED_METRICS:
+        new, old = current["results"].get(metric), baseline["results"].get(metric)
+        if not new or not old:
+            continue
+        change = (new - old) / old
+        if metric in HIGHER_IS_BETTER:
+            change = -change
+        if change > tolerance:
+            regressions.append(f"{metric}: {old} -> {new} ({change:+.1%} worse)")
+    return regressions
+
+
+def parse_args(argv: List[str] | None = None):
+    parser = argparse.ArgumentParser(description="CAQES ingest-to-quarantine pipeline benchmark")
+    parser.add_argument("--alerts", type=int, default=500, help="number of alerts to publish")
+    parser.add_argument("--num-workers", type=int, default=1, help="number of Worker instances")
+    parser.add_argument("--policies", type=int, default=1, help="number of policies to evaluate per alert")
+    parser.add_argument("--rate", type=float, default=0, help="publish rate in alerts/sec (0 = as fast as possible)")
+    parser.add_argument("--emqx-latency-ms", type=float, default=5.0, help="fake EMQX response latency")
+    parser.add_argument("--opnsense-latency-ms", type=float, default=20.0, help="fake OPNsense response latency")
+    parser.add_argument("--no-emqx", action="store_true", help="do not configure the EMQX integration")
+    parser.add_argument("--no-opnsense", action="store_true", help="do not configure the OPNsense integration")
+    parser.add_argument("--no-scheduler", action="store_true", help="hand alerts straight to the orchestrator")
+    parser.add_argument("--topic", default="alerts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for outstanding bans")
+    parser.add_argument("--output", help="write the JSON result to this file")
+    parser.add_argument("--compare", help="baseline JSON result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = parse_args(argv)
+    logging.getLogger("caqes").setLevel(logging.WARNING)
+    result = asyncio.run(run_benchmark(args))
+
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Startup-time benchmark.
+
+Each case runs in a fresh interpreter so import caches do not carry over,
+and reports the median wall time together with the heavy third-party
+modules the case ended up importing.
+
+    PYTHONPATH=src python -m benchmarks.startup --repeat 10 --output startup.json
+    PYTHONPATH=src python -m benchmarks.startup --compare startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+SRC = str(Path(__file__).resolve().parent.parent / "src")
+
+HEAVY_MODULES = ("requests", "rule_engine", "paho.mqtt.client", "sqlite3")
+
+CASES = {
+    "import_quarantine": "import caqes_core.quarantine",
+    "import_app": "import caqes_core.app",
+    "create_integration": (
+        "from caqes_core.quarantine import integration_factory\n"
+        "integration_factory.create('protocol', 'emqx', base_url='http://localhost', api_key='', api_secret='')"
+    ),
+    "build_policies": (
+        "from caqes_core.settings import OrchestratorSettings\n"
+        "OrchestratorSettings({'policies': [{'name': 'default', 'description': '', 'rules': ['true']}]}).policies"
+    ),
+}
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+exec({code!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(code: str, repeat: int) -> Dict:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [SRC, os.environ.get("PYTHONPATH")]))}
+    timings, modules = [], []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(code=code, heavy=HEAVY_MODULES)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["seconds"])
+        modules = result["modules"]
+    return {"median_ms": round(statistics.median(timings) * 1000, 2), "heavy_modules": modules}
+
+
+def run(repeat: int) -> Dict:
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "results": {name: measure(code, repeat) for name, code in CASES.items()},
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return a list of human readable regressions beyond ``tolerance``."""
+    regressions = []
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name, {}).get("median_ms")
+        if not old:
+            continue
+        change = (result["median_ms"] - old) / old
+        if change > tolerance:
+            regressions.append(f"{name}: {old}ms -> {result['median_ms']}ms ({change:+.1%} worse)")
+    return regressions
+
+
+def parse_args(argv: List[str] | None = None):
+    parser = argparse.ArgumentParser(description="CAQES startup-time benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per case")
+    parser.add_argument("--output", help="write the JSON result to this file")
+    parser.add_argument("--compare", help="baseline JSON result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = parse_args(argv)
+    result = run(args.repeat)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+    if args.compare:
+        regressions = compare(result, json.loads(Path(args.compare).read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3 @@
+from .alert_aggregator import AlertAggregator, WindowStats
+
+__all__ = ['AlertAggregator', 'WindowStats']
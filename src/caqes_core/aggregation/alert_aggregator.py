@@ -0,0 +1,149 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set
+
+from caqes_core.models import Alert
+from caqes_core.models.ip_address import Address, ip_key
+
+
+@dataclass(frozen=True)
+class WindowStats:
+    """Aggregated view of the alerts seen from one source within the window."""
+    count: int
+    distinct_destination_ports: int
+    distinct_classifications: int
+
+    @classmethod
+    def single(cls) -> "WindowStats":
+        """Stats for an alert considered on its own, used when aggregation is disabled."""
+        return cls(count=1, distinct_destination_ports=1, distinct_classifications=1)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "count": self.count,
+            "distinct_destination_ports": self.distinct_destination_ports,
+            "distinct_classifications": self.distinct_classifications,
+        }
+
+
+class _SourceWindow:
+    """Fixed-size ring of time buckets for a single source.
+
+    A bucket's sets are only allocated once an alert lands in it, most
+    sources alert in a few buckets and never fill the ring.
+    """
+
+    __slots__ = ("epochs", "counts", "ports", "classifications", "last_epoch")
+
+    def __init__(self, size: int):
+        self.epochs: List[int] = [-1] * size
+        self.counts: List[int] = [0] * size
+        self.ports: List[Optional[Set[int]]] = [None] * size
+        self.classifications: List[Optional[Set[str]]] = [None] * size
+        self.last_epoch = -1
+
+    def add(self, epoch: int, port: int, classification: str) -> None:
+        slot = epoch % len(self.epochs)
+        ports = self.ports[slot]
+        classifications = self.classifications[slot]
+        if ports is None:
+            ports = self.ports[slot] = set()
+            classifications = self.classifications[slot] = set()
+        if self.epochs[slot] != epoch:
+            # Slot holds an expired bucket, recycle it in place
+            self.epochs[slot] = epoch
+            self.counts[slot] = 0
+            ports.clear()
+            classifications.clear()
+        self.counts[slot] += 1
+        ports.add(port)
+        classifications.add(classification)
+        self.last_epoch = epoch
+
+    def stats(self, epoch: int) -> WindowStats:
+        oldest = epoch - len(self.epochs)
+        count = 0
+        ports: Set[int] = set()
+        classifications: Set[str] = set()
+        for slot, slot_epoch in enumerate(self.epochs):
+            if oldest < slot_epoch <= epoch:
+                count += self.counts[slot]
+                ports |= self.ports[slot]
+                classifications |= self.classifications[slot]
+        return WindowStats(count, len(ports), len(classifications))
+
+
+class AlertAggregator:
+    """Per-source-IP sliding-window counters with automatic eviction.
+
+    Each source owns a ring of ``window_seconds / bucket_seconds`` buckets, so
+    memory per source is bounded regardless of alert volume. Sources are kept
+    in LRU order; idle sources are swept once their newest bucket leaves the
+    window and the least recently seen source is dropped beyond ``max_sources``.
+    """
+
+    SWEEP_EVERY = 1024
+
+    def __init__(self, window_seconds: float = 60.0, bucket_seconds: float = 1.0,
+                 max_sources: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.logger = logging.getLogger("caqes.aggregation")
+        self.clock = clock
+        self.bucket_seconds = bucket_seconds
+        self.max_sources = max_sources
+        self.size = max(1, math.ceil(window_seconds / bucket_seconds))
+        # Keyed by ip_key, as ints hash much faster than address objects
+        self._windows: "OrderedDict[int, _SourceWindow]" = OrderedDict()
+        self._observed = 0
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def _epoch(self) -> int:
+        return int(self.clock() // self.bucket_seconds)
+
+    def observe(self, alert: Alert) -> WindowStats:
+        """Record an alert and return the window stats for its source, including it."""
+        epoch = self._epoch()
+        key = ip_key(alert.source_ip)
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = _SourceWindow(self.size)
+        else:
+            self._windows.move_to_end(key)
+        window.add(epoch, alert.destination_port, alert.classification)
+
+        self._observed += 1
+        if len(self._windows) > self.max_sources:
+            self._windows.popitem(last=False)
+        if self._observed % self.SWEEP_EVERY == 0:
+            self.sweep(epoch)
+
+        return window.stats(epoch)
+
+    def stats(self, alert: Alert) -> WindowStats:
+        """Return the current window stats for an alert's source without recording it."""
+        window = self._windows.get(ip_key(alert.source_ip))
+        if window is None:
+            return WindowStats(0, 0, 0)
+        return window.stats(self._epoch())
+
+    def reset(self, source: Address) -> None:
+        self._windows.pop(ip_key(source), None)
+
+    def sweep(self, epoch: int | None = None) -> int:
+        """Evict sources whose newest bucket has left the window, returns the eviction count."""
+        epoch = self._epoch() if epoch is None else epoch
+        evicted = 0
+        # LRU order means the idle sources are always at the front
+        while self._windows:
+            key, window = next(iter(self._windows.items()))
+            if window.last_epoch > epoch - self.size:
+                break
+            del self._windows[key]
+            evicted += 1
+        if evicted:
+            self.logger.debug(f"Evicted {evicted} idle sources from aggregation window")
+        return evicted
@@ -0,0 +1,4 @@
+from .cidr_trie import CidrTrie
+from .allowlist import Allowlist
+
+__all__ = ['CidrTrie', 'Allowlist']
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import os
+import re
+from typing import Iterable, Optional, Set, Tuple
+
+import yaml
+
+from .cidr_trie import Address, CidrTrie
+
+MAC_PATTERN = re.compile(r"[0-9a-f]{2}(:[0-9a-f]{2}){5}")
+
+
+class Allowlist:
+    """Protected addresses and MACs that must never be quarantined.
+
+    Networks are compiled into a CidrTrie and MACs into a set. Entries from
+    the configuration are merged with those of an optional YAML ``path``
+    holding ``networks`` and ``macs`` lists, which is reloaded whenever its
+    modification time changes. A reload builds new indexes and swaps them in
+    whole, so a lookup never sees a partially loaded allowlist, and an
+    invalid file, whatever is wrong with it, leaves the previous allowlist in
+    place.
+    """
+
+    def __init__(self, networks: Iterable[str] = (), macs: Iterable[str] = (),
+                 path: Optional[str] = None, reload_interval: float = 10.0):
+        self.logger = logging.getLogger("caqes.allowlist")
+        self.networks = list(networks)
+        self.macs = list(macs)
+        self.path = path
+        self.reload_interval = reload_interval
+        self._trie, self._macs = self._compile(self.networks, self.macs)
+        self._mtime: float | None = None
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._trie) + len(self._macs)
+
+    def _compile(self, networks: Iterable[str], macs: Iterable[str]) -> Tuple[CidrTrie, Set[str]]:
+        trie = CidrTrie()
+        for network in networks:
+            trie.insert(str(network))
+        normalised = set()
+        for entry in macs:
+            mac = str(entry).lower().replace("-", ":")
+            if not MAC_PATTERN.fullmatch(mac):
+                # YAML reads an unquoted MAC of digits only as a base 60 integer
+                raise ValueError(f"Invalid MAC address {entry!r}, MAC addresses must be quoted")
+            normalised.add(mac)
+        return trie, normalised
+
+    def protected(self, ip: Address, mac: Optional[str] = None) -> Optional[str]:
+        """Return the allowlist entry covering the address or MAC, None if it may be banned."""
+        if mac and mac.lower().replace("-", ":") in self._macs:
+            return mac.lower()
+        return self._trie.match(ip)
+
+    def reload(self) -> bool:
+        """Reload the allowlist file if it changed, returns whether new entries were loaded."""
+        if not self.path:
+            return False
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if mtime == self._mtime:
+                return False
+            with open(self.path) as f:
+                data = yaml.safe_load(f) or {}
+            if not isinstance(data, dict):
+                raise ValueError("allowlist file must be a mapping with networks and macs lists")
+            trie, macs = self._compile(
+                self.networks + list(data.get("networks") or []),
+                self.macs + list(data.get("macs") or [])
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to load allowlist {self.path}, keeping the previous one")
+            self.logger.debug(f"Allowlist error details: {str(e)}")
+            return False
+        self._trie, self._macs, self._mtime = trie, macs, mtime
+        self.logger.info(f"Loaded allowlist with {len(trie)} networks and {len(macs)} MACs")
+        return True
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await asyncio.to_thread(self.reload)
+            except Exception as e:
+                self.logger.error("Allowlist reload failed")
+                self.logger.debug(f"Allowlist error details: {str(e)}")
+
+    def start(self) -> None:
+        self.reload()
+        if self.path and self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
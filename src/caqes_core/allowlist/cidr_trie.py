@@ -0,0 +1,67 @@
+import ipaddress
+from typing import Optional, Union
+
+Address = Union[str, ipaddress.IPv4Address, ipaddress.IPv6Address]
+Network = Union[str, ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+# Node layout: [child for bit 0, child for bit 1, label of the prefix ending here]
+_ZERO, _ONE, _LABEL = 0, 1, 2
+
+
+def _normalise(address: Address) -> Union[ipaddress.IPv4Address, ipaddress.IPv6Address]:
+    if isinstance(address, str):
+        address = ipaddress.ip_address(address)
+    # Match IPv4-mapped IPv6 addresses such as ::ffff:10.0.0.1 against IPv4 prefixes
+    if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+        return address.ipv4_mapped
+    return address
+
+
+class CidrTrie:
+    """Binary radix trie of IPv4 and IPv6 prefixes.
+
+    A lookup walks at most one node per prefix bit, so its cost depends on
+    the longest stored prefix rather than on the number of prefixes.
+    """
+
+    def __init__(self):
+        self._roots = {4: [None, None, None], 6: [None, None, None]}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, network: Network, label: Optional[str] = None) -> None:
+        network = ipaddress.ip_network(network, strict=False)
+        if isinstance(network, ipaddress.IPv6Network) and network.network_address.ipv4_mapped and network.prefixlen >= 96:
+            network = ipaddress.ip_network(f"{network.network_address.ipv4_mapped}/{network.prefixlen - 96}")
+        node = self._roots[network.version]
+        bits = int(network.network_address)
+        width = network.max_prefixlen
+        for depth in range(network.prefixlen):
+            bit = (bits >> (width - 1 - depth)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, None]
+            node = node[bit]
+        if node[_LABEL] is None:
+            self._size += 1
+        node[_LABEL] = label or str(network)
+
+    def match(self, address: Address) -> Optional[str]:
+        """Return the label of the shortest stored prefix containing ``address``."""
+        address = _normalise(address)
+        node = self._roots[address.version]
+        bits = int(address)
+        width = address.max_prefixlen
+        for depth in range(width + 1):
+            if node[_LABEL] is not None:
+                return node[_LABEL]
+            if depth == width:
+                return None
+            node = node[(bits >> (width - 1 - depth)) & 1]
+            if node is None:
+                return None
+        return None
+
+    def __contains__(self, address: Address) -> bool:
+        return self.match(address) is not None
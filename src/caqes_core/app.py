@@ -1,13 +1,100 @@
 import asyncio
 import logging
 import os
+import signal
+from typing import List, Optional
 
 from caqes_core.worker import Worker
+from caqes_core.budget import MemoryBudget
+from caqes_core.dead_letter import DeadLetterQueue, FileSink, SinkType, TopicSink
+from caqes_core.health import HealthServer
+from caqes_core.profiling import Profiler, stage_timings
 from caqes_core.quarantine.quarantine_orchestrator import QuarantineOrchestrator
+from caqes_core.scheduling import PriorityScheduler, TopicPipeline
 from caqes_core.loggers.audit_logger import init_logger
+from caqes_core.mq.client_factory import ClientFactory as MqClientFactory
 from caqes_core.settings.config import ConfigManager
 
 
+def build_dead_letters(config: ConfigManager) -> DeadLetterQueue | None:
+    settings = config.dead_letter_settings
+    if settings.type is None:
+        return None
+    if settings.type == SinkType.MQTT:
+        worker_settings = config.worker_settings
+        sink = TopicSink(MqClientFactory.create(worker_settings.client_type, worker_settings), settings.topic)
+    else:
+        sink = FileSink(settings.path, max_bytes=settings.max_bytes, backup_count=settings.backup_count)
+    return DeadLetterQueue(
+        sink,
+        rate=settings.rate,
+        burst=settings.burst,
+        max_payload=settings.max_payload,
+        flush_interval=settings.flush_interval,
+        log_interval=settings.log_interval
+    )
+
+
+def track_live_counts(budget: MemoryBudget, workers: List[Worker], pipelines: List[TopicPipeline],
+                      orchestrator: QuarantineOrchestrator) -> None:
+    # Pipelines may share a scheduler, whose alerts are counted once
+    queues = list({id(pipeline.scheduler if pipeline.scheduler is not None else pipeline): pipeline
+                   for pipeline in pipelines}.values())
+    budget.track("messages_pending", lambda: sum(len(worker.mq.pending) for worker in workers if worker.mq), backlog=True)
+    budget.track("alerts_pending", lambda: sum(pipeline.pending for pipeline in queues), backlog=True)
+    budget.track("bans_in_flight", lambda: orchestrator.in_flight, backlog=True)
+    budget.track("tasks", lambda: len(asyncio.all_tasks()))
+
+
+async def shutdown(workers: List[Worker], pipelines: List[TopicPipeline], orchestrator: QuarantineOrchestrator,
+                   timeout: float, scheduler: Optional[PriorityScheduler] = None,
+                   health: Optional[HealthServer] = None, dead_letters: Optional[DeadLetterQueue] = None,
+                   profiler: Optional[Profiler] = None, memory_budget: Optional[MemoryBudget] = None) -> bool:
+    """Stop consuming, let the alerts already received be quarantined within ``timeout`` seconds, then close everything.
+
+    Work left when the deadline expires is abandoned. Returns whether everything was drained in time.
+    """
+    logger = logging.getLogger("caqes")
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    def remaining() -> float:
+        return max(0.0, deadline - loop.time())
+
+    drained = True
+    try:
+        await asyncio.wait_for(asyncio.gather(*(worker.stop_consuming() for worker in workers)), remaining())
+    except asyncio.TimeoutError:
+        drained = False
+    for pipeline in pipelines:
+        drained = await pipeline.drain(remaining()) and drained
+    drained = await orchestrator.drain(remaining()) and drained
+    if drained:
+        logger.info("Drained in-flight quarantine work")
+    else:
+        logger.warning(f"Shutdown deadline of {timeout}s expired, abandoning {orchestrator.in_flight} bans in flight")
+
+    for pipeline in pipelines:
+        await pipeline.stop()
+    if scheduler is not None:
+        await scheduler.stop()
+    # Applies staged firewall changes and flushes the decision log before closing the HTTP pools
+    await orchestrator.stop()
+    if health:
+        await health.stop()
+    if dead_letters is not None:
+        await dead_letters.stop()
+    if memory_budget is not None:
+        await memory_budget.stop()
+    if profiler is not None:
+        # Writes what a running window has collected so far
+        await profiler.stop()
+    # Closes the message queue connections
+    for worker in workers:
+        worker.stop()
+    return drained
+
+
 class CAQES:
     @classmethod
     async def start(cls):
@@ -17,15 +104,87 @@ class CAQES:
         logger.info(f"Using config from {config_path}")
         
         config = ConfigManager(config_path=config_path)
-        orchestrator = QuarantineOrchestrator(settings=config.orchestrator_settings)
+        profiling = config.profiling_settings
+        stage_timings.enabled = profiling.stage_timings
+        profiler = None
+        if profiling.endpoint or profiling.startup_window:
+            profiler = Profiler(profiling.output_dir, interval=profiling.sample_interval,
+                                max_duration=profiling.max_duration)
+        if profiling.startup_window:
+            profiler.start(profiling.mode, profiling.startup_window)
+        dead_letters = build_dead_letters(config)
+        if dead_letters is not None:
+            await dead_letters.start()
+        orchestrator = QuarantineOrchestrator(settings=config.orchestrator_settings, dead_letters=dead_letters)
+        await orchestrator.start()
+
+        scheduler = None
+        scheduler_settings = config.scheduler_settings
+        if scheduler_settings.enabled:
+            scheduler = PriorityScheduler(
+                orchestrator.quarantine,
+                weights=scheduler_settings.weights,
+                concurrency=scheduler_settings.concurrency,
+                max_queue_size=scheduler_settings.max_queue_size,
+                max_wait=scheduler_settings.max_wait,
+                overdue_every=scheduler_settings.overdue_every
+            )
+            scheduler.start()
+
+        # Shared by every worker, so each subscription's concurrency budget is global
+        pipelines = config.worker_settings.pipelines(orchestrator, scheduler, scheduler_settings)
+        for pipeline in pipelines:
+            pipeline.start()
+
+        memory_budget = config.memory_settings.budget()
+        if config.memory_settings.enabled and memory_budget is None:
+            logger.warning("Memory budget enabled without limit_mb outside a memory-limited container, not shedding")
 
         logger.info(f"Starting CAQES with {config.num_workers} workers")
         workers = [
-            Worker(settings=config.worker_settings, orchestrator=orchestrator)
+            Worker(settings=config.worker_settings, orchestrator=orchestrator, scheduler=scheduler,
+                   dead_letters=dead_letters, pipelines=pipelines, memory_budget=memory_budget)
             for _ in range(config.num_workers)
         ]
-        tasks = [worker.run() for worker in workers]
-        await asyncio.gather(*tasks)
+        if memory_budget is not None:
+            track_live_counts(memory_budget, workers, pipelines, orchestrator)
+            memory_budget.start(trace=config.memory_settings.trace)
+        health = None
+        health_settings = config.health_settings
+        if health_settings.enabled:
+            health = HealthServer(
+                orchestrator,
+                workers,
+                scheduler=scheduler,
+                host=health_settings.host,
+                port=health_settings.port,
+                probe_interval=health_settings.probe_interval,
+                probe_timeout=health_settings.probe_timeout,
+                profiler=profiler if profiling.endpoint else None,
+                memory_budget=memory_budget
+            )
+            await health.start()
+
+        stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, stopping.set)
+        try:
+            async with asyncio.TaskGroup() as group:
+                runs = {group.create_task(worker.run()): worker for worker in workers}
+                stop_requested = group.create_task(stopping.wait())
+                # Runs return early only if their worker failed, which stops the whole app rather than running short-handed
+                done, _ = await asyncio.wait([stop_requested, *runs], return_when=asyncio.FIRST_COMPLETED)
+                for run in done - {stop_requested}:
+                    logger.error(f"Worker {runs[run].worker_id} stopped unexpectedly")
+                stopping.set()
+                logger.info("Shutting down CAQES")
+                await shutdown(workers, pipelines, orchestrator, config.shutdown_timeout,
+                               scheduler=scheduler, health=health, dead_letters=dead_letters, profiler=profiler,
+                               memory_budget=memory_budget)
+        finally:
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                loop.remove_signal_handler(signum)
 
 
 def main():
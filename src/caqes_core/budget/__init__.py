@@ -0,0 +1,3 @@
+from .memory_budget import MemoryBudget, container_memory_limit, current_rss_bytes
+
+__all__ = ['MemoryBudget', 'container_memory_limit', 'current_rss_bytes']
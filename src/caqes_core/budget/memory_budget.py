@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import os
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Set
+
+# cgroup v2, then v1, memory limit of the container CAQES runs in
+CGROUP_LIMIT_FILES = ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes")
+# cgroup v1 reports no limit as a huge page-aligned number
+UNLIMITED = 2 ** 60
+MIB = 1024 * 1024
+
+
+def current_rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def container_memory_limit() -> Optional[int]:
+    """Memory limit of the container in bytes, None outside a container or without a limit."""
+    for path in CGROUP_LIMIT_FILES:
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        if value == "max":
+            return None
+        try:
+            limit = int(value)
+        except ValueError:
+            continue
+        return limit if limit < UNLIMITED else None
+    return None
+
+
+class MemoryBudget:
+    """Keeps the process inside a memory budget by shedding alerts while it is exceeded.
+
+    RSS is sampled every ``interval`` seconds. Above ``limit`` bytes the
+    budget is exceeded and workers drop incoming alerts before decoding them,
+    until RSS is back under ``resume_ratio`` of the limit. The allocator does
+    not always hand freed memory back, so shedding also stops once every
+    backlog source registered with ``track`` is down to zero, or after
+    ``max_shed_seconds`` at most. RSS at that point becomes the floor it must
+    grow from, by the same hysteresis, before alerts are shed again. Shedding
+    is only counted, and logged when it starts and stops. Live counts of
+    messages, alerts and tasks come from the sources registered with
+    ``track``, and ``snapshot`` reports the top tracemalloc allocation sites
+    along with their growth since the previous snapshot, to spot leaks.
+    """
+
+    def __init__(self, limit: int, resume_ratio: float = 0.9, interval: float = 1.0,
+                 max_shed_seconds: Optional[float] = 300.0, trace_frames: int = 5, snapshot_top: int = 20,
+                 rss: Callable[[], Optional[int]] = current_rss_bytes, clock: Callable[[], float] = time.monotonic):
+        self.logger = logging.getLogger("caqes.memory")
+        self.limit = limit
+        self.resume_ratio = resume_ratio
+        self.interval = interval
+        self.max_shed_seconds = max_shed_seconds
+        self.trace_frames = trace_frames
+        self.snapshot_top = snapshot_top
+        self.rss = rss
+        self.clock = clock
+        self.exceeded = False
+        self.shed = 0
+        self.last_rss: Optional[int] = None
+        # RSS held when shedding last stopped without memory being released
+        self.floor: Optional[int] = None
+        self._shed_before = 0
+        self._shed_since = 0.0
+        self._sources: Dict[str, Callable[[], int]] = {}
+        self._backlog: Set[str] = set()
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._task: asyncio.Task | None = None
+
+    def track(self, name: str, count: Callable[[], int], backlog: bool = False) -> None:
+        """Report ``count()`` as the live count of ``name`` in status().
+
+        A ``backlog`` count is work shedding makes room for, once they are all
+        zero there is nothing left to shed for.
+        """
+        self._sources[name] = count
+        if backlog:
+            self._backlog.add(name)
+
+    def counts(self) -> Dict[str, int]:
+        counts = {}
+        for name, count in self._sources.items():
+            try:
+                counts[name] = count()
+            except Exception as e:
+                self.logger.debug(f"Failed to count {name}: {str(e)}")
+        return counts
+
+    def admit(self) -> bool:
+        """Whether an incoming alert may be processed, counting it as shed if not."""
+        if self.exceeded:
+            self.shed += 1
+            return False
+        return True
+
+    def check(self) -> bool:
+        """Sample RSS and update whether the budget is exceeded, returns the new state."""
+        rss = self.rss()
+        if rss is None:
+            return self.exceeded
+        self.last_rss = rss
+        resume_below = self.limit * self.resume_ratio
+        if rss < resume_below:
+            self.floor = None
+        shed_above = self.limit if self.floor is None else max(self.limit, self.floor / self.resume_ratio)
+        if not self.exceeded and rss > shed_above:
+            self.exceeded = True
+            self._shed_before = self.shed
+            self._shed_since = self.clock()
+            self.logger.warning(
+                f"Memory budget exceeded, RSS {rss / MIB:.0f} MiB of {self.limit / MIB:.0f} MiB, shedding alerts. "
+                f"Live counts: {self.counts()}")
+        elif self.exceeded:
+            if rss < resume_below:
+                self._resume(f"Memory back within budget, RSS {rss / MIB:.0f} MiB")
+            elif self._drained():
+                self.floor = rss
+                self._resume(f"Backlog drained with RSS still at {rss / MIB:.0f} MiB, accepting alerts again")
+            elif self.max_shed_seconds is not None and self.clock() - self._shed_since >= self.max_shed_seconds:
+                self.floor = rss
+                self._resume(f"Shed alerts for {self.max_shed_seconds:.0f}s with RSS at {rss / MIB:.0f} MiB, "
+                             f"accepting alerts again. Live counts: {self.counts()}")
+        return self.exceeded
+
+    def _drained(self) -> bool:
+        if not self._backlog:
+            return False
+        counts = self.counts()
+        return all(counts.get(name, 1) == 0 for name in self._backlog)
+
+    def _resume(self, message: str) -> None:
+        self.exceeded = False
+        self.logger.warning(f"{message}, shed {self.shed - self._shed_before} alerts")
+
+    async def run(self) -> None:
+        while True:
+            self.check()
+            await asyncio.sleep(self.interval)
+
+    def start(self, trace: bool = False) -> None:
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Top allocation sites, and their growth since the previous snapshot.
+
+        The first call starts tracemalloc if it is not tracing yet, only
+        allocations made from then on are reported by later calls.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            self.logger.info("Started tracing memory allocations")
+            return {"tracing": True, "traced_bytes": 0, "top": [], "growth": []}
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+        top: List[Dict[str, Any]] = [
+            {"location": str(stat.traceback[0]), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:self.snapshot_top]
+        ]
+        growth: List[Dict[str, Any]] = []
+        if self._snapshot is not None:
+            growth = [
+                {"location": str(stat.traceback[0]), "size_diff_kb": round(stat.size_diff / 1024, 1),
+                 "count_diff": stat.count_diff}
+                for stat in snapshot.compare_to(self._snapshot, "lineno")[:self.snapshot_top]
+                if stat.size_diff > 0
+            ]
+        self._snapshot = snapshot
+        return {"tracing": True, "traced_bytes": tracemalloc.get_traced_memory()[0], "top": top, "growth": growth}
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "rss_bytes": self.last_rss,
+            "limit_bytes": self.limit,
+            "exceeded": self.exceeded,
+            "floor_bytes": self.floor,
+            "shed": self.shed,
+            "tracing": tracemalloc.is_tracing(),
+            "counts": self.counts(),
+        }
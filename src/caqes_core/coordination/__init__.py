@@ -0,0 +1,6 @@
+from caqes_core.coordination.coordination_type import CoordinationType
+from caqes_core.coordination.backend import CoordinationBackend
+from caqes_core.coordination.coordinator import Coordinator
+from caqes_core.coordination.coordination_factory import CoordinationFactory
+
+__all__ = ['CoordinationType', 'CoordinationBackend', 'Coordinator', 'CoordinationFactory']
@@ -0,0 +1,52 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+from caqes_core.models import QuarantineRecord
+
+
+class CoordinationBackend(ABC):
+    """Shared coordination state for one or more CAQES nodes."""
+
+    # Whether quarantine records written here are visible to other nodes
+    shared: bool = True
+
+    def __init__(self, node_id: str):
+        self.node_id = node_id
+
+    @abstractmethod
+    def claim(self, key: str, ttl: float) -> bool:
+        """Atomically claim ``key`` for ``ttl`` seconds, False if another owner holds it."""
+        pass
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def acquire_lease(self, role: str, ttl: float) -> bool:
+        """Acquire or renew the leadership lease for ``role``, False if another node leads."""
+        pass
+
+    @abstractmethod
+    def save_record(self, record: QuarantineRecord) -> None:
+        pass
+
+    @abstractmethod
+    def delete_record(self, ip: str) -> None:
+        pass
+
+    @abstractmethod
+    def load_records(self) -> List[QuarantineRecord]:
+        pass
+
+    @abstractmethod
+    def set_flag(self, name: str) -> None:
+        pass
+
+    @abstractmethod
+    def pop_flag(self, name: str) -> bool:
+        """Clear ``name`` and return whether it was set."""
+        pass
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,19 @@
+from caqes_core.coordination.backend import CoordinationBackend
+from caqes_core.coordination.coordination_type import CoordinationType
+from caqes_core.coordination.local_backend import LocalBackend
+from caqes_core.coordination.sqlite_backend import SQLiteBackend
+from caqes_core.coordination.redis_backend import RedisBackend
+
+class CoordinationFactory:
+    @staticmethod
+    def create(backend_type: CoordinationType, node_id: str, path: str, url: str, prefix: str) -> CoordinationBackend:
+
+        match backend_type:
+            case CoordinationType.LOCAL:
+                return LocalBackend(node_id)
+            case CoordinationType.SQLITE:
+                return SQLiteBackend(node_id, path)
+            case CoordinationType.REDIS:
+                return RedisBackend(node_id, url, prefix)
+            case _:
+                raise ValueError(f"Unknown coordination backend: {backend_type}")
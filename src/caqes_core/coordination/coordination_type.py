@@ -0,0 +1,6 @@
+from enum import Enum
+
+class CoordinationType(Enum):
+    LOCAL = "local"
+    SQLITE = "sqlite"
+    REDIS = "redis"
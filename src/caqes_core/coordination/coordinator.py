@@ -0,0 +1,71 @@
+import logging
+import time
+from typing import Callable, Dict
+
+from .backend import CoordinationBackend
+
+
+class Coordinator:
+    """Node-level view over a coordination backend.
+
+    Leadership is renewed through the backend at most every third of the
+    lease so hot paths can ask ``is_leader`` freely.
+    """
+
+    def __init__(self, backend: CoordinationBackend, claim_ttl: float = 60.0, lease_ttl: float = 15.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.logger = logging.getLogger("caqes.coordination")
+        self.backend = backend
+        self.claim_ttl = claim_ttl
+        self.lease_ttl = lease_ttl
+        self.clock = clock
+        self._leading: Dict[str, float] = {}
+
+    @property
+    def node_id(self) -> str:
+        return self.backend.node_id
+
+    def claim_ban(self, ip: str) -> bool:
+        """Claim the right to ban ``ip`` so concurrent nodes do not duplicate the work."""
+        try:
+            return self.backend.claim(f"ban:{ip}", self.claim_ttl)
+        except Exception as e:
+            # Prefer a duplicate ban over a missed one when the backend is unreachable
+            self.logger.error(f"Failed to claim ban for {ip}, proceeding without dedup")
+            self.logger.debug(f"Claim error details: {str(e)}")
+            return True
+
+    def release_ban(self, ip: str) -> None:
+        try:
+            self.backend.release(f"ban:{ip}")
+        except Exception as e:
+            self.logger.debug(f"Failed to release ban claim for {ip}: {str(e)}")
+
+    def request_apply(self, integration: str) -> None:
+        """Mark staged firewall changes on ``integration`` for the apply leader to activate."""
+        self.backend.set_flag(f"apply:{integration}")
+
+    def take_apply(self, integration: str) -> bool:
+        return self.backend.pop_flag(f"apply:{integration}")
+
+    def is_leader(self, role: str) -> bool:
+        now = self.clock()
+        renewed_at = self._leading.get(role)
+        if renewed_at is not None and now - renewed_at < self.lease_ttl / 3:
+            return True
+        try:
+            leading = self.backend.acquire_lease(role, self.lease_ttl)
+        except Exception as e:
+            self.logger.error(f"Failed to renew {role} leadership")
+            self.logger.debug(f"Lease error details: {str(e)}")
+            leading = False
+        if leading:
+            if renewed_at is None:
+                self.logger.info(f"Node {self.node_id} became {role} leader")
+            self._leading[role] = now
+        elif self._leading.pop(role, None) is not None:
+            self.logger.info(f"Node {self.node_id} lost {role} leadership")
+        return leading
+
+    def close(self) -> None:
+        self.backend.close()
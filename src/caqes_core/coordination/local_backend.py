@@ -0,0 +1,54 @@
+import threading
+import time
+from typing import Dict, List, Set, Tuple
+
+from caqes_core.models import QuarantineRecord
+from .backend import CoordinationBackend
+
+
+class LocalBackend(CoordinationBackend):
+    """Single-node backend, the node always leads and state stays in process."""
+
+    shared = False
+
+    def __init__(self, node_id: str):
+        super().__init__(node_id)
+        self._claims: Dict[str, float] = {}
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self._records: Dict[str, QuarantineRecord] = {}
+        self._flags: Set[str] = set()
+        # Claims are taken off the event loop
+        self._lock = threading.Lock()
+
+    def claim(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            if self._claims.get(key, 0) > now:
+                return False
+            self._claims[key] = now + ttl
+            return True
+
+    def release(self, key: str) -> None:
+        self._claims.pop(key, None)
+
+    def acquire_lease(self, role: str, ttl: float) -> bool:
+        self._leases[role] = (self.node_id, time.time() + ttl)
+        return True
+
+    def save_record(self, record: QuarantineRecord) -> None:
+        self._records[record.ip] = record
+
+    def delete_record(self, ip: str) -> None:
+        self._records.pop(ip, None)
+
+    def load_records(self) -> List[QuarantineRecord]:
+        return list(self._records.values())
+
+    def set_flag(self, name: str) -> None:
+        self._flags.add(name)
+
+    def pop_flag(self, name: str) -> bool:
+        if name in self._flags:
+            self._flags.discard(name)
+            return True
+        return False
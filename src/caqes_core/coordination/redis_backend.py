@@ -0,0 +1,76 @@
+from typing import Any, List
+
+from caqes_core.models import QuarantineRecord
+from .backend import CoordinationBackend
+
+# Take the lease if it is free or already ours, refreshing its expiry
+_ACQUIRE_LEASE = """
+local owner = redis.call('GET', KEYS[1])
+if not owner or owner == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# Delete the claim only if it is still ours, it may have expired and been taken by another node
+_RELEASE_CLAIM = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisBackend(CoordinationBackend):
+    """Coordination through a Redis server shared by every node.
+
+    Requires the optional ``redis`` package, unless a ``client`` with the
+    same interface is given.
+    """
+
+    def __init__(self, node_id: str, url: str, prefix: str = "caqes", client: Any = None):
+        super().__init__(node_id)
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError("The redis coordination backend requires the 'redis' package") from e
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self._redis = client
+        self._acquire_lease = self._redis.register_script(_ACQUIRE_LEASE)
+        self._release_claim = self._redis.register_script(_RELEASE_CLAIM)
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.prefix, *parts))
+
+    def claim(self, key: str, ttl: float) -> bool:
+        return bool(self._redis.set(self._key("claim", key), self.node_id, nx=True, px=int(ttl * 1000)))
+
+    def release(self, key: str) -> None:
+        self._release_claim(keys=[self._key("claim", key)], args=[self.node_id])
+
+    def acquire_lease(self, role: str, ttl: float) -> bool:
+        return bool(self._acquire_lease(keys=[self._key("lease", role)], args=[self.node_id, int(ttl * 1000)]))
+
+    def save_record(self, record: QuarantineRecord) -> None:
+        self._redis.hset(self._key("records"), record.ip, record.model_dump_json())
+
+    def delete_record(self, ip: str) -> None:
+        self._redis.hdel(self._key("records"), ip)
+
+    def load_records(self) -> List[QuarantineRecord]:
+        return [
+            QuarantineRecord.model_validate_json(data)
+            for data in self._redis.hvals(self._key("records"))
+        ]
+
+    def set_flag(self, name: str) -> None:
+        self._redis.set(self._key("flag", name), 1)
+
+    def pop_flag(self, name: str) -> bool:
+        return self._redis.delete(self._key("flag", name)) > 0
+
+    def close(self) -> None:
+        self._redis.close()
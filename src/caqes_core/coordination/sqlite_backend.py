@@ -0,0 +1,94 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List
+
+from caqes_core.models import QuarantineRecord
+from .backend import CoordinationBackend
+
+
+class SQLiteBackend(CoordinationBackend):
+    """Coordination through a SQLite file shared by nodes on the same host or volume.
+
+    Claims and leases are taken inside ``BEGIN IMMEDIATE`` transactions so
+    competing processes serialise on the database's write lock. The
+    connection is shared by the event loop and the threads quarantine state is
+    refreshed and persisted from, so calls are serialised on a lock.
+    """
+
+    def __init__(self, node_id: str, path: str):
+        super().__init__(node_id)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS claims (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS leases (role TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS records (ip TEXT PRIMARY KEY, record TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS flags (name TEXT PRIMARY KEY);
+        """)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def _execute(self, sql: str, parameters: tuple = ()) -> int:
+        """Run a single statement, returns the number of rows it changed."""
+        with self._lock:
+            return self._db.execute(sql, parameters).rowcount
+
+    def claim(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        with self._transaction() as db:
+            db.execute("DELETE FROM claims WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO claims (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, self.node_id, now + ttl)
+            )
+            return cursor.rowcount > 0
+
+    def release(self, key: str) -> None:
+        self._execute("DELETE FROM claims WHERE key = ? AND owner = ?", (key, self.node_id))
+
+    def acquire_lease(self, role: str, ttl: float) -> bool:
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute("SELECT owner, expires_at FROM leases WHERE role = ?", (role,)).fetchone()
+            acquired = row is None or row[0] == self.node_id or row[1] <= now
+            if acquired:
+                db.execute(
+                    "INSERT OR REPLACE INTO leases (role, owner, expires_at) VALUES (?, ?, ?)",
+                    (role, self.node_id, now + ttl)
+                )
+            return acquired
+
+    def save_record(self, record: QuarantineRecord) -> None:
+        self._execute("INSERT OR REPLACE INTO records (ip, record) VALUES (?, ?)", (record.ip, record.model_dump_json()))
+
+    def delete_record(self, ip: str) -> None:
+        self._execute("DELETE FROM records WHERE ip = ?", (ip,))
+
+    def load_records(self) -> List[QuarantineRecord]:
+        with self._lock:
+            rows = self._db.execute("SELECT record FROM records").fetchall()
+        return [QuarantineRecord.model_validate_json(data) for (data,) in rows]
+
+    def set_flag(self, name: str) -> None:
+        self._execute("INSERT OR IGNORE INTO flags (name) VALUES (?)", (name,))
+
+    def pop_flag(self, name: str) -> bool:
+        return self._execute("DELETE FROM flags WHERE name = ?", (name,)) > 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,4 @@
+from .sinks import DeadLetterSink, FileSink, SinkType, TopicSink
+from .dead_letter_queue import DeadLetterQueue
+
+__all__ = ['DeadLetterQueue', 'DeadLetterSink', 'FileSink', 'SinkType', 'TopicSink']
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from .sinks import DeadLetterSink
+
+
+def describe(error: BaseException, limit: int = 300) -> str:
+    """One-line description of an error, without its traceback."""
+    if isinstance(error, ValidationError):
+        first = error.errors(include_url=False, include_context=False, include_input=False)[0]
+        location = ".".join(str(part) for part in first["loc"]) or "alert"
+        text = f"{error.error_count()} validation error(s), first {location}: {first['msg']}"
+    else:
+        text = f"{type(error).__name__}: {error}"
+    return text[:limit]
+
+
+class DeadLetterQueue:
+    """Keeps messages CAQES could not process, for inspection and replay.
+
+    ``reject`` is cheap enough to call for every poison message of a flood:
+    rejections are counted by reason, and only those within a token bucket
+    of ``rate`` per second, up to ``burst`` at once, are described and queued
+    for the sink. The rest are only counted as dropped. Queued entries are
+    written in batches every ``flush_interval`` seconds. Rather than a log
+    line per message, the first rejection for each reason is logged and the
+    counts are summarised every ``log_interval`` seconds.
+    """
+
+    def __init__(self, sink: DeadLetterSink, rate: float = 10.0, burst: int = 100,
+                 max_payload: int = 4096, flush_interval: float = 1.0, log_interval: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.logger = logging.getLogger("caqes.dead_letter")
+        self.sink = sink
+        self.rate = rate
+        self.burst = burst
+        self.max_payload = max_payload
+        self.flush_interval = flush_interval
+        self.log_interval = log_interval
+        self.clock = clock
+        self.rejected: Counter[str] = Counter()
+        self.dropped = 0
+        self.written = 0
+        self._tokens = float(burst)
+        self._refilled_at = clock()
+        self._buffer: List[bytes] = []
+        self._logged_at = clock()
+        self._since_log: Counter[str] = Counter()
+        self._task: asyncio.Task | None = None
+
+    def _take(self) -> bool:
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def reject(self, reason: str, payload: bytes, error: Optional[BaseException] = None, **fields: Any) -> bool:
+        """Dead-letter a message, returns False if it was only counted because of the rate limit."""
+        first = reason not in self.rejected
+        self.rejected[reason] += 1
+        self._since_log[reason] += 1
+        if not self._take():
+            self.dropped += 1
+            return False
+
+        detail = describe(error) if error is not None else None
+        if first:
+            self.logger.warning(f"Dead-lettering {reason} messages, first: {detail or 'no details'}")
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "reason": reason,
+            "error": detail,
+            "payload": payload[:self.max_payload].decode("utf-8", "backslashreplace"),
+            "truncated": len(payload) > self.max_payload,
+            **fields
+        }
+        self._buffer.append(json.dumps(entry, default=str).encode() + b"\n")
+        return True
+
+    async def flush(self) -> None:
+        if not self._buffer:
+            return
+        entries, self._buffer = self._buffer, []
+        try:
+            await self.sink.write(entries)
+            self.written += len(entries)
+        except Exception as e:
+            self.dropped += len(entries)
+            self.logger.error(f"Failed to write {len(entries)} dead letters")
+            self.logger.debug(f"Dead letter sink error details: {str(e)}")
+
+    def _summarise(self) -> None:
+        now = self.clock()
+        if now - self._logged_at < self.log_interval:
+            return
+        if self._since_log:
+            counts = ", ".join(f"{reason}: {count}" for reason, count in self._since_log.most_common())
+            self.logger.warning(
+                f"Dead-lettered {sum(self._since_log.values())} messages in the last "
+                f"{now - self._logged_at:.0f}s ({counts}), {self.dropped} dropped over the rate limit so far")
+            self._since_log.clear()
+        self._logged_at = now
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+            self._summarise()
+
+    async def start(self) -> None:
+        await self.sink.open()
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        await self.sink.close()
+
+    def status(self) -> Dict[str, Any]:
+        return {"rejected": dict(self.rejected), "written": self.written, "dropped": self.dropped}
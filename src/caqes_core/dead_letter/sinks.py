@@ -0,0 +1,94 @@
+import os
+from abc import ABC, abstractmethod
+from enum import Enum
+from pathlib import Path
+from typing import List
+
+from caqes_core.mq.client import Client
+
+
+class SinkType(Enum):
+    FILE = "file"
+    MQTT = "mqtt"
+
+
+class DeadLetterSink(ABC):
+    """Destination of dead-lettered messages, written in batches of JSON lines."""
+
+    async def open(self) -> None:
+        pass
+
+    @abstractmethod
+    async def write(self, entries: List[bytes]) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class FileSink(DeadLetterSink):
+    """Appends dead letters to a JSON lines file, rotated once it exceeds ``max_bytes``.
+
+    Rotation renames ``path`` to ``path.1``, shifting older files up to
+    ``backup_count`` and deleting the oldest, as logging's RotatingFileHandler
+    does.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._file = None
+        self._size = 0
+
+    async def open(self) -> None:
+        if self._file is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "ab")
+            self._size = self._file.tell()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "ab")
+        self._size = 0
+
+    async def write(self, entries: List[bytes]) -> None:
+        await self.open()
+        for entry in entries:
+            if self._size and self._size + len(entry) > self.max_bytes:
+                self._rotate()
+            self._file.write(entry)
+            self._size += len(entry)
+        self._file.flush()
+
+    async def close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class TopicSink(DeadLetterSink):
+    """Publishes each dead letter to a topic through a message queue client of its own."""
+
+    def __init__(self, client: Client, topic: str):
+        self.client = client
+        self.topic = topic
+
+    async def open(self) -> None:
+        if not await self.client.is_connected():
+            await self.client.connect()
+
+    async def write(self, entries: List[bytes]) -> None:
+        for entry in entries:
+            await self.client.publish(self.topic, entry.rstrip(b"\n"))
+
+    async def close(self) -> None:
+        await self.client.close()
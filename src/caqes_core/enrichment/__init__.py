@@ -0,0 +1,7 @@
+from caqes_core.enrichment.provider_type import ProviderType
+from caqes_core.enrichment.enrichment_provider import EnrichmentProvider
+from caqes_core.enrichment.enrichment_cache import EnrichmentCache
+from caqes_core.enrichment.enricher import Enricher
+from caqes_core.enrichment.enrichment_factory import EnrichmentFactory
+
+__all__ = ['ProviderType', 'EnrichmentProvider', 'EnrichmentCache', 'Enricher', 'EnrichmentFactory']
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+from caqes_core.models import DeviceInfo
+from .enrichment_cache import EnrichmentCache
+from .enrichment_provider import EnrichmentProvider
+
+
+class Enricher:
+    """Read-through cache in front of the enrichment providers.
+
+    Cache misses arriving within ``batch_window`` seconds of each other are
+    resolved with one ``lookup_many`` per provider, and concurrent lookups of
+    the same address share a single request. Providers are consulted in
+    order, earlier ones taking precedence field by field. A lookup slower
+    than ``timeout`` returns ``None`` so alerts are not held up, while the
+    request carries on in the background to warm the cache.
+    """
+
+    def __init__(
+        self,
+        providers: List[EnrichmentProvider],
+        cache: EnrichmentCache | None = None,
+        batch_window: float = 0.005,
+        max_batch: int = 100,
+        timeout: float = 0.5
+    ):
+        self.logger = logging.getLogger("caqes.enrichment")
+        self.providers = providers
+        self.cache = cache or EnrichmentCache()
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.batches = 0
+        self.timeouts = 0
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._resolving: Dict[str, asyncio.Future] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def lookup(self, ip: str) -> Optional[DeviceInfo]:
+        hit, info = self.cache.get(ip)
+        if hit:
+            return info
+        future = self._pending.get(ip) or self._resolving.get(ip)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[ip] = future
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return None
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        self._resolving.update(batch)
+        task = asyncio.create_task(self._resolve(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, batch: Dict[str, asyncio.Future]) -> None:
+        self.batches += 1
+        ips = list(batch)
+        results: Dict[str, DeviceInfo] = {}
+        failed = False
+        for provider in self.providers:
+            try:
+                found = await provider.lookup_many(ips)
+            except Exception as e:
+                failed = True
+                self.logger.error(f"Enrichment lookup on {provider.name} failed")
+                self.logger.debug(f"Enrichment error details: {str(e)}")
+                continue
+            for ip, info in found.items():
+                results[ip] = results[ip].merge(info) if ip in results else info
+
+        for ip, future in batch.items():
+            info = results.get(ip)
+            # Do not remember a miss that may only be due to a failing provider
+            if info is not None or not failed:
+                self.cache.put(ip, info)
+            self._resolving.pop(ip, None)
+            if not future.done():
+                future.set_result(info)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cached": len(self.cache),
+            "hits": self.cache.hits,
+            "misses": self.cache.misses,
+            "batches": self.batches,
+            "timeouts": self.timeouts,
+        }
+
+    async def close(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for provider in self.providers:
+            await provider.close()
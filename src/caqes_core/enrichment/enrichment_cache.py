@@ -0,0 +1,45 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from caqes_core.models import DeviceInfo
+
+
+class EnrichmentCache:
+    """LRU cache of lookups with a TTL, caching misses for ``negative_ttl``.
+
+    Negative entries keep unknown addresses, which are common for scanners
+    and spoofed sources, from being looked up again on every alert.
+    """
+
+    def __init__(self, ttl: float = 300.0, negative_ttl: float = 60.0, max_size: int = 10_000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Tuple[float, Optional[DeviceInfo]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, ip: str) -> Tuple[bool, Optional[DeviceInfo]]:
+        """Return (hit, info), where a hit with ``None`` info is a cached miss."""
+        entry = self._entries.get(ip)
+        if entry is None or entry[0] <= self.clock():
+            if entry is not None:
+                del self._entries[ip]
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(ip)
+        self.hits += 1
+        return True, entry[1]
+
+    def put(self, ip: str, info: Optional[DeviceInfo]) -> None:
+        ttl = self.ttl if info is not None else self.negative_ttl
+        self._entries[ip] = (self.clock() + ttl, info)
+        self._entries.move_to_end(ip)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
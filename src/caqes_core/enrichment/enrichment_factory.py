@@ -0,0 +1,25 @@
+from typing import Any, Dict
+
+from caqes_core.enrichment.enrichment_provider import EnrichmentProvider
+from caqes_core.enrichment.provider_type import ProviderType
+
+class EnrichmentFactory:
+    @staticmethod
+    def create(provider_type: ProviderType, **kwargs: Dict[str, Any]) -> EnrichmentProvider:
+
+        # Providers are imported on demand so unused ones cost nothing at startup
+        match provider_type:
+            case ProviderType.STATIC:
+                from caqes_core.enrichment.providers.static_provider import StaticProvider
+                return StaticProvider(**kwargs)
+            case ProviderType.CSV:
+                from caqes_core.enrichment.providers.csv_provider import CsvProvider
+                return CsvProvider(**kwargs)
+            case ProviderType.SQLITE:
+                from caqes_core.enrichment.providers.sqlite_provider import SQLiteProvider
+                return SQLiteProvider(**kwargs)
+            case ProviderType.OPNSENSE:
+                from caqes_core.enrichment.providers.opnsense_provider import OPNsenseProvider
+                return OPNsenseProvider(**kwargs)
+            case _:
+                raise ValueError(f"Unknown enrichment provider: {provider_type}")
@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+from caqes_core.models import DeviceInfo
+
+
+class EnrichmentProvider(ABC):
+    """Source of asset details, looked up for a batch of addresses at a time."""
+
+    name: str = ""
+
+    @abstractmethod
+    async def lookup_many(self, ips: List[str]) -> Dict[str, DeviceInfo]:
+        """Return the details known for any of ``ips``, unknown addresses are left out."""
+        pass
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,7 @@
+from enum import Enum
+
+class ProviderType(Enum):
+    STATIC = "static"
+    CSV = "csv"
+    SQLITE = "sqlite"
+    OPNSENSE = "opnsense"
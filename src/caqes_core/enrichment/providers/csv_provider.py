@@ -0,0 +1,39 @@
+import asyncio
+import csv
+import logging
+import os
+from typing import Dict, List
+
+from caqes_core.models import DeviceInfo
+from caqes_core.enrichment.enrichment_provider import EnrichmentProvider
+
+
+class CsvProvider(EnrichmentProvider):
+    """Asset inventory exported as CSV with an ``ip`` column and any DeviceInfo fields.
+
+    The file is indexed in memory and re-read when its modification time changes.
+    """
+
+    name = "csv"
+
+    def __init__(self, path: str):
+        self.logger = logging.getLogger("caqes.enrichment.csv")
+        self.path = path
+        self._devices: Dict[str, DeviceInfo] = {}
+        self._mtime: float | None = None
+
+    def _load(self) -> None:
+        mtime = os.stat(self.path).st_mtime
+        if mtime == self._mtime:
+            return
+        with open(self.path, newline="") as f:
+            devices = {
+                row["ip"]: DeviceInfo(**{key: value for key, value in row.items() if key and value})
+                for row in csv.DictReader(f) if row.get("ip")
+            }
+        self._devices, self._mtime = devices, mtime
+        self.logger.info(f"Loaded {len(devices)} assets from {self.path}")
+
+    async def lookup_many(self, ips: List[str]) -> Dict[str, DeviceInfo]:
+        await asyncio.to_thread(self._load)
+        return {ip: self._devices[ip] for ip in ips if ip in self._devices}
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List
+
+from caqes_core.models import DeviceInfo
+from caqes_core.enrichment.enrichment_provider import EnrichmentProvider
+from caqes_core.quarantine.http_session import PooledSession
+
+
+class OPNsenseProvider(EnrichmentProvider):
+    """Device details from a snapshot of the OPNsense ARP table and DHCP leases.
+
+    The snapshot is fetched with two requests and reused for every lookup
+    until it is ``refresh_interval`` seconds old, so lookups never reach the
+    firewall individually.
+    """
+
+    name = "opnsense"
+
+    def __init__(self, base_url: str, api_key: str, api_secret: str,
+                 refresh_interval: float = 60.0, timeout: float = 5):
+        self.logger = logging.getLogger("caqes.enrichment.opnsense")
+        self.base_url = base_url.rstrip('/')
+        self.auth = (api_key, api_secret)
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.session = PooledSession(pool_size=2)
+        self._snapshot: Dict[str, DeviceInfo] = {}
+        self._fetched_at: float | None = None
+        self._refresh: asyncio.Task | None = None
+
+    def _rows(self, path: str) -> List[dict]:
+        response = self.session.get(f"{self.base_url}{path}", auth=self.auth, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json().get("rows", [])
+
+    def _fetch(self) -> Dict[str, DeviceInfo]:
+        snapshot: Dict[str, DeviceInfo] = {}
+        for lease in self._rows("/api/dhcpv4/leases/searchLease"):
+            if lease.get("address"):
+                snapshot[lease["address"]] = DeviceInfo(
+                    ip=lease["address"],
+                    mac=(lease.get("mac") or "").lower() or None,
+                    hostname=lease.get("hostname") or None,
+                    vlan=lease.get("if_descr") or lease.get("if") or None
+                )
+        # The ARP table is authoritative for the MAC currently using an address
+        for entry in self._rows("/api/diagnostics/interface/getArp"):
+            if entry.get("ip"):
+                arp = DeviceInfo(
+                    ip=entry["ip"],
+                    mac=(entry.get("mac") or "").lower() or None,
+                    hostname=entry.get("hostname") or None,
+                    vlan=entry.get("intf_description") or entry.get("intf") or None
+                )
+                previous = snapshot.get(entry["ip"])
+                snapshot[entry["ip"]] = arp.merge(previous) if previous else arp
+        return snapshot
+
+    async def _refresh_snapshot(self) -> None:
+        try:
+            self._snapshot = await asyncio.to_thread(self._fetch)
+            self.logger.debug(f"Refreshed device snapshot with {len(self._snapshot)} entries")
+        finally:
+            # Retry on the next lookup after a failure, keeping the stale snapshot meanwhile
+            self._fetched_at = time.monotonic()
+
+    async def lookup_many(self, ips: List[str]) -> Dict[str, DeviceInfo]:
+        stale = self._fetched_at is None or time.monotonic() - self._fetched_at >= self.refresh_interval
+        if stale:
+            # Concurrent batches wait for the same refresh
+            if self._refresh is None or self._refresh.done():
+                self._refresh = asyncio.create_task(self._refresh_snapshot())
+            await asyncio.shield(self._refresh)
+        return {ip: self._snapshot[ip] for ip in ips if ip in self._snapshot}
@@ -0,0 +1,44 @@
+import asyncio
+import sqlite3
+import threading
+from typing import Dict, List
+
+from caqes_core.models import DeviceInfo
+from caqes_core.enrichment.enrichment_provider import EnrichmentProvider
+
+COLUMNS = tuple(DeviceInfo.model_fields)
+
+
+class SQLiteProvider(EnrichmentProvider):
+    """Asset inventory in a SQLite table with an ``ip`` column and any DeviceInfo fields.
+
+    Each batch is resolved with a single ``IN`` query.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, table: str = "assets"):
+        self.path = path
+        self.table = table
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _query(self, ips: List[str]) -> Dict[str, DeviceInfo]:
+        with self._lock:
+            if self._db is None:
+                self._db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+                self._db.row_factory = sqlite3.Row
+            placeholders = ",".join("?" * len(ips))
+            rows = self._db.execute(f'SELECT * FROM "{self.table}" WHERE ip IN ({placeholders})', ips).fetchall()
+        return {
+            row["ip"]: DeviceInfo(**{key: str(row[key]) for key in row.keys() if key in COLUMNS and row[key] is not None})
+            for row in rows
+        }
+
+    async def lookup_many(self, ips: List[str]) -> Dict[str, DeviceInfo]:
+        return await asyncio.to_thread(self._query, ips)
+
+    async def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
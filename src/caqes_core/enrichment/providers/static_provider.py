@@ -0,0 +1,16 @@
+from typing import Any, Dict, List
+
+from caqes_core.models import DeviceInfo
+from caqes_core.enrichment.enrichment_provider import EnrichmentProvider
+
+
+class StaticProvider(EnrichmentProvider):
+    """Asset details given inline in the configuration, keyed by IP."""
+
+    name = "static"
+
+    def __init__(self, devices: Dict[str, Dict[str, Any]]):
+        self.devices = {ip: DeviceInfo(ip=ip, **fields) for ip, fields in devices.items()}
+
+    async def lookup_many(self, ips: List[str]) -> Dict[str, DeviceInfo]:
+        return {ip: self.devices[ip] for ip in ips if ip in self.devices}
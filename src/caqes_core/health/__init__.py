@@ -0,0 +1,3 @@
+from .health_server import HealthServer
+
+__all__ = ['HealthServer']
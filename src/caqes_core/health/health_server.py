@@ -0,0 +1,219 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from caqes_core.budget import MemoryBudget
+from caqes_core.profiling import ProfileMode, Profiler, stage_timings
+from caqes_core.quarantine.quarantine_orchestrator import QuarantineOrchestrator
+from caqes_core.scheduling import PriorityScheduler
+from caqes_core.worker import Worker
+
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 503: "Service Unavailable"}
+
+
+class HealthServer:
+    """Embedded HTTP server answering liveness, readiness and status probes.
+
+    ``/livez`` fails once any worker has stopped consuming, ``/readyz`` until
+    every worker is connected to the message queue and the last probe reached
+    every integration, and ``/status`` reports queue depth, in-flight bans,
+    consumer lag and circuit breaker states. Integrations are probed in the
+    background every ``probe_interval`` seconds rather than per request, so
+    frequent probes do not add load on them. Given a profiler, ``/profile``
+    reports stage timings and ``POST /profile?mode=sampling&seconds=30``
+    profiles the process for a window. Given a memory budget, ``/memory``
+    reports RSS and live counts and ``POST /memory/snapshot`` takes a
+    tracemalloc snapshot.
+    """
+
+    def __init__(
+        self,
+        orchestrator: QuarantineOrchestrator,
+        workers: List[Worker],
+        scheduler: Optional[PriorityScheduler] = None,
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        probe_interval: float = 30.0,
+        probe_timeout: float = 5.0,
+        profiler: Optional[Profiler] = None,
+        memory_budget: Optional[MemoryBudget] = None
+    ):
+        self.logger = logging.getLogger("caqes.health")
+        self.orchestrator = orchestrator
+        self.workers = workers
+        self.scheduler = scheduler
+        self.host = host
+        self.port = port
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.profiler = profiler
+        self.memory_budget = memory_budget
+        self.reachable: Dict[str, bool] = {}
+        self.probed_at: float | None = None
+        self.loop_lag = 0.0
+        self._started_at = time.monotonic()
+        self._server: asyncio.AbstractServer | None = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._tasks = [asyncio.create_task(self._probe_loop()), asyncio.create_task(self._watch_loop())]
+        self.logger.info(f"Health server listening on {self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _probe_loop(self) -> None:
+        while True:
+            self.reachable = await self.orchestrator.check_integrations(self.probe_timeout)
+            self.probed_at = time.monotonic()
+            unreachable = [name for name, ok in self.reachable.items() if not ok]
+            if unreachable:
+                self.logger.warning(f"Integrations unreachable: {', '.join(unreachable)}")
+            await asyncio.sleep(self.probe_interval)
+
+    async def _watch_loop(self, interval: float = 1.0) -> None:
+        """Measure how late the event loop wakes up, a sign of CPU saturation or blocking calls."""
+        while True:
+            expected = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            self.loop_lag = max(0.0, time.monotonic() - expected)
+
+    def live(self) -> bool:
+        return all(worker.running for worker in self.workers)
+
+    async def ready(self) -> bool:
+        if not self.workers or not self.live() or self.probed_at is None:
+            return False
+        connected = await asyncio.gather(*(worker.is_connected() for worker in self.workers))
+        return all(connected) and all(self.reachable.values())
+
+    async def status(self) -> Dict[str, Any]:
+        integrations = {
+            name: {**lane_status, "reachable": self.reachable.get(name)}
+            for name, lane_status in self.orchestrator.dispatch_status().items()
+        }
+        scheduler = None
+        if self.scheduler is not None:
+            scheduler = {
+                "depths": self.scheduler.depths(),
+                "queued": len(self.scheduler),
+                "in_flight": self.scheduler.in_flight,
+                "dropped": self.scheduler.dropped,
+                "consumer_lag": round(self.scheduler.oldest_wait(), 3),
+            }
+        return {
+            "live": self.live(),
+            "ready": await self.ready(),
+            "uptime": round(time.monotonic() - self._started_at, 1),
+            "loop_lag": round(self.loop_lag, 3),
+            "workers": [
+                {"id": worker.worker_id, "running": worker.running, "connected": await worker.is_connected()}
+                for worker in self.workers
+            ],
+            "scheduler": scheduler,
+            # Workers share their pipelines, or build identical ones
+            "pipelines": [
+                {"topic": pipeline.topic, "format": pipeline.adapter.name, "pending": pipeline.pending}
+                for pipeline in (self.workers[0].pipelines if self.workers else [])
+            ],
+            "quarantine": {
+                "in_flight_bans": self.orchestrator.in_flight,
+                "quarantined": len(self.orchestrator.store),
+                "policy_hits": dict(self.orchestrator.policy_hits),
+                "unmatched": self.orchestrator.unmatched,
+                "protected": self.orchestrator.protected_hits,
+                "shadow": dict(self.orchestrator.shadow_stats),
+                "dry_run": self.orchestrator.dry_run,
+            },
+            "integrations": integrations,
+            "enrichment": self.orchestrator.enricher.stats() if self.orchestrator.enricher else None,
+            "dead_letters": self.orchestrator.dead_letters.status() if self.orchestrator.dead_letters else None,
+            "stages": stage_timings.snapshot() or None,
+            "memory": self.memory_budget.status() if self.memory_budget else None,
+        }
+
+    async def _route(self, method: str, path: str, query: Dict[str, List[str]] | None = None) -> Tuple[int, Dict[str, Any]]:
+        if path == "/profile" and self.profiler is not None:
+            return self._profile(method, query or {})
+        if path in ("/memory", "/memory/snapshot") and self.memory_budget is not None:
+            return await self._memory(method, path)
+        if path not in ("/livez", "/readyz", "/status"):
+            return 404, {"error": "not found"}
+        if method != "GET":
+            return 405, {"error": "method not allowed"}
+        if path == "/livez":
+            live = self.live()
+            return (200 if live else 503), {"live": live}
+        if path == "/readyz":
+            ready = await self.ready()
+            return (200 if ready else 503), {"ready": ready}
+        return 200, await self.status()
+
+    async def _memory(self, method: str, path: str) -> Tuple[int, Dict[str, Any]]:
+        if path == "/memory":
+            if method != "GET":
+                return 405, {"error": "method not allowed"}
+            return 200, self.memory_budget.status()
+        if method != "POST":
+            return 405, {"error": "method not allowed"}
+        # Walking every traced allocation takes a while on a large heap
+        return 200, await asyncio.to_thread(self.memory_budget.snapshot)
+
+    def _profile(self, method: str, query: Dict[str, List[str]]) -> Tuple[int, Dict[str, Any]]:
+        if method == "GET":
+            return 200, self.profiler.status()
+        if method != "POST":
+            return 405, {"error": "method not allowed"}
+        try:
+            mode = ProfileMode(query.get("mode", [ProfileMode.SAMPLING.value])[0])
+            seconds = float(query.get("seconds", ["30"])[0])
+            path = self.profiler.start(mode, seconds)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        except RuntimeError as e:
+            return 409, {"error": str(e)}
+        return 202, {"mode": mode.value, "seconds": seconds, "path": str(path)}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Headers are not used, read past them
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass
+            method, target, _ = request_line.decode("latin-1").split()
+            url = urlsplit(target)
+            status, body = await self._route(method, url.path, parse_qs(url.query))
+        except (ValueError, asyncio.TimeoutError, ConnectionError):
+            status, body = 400, {"error": "bad request"}
+        except Exception as e:
+            self.logger.error("Failed to answer health request")
+            self.logger.debug(f"Health request error details: {str(e)}")
+            status, body = 503, {"error": "internal error"}
+
+        payload = json.dumps(body).encode()
+        head = (
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: close\r\n\r\n"
+        )
+        try:
+            writer.write(head.encode() + payload)
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, List
+
+
+class DecisionLogger:
+    """Append-only JSON lines log of quarantine decisions.
+
+    Decisions are serialised into an in-memory buffer and written with a
+    single ``write`` once ``buffer_size`` entries are pending or every
+    ``flush_interval`` seconds, so logging every alert costs one JSON dump
+    rather than one system call.
+    """
+
+    def __init__(self, path: str, buffer_size: int = 1000, flush_interval: float = 1.0):
+        self.logger = logging.getLogger("caqes.decisions")
+        self.path = path
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._buffer: List[bytes] = []
+        self._file = None
+        self._task: asyncio.Task | None = None
+
+    def open(self) -> None:
+        if self._file is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "ab")
+
+    def log(self, decision: str, **fields: Any) -> None:
+        entry = {"ts": datetime.now(timezone.utc).isoformat(), "decision": decision, **fields}
+        self._buffer.append(json.dumps(entry, default=str).encode() + b"\n")
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        self.open()
+        try:
+            self._file.write(b"".join(self._buffer))
+            self._file.flush()
+            self.written += len(self._buffer)
+        except OSError as e:
+            self.logger.error(f"Failed to write {len(self._buffer)} decisions to {self.path}")
+            self.logger.debug(f"Decision log error details: {str(e)}")
+        self._buffer.clear()
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+    def start(self) -> None:
+        self.open()
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.close()
+
+    def close(self) -> None:
+        self.flush()
+        if self._file:
+            self._file.close()
+            self._file = None
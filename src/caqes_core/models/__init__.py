@@ -1,4 +1,8 @@
 from .alert import Alert
-from .policy import Policy
+from .alert_adapters import AlertAdapter, AlertFormatError, alert_formats, create_adapter, register_adapter
+from .device_info import DeviceInfo
+from .ip_address import IPAddress, intern_ip, ip_key, ip_text
+from .policy import Policy, PolicyAction
+from .quarantine_record import BanRoute, BanTarget, QuarantineRecord
 
-__all__ = ['Alert', 'Policy']
+__all__ = ['Alert', 'AlertAdapter', 'AlertFormatError', 'alert_formats', 'create_adapter', 'register_adapter', 'DeviceInfo', 'IPAddress', 'intern_ip', 'ip_key', 'ip_text', 'Policy', 'PolicyAction', 'BanRoute', 'BanTarget', 'QuarantineRecord']
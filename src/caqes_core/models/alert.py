@@ -1,15 +1,15 @@
 from datetime import datetime
 import logging
 from pydantic import BaseModel, Field, field_validator
-from pydantic.networks import IPvAnyAddress
+from caqes_core.models.ip_address import IPAddress
 from uuid import uuid4
 
 
 class Alert(BaseModel):
     alert_id: str = Field(default_factory=lambda: str(uuid4()))
-    source_ip: IPvAnyAddress
+    source_ip: IPAddress
     source_port: int
-    destination_ip: IPvAnyAddress
+    destination_ip: IPAddress
     destination_port: int
     priority: str = Field(default='1')
     timestamp: datetime | None = Field(default_factory=datetime.now)
@@ -42,3 +42,4 @@ class Alert(BaseModel):
         """
         if value is None:
             return "Others"
+        return value
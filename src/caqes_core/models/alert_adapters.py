@@ -0,0 +1,233 @@
+import json
+import re
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from caqes_core.models.alert import Alert
+
+# A path of keys into a decoded event, e.g. ("alert", "severity") for event["alert"]["severity"]
+KeyPath = Tuple[str, ...]
+
+
+class AlertFormatError(ValueError):
+    """Raised when a message decodes but does not have the shape of an alert."""
+
+
+def compile_extractor(fields: Dict[str, Tuple[Sequence[KeyPath], Optional[Callable[[Any], Any]]]]
+                      ) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Compile a field mapping into a function building Alert fields from a decoded event.
+
+    ``fields`` maps each Alert field to the key paths it may be found at, tried
+    in order, and an optional conversion. The mapping is turned into straight
+    line Python once, so decoding an event costs a few dict lookups per field
+    instead of walking the mapping for every message. Fields found at no path
+    are left out, for Alert to default or reject.
+    """
+    namespace: Dict[str, Any] = {"_empty": {}}
+    lines = ["def extract(event):", "    result = {}"]
+    for index, (field, (paths, convert)) in enumerate(fields.items()):
+        for attempt, path in enumerate(paths):
+            lookup = "event" + "".join(f".get({key!r}, _empty)" for key in path[:-1]) + f".get({path[-1]!r})"
+            if attempt == 0:
+                lines.append(f"    value = {lookup}")
+            else:
+                lines.append("    if value is None:")
+                lines.append(f"        value = {lookup}")
+        lines.append("    if value is not None:")
+        if convert is not None:
+            namespace[f"_convert{index}"] = convert
+            lines.append(f"        result[{field!r}] = _convert{index}(value)")
+        else:
+            lines.append(f"        result[{field!r}] = value")
+    lines.append("    return result")
+    exec("\n".join(lines), namespace)
+    return namespace["extract"]
+
+
+def _object(payload: bytes) -> Dict[str, Any]:
+    event = json.loads(payload)
+    if not isinstance(event, dict):
+        raise AlertFormatError("Alert message must be a JSON object")
+    return event
+
+
+class AlertAdapter(ABC):
+    """Decodes the alerts of one IDS format straight from message bytes."""
+    name: str = None
+
+    @abstractmethod
+    def decode(self, payload: bytes) -> Optional[Alert]:
+        """Build an Alert, or return None for events of the format that are not alerts.
+
+        Raises ValueError if the payload cannot be decoded, AlertFormatError or
+        a pydantic ValidationError, both ValueErrors too, if it is not an alert.
+        """
+        pass
+
+
+_adapters: Dict[str, Type[AlertAdapter]] = {}
+
+
+def register_adapter(name: str):
+    """Decorator to register an alert adapter under a format name."""
+    def decorator(subclass: Type[AlertAdapter]):
+        subclass.name = name
+        _adapters[name] = subclass
+        return subclass
+    return decorator
+
+
+def alert_formats() -> List[str]:
+    return sorted(_adapters)
+
+
+def create_adapter(name: str) -> AlertAdapter:
+    if name not in _adapters:
+        raise ValueError(f"Unknown alert format: {name}, available formats are {', '.join(alert_formats())}")
+    return _adapters[name]()
+
+
+@register_adapter("caqes")
+class CaqesAdapter(AlertAdapter):
+    """The flat CAQES alert format, with Alert's own field names."""
+
+    def decode(self, payload: bytes) -> Optional[Alert]:
+        return Alert(**_object(payload))
+
+
+@register_adapter("suricata")
+class SuricataEveAdapter(AlertAdapter):
+    """Suricata EVE JSON, of which only ``alert`` events are decoded."""
+
+    extract = staticmethod(compile_extractor({
+        "source_ip": ((("src_ip",),), None),
+        "source_port": ((("src_port",),), None),
+        "destination_ip": ((("dest_ip",),), None),
+        "destination_port": ((("dest_port",),), None),
+        "priority": ((("alert", "severity"),), str),
+        "timestamp": ((("timestamp",),), None),
+        "classification": ((("alert", "category"),), None),
+    }))
+
+    def decode(self, payload: bytes) -> Optional[Alert]:
+        event = _object(payload)
+        if event.get("event_type") != "alert":
+            return None
+        try:
+            fields = self.extract(event)
+            rule = event["alert"]
+        except (AttributeError, KeyError) as e:
+            raise AlertFormatError(f"Malformed EVE alert: {str(e)}") from e
+        # ICMP and other portless events have no ports
+        fields.setdefault("source_port", 0)
+        fields.setdefault("destination_port", 0)
+        # Rendered like a Snort fast alert, so rules on raw work whatever the IDS
+        fields["raw"] = (
+            f"[{rule.get('gid', 1)}:{rule.get('signature_id', 0)}:{rule.get('rev', 0)}] {rule.get('signature', '')} "
+            f"[Classification: {rule.get('category', '')}] [Priority: {rule.get('severity', '')}] "
+            f"{{{event.get('proto', '')}}} {event.get('src_ip')}:{event.get('src_port', 0)} -> "
+            f"{event.get('dest_ip')}:{event.get('dest_port', 0)}"
+        )
+        return Alert(**fields)
+
+
+# 03/01-12:00:00.123456  [**] [1:2000000:1] msg [**] [Classification: ...] [Priority: 2] {TCP} 10.0.0.1:51234 -> 10.0.0.2:1883
+SNORT_FAST = re.compile(
+    r"^(?P<ts>\d{2}/\d{2}(?:/\d{2})?-\d{2}:\d{2}:\d{2}(?:\.\d+)?)\s+\[\*\*\]\s+\[\d+:\d+:\d+\]\s+.*?\s+\[\*\*\]"
+    r"(?:\s+\[Classification:\s*(?P<classification>[^\]]*)\])?"
+    r"(?:\s+\[Priority:\s*(?P<priority>\d+)\])?"
+    r"\s+\{(?P<proto>\S+)\}\s+(?P<source>\S+)\s+->\s+(?P<destination>\S+)\s*$"
+)
+
+
+@register_adapter("snort")
+class SnortAdapter(AlertAdapter):
+    """Snort fast alert lines, or Snort 3 ``alert_json`` events."""
+
+    extract = staticmethod(compile_extractor({
+        "source_ip": ((("src_addr",),), None),
+        "source_port": ((("src_port",),), None),
+        "destination_ip": ((("dst_addr",),), None),
+        "destination_port": ((("dst_port",),), None),
+        "priority": ((("priority",),), str),
+        "classification": ((("class",),), None),
+    }))
+
+    def decode(self, payload: bytes) -> Optional[Alert]:
+        if payload.lstrip()[:1] == b"{":
+            return self._decode_json(_object(payload))
+        line = payload.decode().strip()
+        match = SNORT_FAST.match(line)
+        if match is None:
+            raise AlertFormatError("Not a Snort fast alert line")
+        ported = match["proto"].upper() in ("TCP", "UDP", "SCTP")
+        source_ip, source_port = self._endpoint(match["source"], ported)
+        destination_ip, destination_port = self._endpoint(match["destination"], ported)
+        return Alert(
+            source_ip=source_ip,
+            source_port=source_port,
+            destination_ip=destination_ip,
+            destination_port=destination_port,
+            priority=match["priority"] or "1",
+            timestamp=self._timestamp(match["ts"]),
+            classification=match["classification"],
+            raw=line
+        )
+
+    @staticmethod
+    def _endpoint(text: str, ported: bool) -> Tuple[str, int]:
+        """Split an address and port, written 10.0.0.1:80, [fd00::1]:80 or fd00::1:80."""
+        if text.startswith("["):
+            address, _, port = text[1:].partition("]:")
+            return address, int(port or 0)
+        if not ported or (":" not in text):
+            return text, 0
+        address, _, port = text.rpartition(":")
+        return address, int(port)
+
+    @staticmethod
+    def _timestamp(text: str) -> datetime:
+        if text.count("/") == 1:
+            # Fast alerts omit the year unless Snort runs with -y
+            text = text.replace("-", f"/{datetime.now().year % 100:02d}-", 1)
+        return datetime.strptime(text, "%m/%d/%y-%H:%M:%S.%f" if "." in text else "%m/%d/%y-%H:%M:%S")
+
+    def _decode_json(self, event: Dict[str, Any]) -> Alert:
+        fields = self.extract(event)
+        fields.setdefault("source_port", 0)
+        fields.setdefault("destination_port", 0)
+        fields["raw"] = (
+            f"[{event.get('gid', 1)}:{event.get('sid', 0)}:{event.get('rev', 0)}] {event.get('msg', '')} "
+            f"[Classification: {event.get('class', '')}] [Priority: {event.get('priority', '')}] "
+            f"{{{event.get('proto', '')}}} {event.get('src_addr')}:{event.get('src_port', 0)} -> "
+            f"{event.get('dst_addr')}:{event.get('dst_port', 0)}"
+        )
+        return Alert(**fields)
+
+
+@register_adapter("zeek")
+class ZeekNoticeAdapter(AlertAdapter):
+    """Zeek notice.log entries written as JSON, one per message."""
+
+    extract = staticmethod(compile_extractor({
+        "source_ip": ((("id.orig_h",), ("src",)), None),
+        "source_port": ((("id.orig_p",),), None),
+        "destination_ip": ((("id.resp_h",), ("dst",)), None),
+        "destination_port": ((("id.resp_p",), ("p",)), None),
+        "timestamp": ((("ts",),), None),
+        "classification": ((("note",),), None),
+    }))
+
+    def decode(self, payload: bytes) -> Optional[Alert]:
+        event = _object(payload)
+        fields = self.extract(event)
+        if "source_ip" not in fields:
+            # Notices about no particular host cannot be acted upon
+            return None
+        fields.setdefault("source_port", 0)
+        # Notices about a single host have no destination
+        fields.setdefault("destination_ip", "0.0.0.0")
+        fields.setdefault("destination_port", 0)
+        fields["raw"] = f"[{event.get('note', '')}] {event.get('msg', '')} {event.get('sub', '')}".rstrip()
+        return Alert(**fields)
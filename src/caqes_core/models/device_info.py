@@ -0,0 +1,18 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class DeviceInfo(BaseModel):
+    """Asset details about an address, exposed to policy rules as ``device``."""
+    ip: str
+    mac: Optional[str] = None
+    hostname: Optional[str] = None
+    device_type: Optional[str] = None
+    vlan: Optional[str] = None
+    owner: Optional[str] = None
+
+    def merge(self, other: "DeviceInfo") -> "DeviceInfo":
+        """Fill the fields this lookup left empty from another one."""
+        missing = {key: value for key, value in other.model_dump(exclude_none=True).items()
+                   if getattr(self, key) is None}
+        return self.model_copy(update=missing) if missing else self
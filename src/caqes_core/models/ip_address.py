@@ -0,0 +1,70 @@
+import ipaddress
+from typing import Annotated, Any, Dict, Union
+
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import core_schema
+
+Address = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+# Bounded so a flood of spoofed sources cannot grow them without limit, cleared when full
+MAX_INTERNED = 65536
+_V6 = 1 << 128
+
+_interned: Dict[str, Address] = {}
+_texts: Dict[int, str] = {}
+
+
+def intern_ip(value: Any) -> Address:
+    """Parse an IP address, returning the same object for text seen before.
+
+    Alerts repeat a small set of sources, so most parses become a dict
+    lookup and every alert from a source shares one address object.
+    """
+    if isinstance(value, (ipaddress.IPv4Address, ipaddress.IPv6Address)):
+        return value
+    if isinstance(value, str):
+        address = _interned.get(value)
+        if address is None:
+            address = ipaddress.ip_address(value)
+            if len(_interned) >= MAX_INTERNED:
+                _interned.clear()
+            _interned[value] = address
+        return address
+    return ipaddress.ip_address(value)
+
+
+def ip_key(address: Address) -> int:
+    """Compact integer key of an address, IPv6 keys are offset so they never equal an IPv4 one.
+
+    Hashing an int is far cheaper than hashing an ipaddress object, which
+    formats itself as hex on every call.
+    """
+    value = int(address)
+    return value if address.version == 4 else value | _V6
+
+
+def ip_text(address: Address) -> str:
+    """Canonical text of an address, formatted once per address."""
+    key = ip_key(address)
+    text = _texts.get(key)
+    if text is None:
+        text = str(address)
+        if len(_texts) >= MAX_INTERNED:
+            _texts.clear()
+        _texts[key] = text
+    return text
+
+
+class _Interned:
+    """Validates with intern_ip and, like IPvAnyAddress, serialises to text in JSON only."""
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            intern_ip,
+            serialization=core_schema.to_string_ser_schema(when_used="json-unless-none")
+        )
+
+
+# Field type for an interned IPv4 or IPv6 address
+IPAddress = Annotated[Address, _Interned]
@@ -1,9 +1,16 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+
+class PolicyAction(BaseModel):
+    integration: str  # Registered name of the integration, e.g. "emqx" or "opnsense"
+    action: Optional[str] = None  # How to ban, e.g. "peerhost" or "clientid" on EMQX, None for the integration's default
+    ban_duration: Optional[float] = None  # Seconds until this ban expires, None to use the policy's
 
 class Policy(BaseModel):
     name: str
     description: str
     rules: List[str]
+    ban_duration: Optional[float] = None  # Seconds until the ban expires, None to use the default
+    actions: Optional[List[PolicyAction]] = None  # Integrations to ban on, None for every integration
     
-  
\ No newline at end of file
+  
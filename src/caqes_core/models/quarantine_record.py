@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field
+
+
+class BanTarget(BaseModel):
+    """Identifier a single integration applied a ban to."""
+    identifier: str
+    identifier_type: str
+    # Further identifiers of the same type banned along with it, e.g. every client ID connected from the IP
+    others: List[str] = Field(default_factory=list)
+
+    @classmethod
+    def from_pairs(cls, pairs: List[Tuple[str, str]]) -> "BanTarget":
+        (identifier, identifier_type), *others = pairs
+        return cls(identifier=identifier, identifier_type=identifier_type, others=[other for other, _ in others])
+
+    def identifiers(self) -> List[str]:
+        return [self.identifier, *self.others]
+
+
+class BanRoute(BaseModel):
+    """Action and expiry a policy routed a ban to on a single integration."""
+    action: Optional[str] = None
+    expire_at: Optional[datetime] = None
+
+
+class QuarantineRecord(BaseModel):
+    ip: str
+    mac: Optional[str] = None
+    reason: Optional[str] = None
+    policy: Optional[str] = None
+    banned_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    expire_at: Optional[datetime] = None
+    targets: Dict[str, BanTarget] = Field(default_factory=dict)
+    # Integrations the policy routed the ban to, empty when it went to every integration
+    routes: Dict[str, BanRoute] = Field(default_factory=dict)
+
+    def expiry_of(self, integration: str) -> Optional[datetime]:
+        route = self.routes.get(integration)
+        return route.expire_at if route else self.expire_at
+
+    def next_expiry(self) -> Optional[datetime]:
+        """Earliest time one of the record's bans is due to be lifted."""
+        if not self.routes:
+            return self.expire_at
+        return min((route.expire_at for route in self.routes.values() if route.expire_at), default=None)
+
+    def is_expired(self, now: datetime | None = None, integration: Optional[str] = None) -> bool:
+        expire_at = self.expire_at if integration is None else self.expiry_of(integration)
+        if expire_at is None:
+            return False
+        return expire_at <= (now or datetime.now(timezone.utc))
@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import AsyncIterator, Callable
+from concurrent.futures import Future
+from typing import AsyncIterator, Callable, Set
 from .message import Message
 
 class Client(ABC):
+    # Messages handed to subscription callbacks whose callback has not finished yet
+    pending: Set[Future]
+
     @abstractmethod
     async def connect(self) -> None:
         pass
@@ -18,3 +22,16 @@ class Client(ABC):
     @abstractmethod
     async def subscribe(self, topic: str, callback: Callable) -> AsyncIterator[Message]:
         pass
+
+    @abstractmethod
+    async def publish(self, topic: str, payload: bytes) -> None:
+        pass
+
+    @abstractmethod
+    async def unsubscribe(self, topic: str) -> None:
+        pass
+
+    @abstractmethod
+    async def drain(self) -> None:
+        """Wait for the messages already handed to subscription callbacks to be handled"""
+        pass
@@ -2,6 +2,7 @@ from caqes_core.settings import WorkerSettings
 
 from caqes_core.mq import Client, ClientType
 from caqes_core.mq.mqtt.mqtt_client import MqttClient
+from caqes_core.mq.memory.memory_client import MemoryClient
 
 class ClientFactory:
     @staticmethod
@@ -10,5 +11,7 @@ class ClientFactory:
         match client_type:
             case ClientType.MQTT:
                 return MqttClient(worker_settings)
+            case ClientType.MEMORY:
+                return MemoryClient(worker_settings)
             case _:
                 raise ValueError(f"Unknown client type: {client_type}")
@@ -1,4 +1,5 @@
 from enum import Enum
 
 class ClientType(Enum):
-    MQTT = "MQTT"
\ No newline at end of file
+    MQTT = "MQTT"
+    MEMORY = "MEMORY"
@@ -0,0 +1,107 @@
+import asyncio
+import itertools
+import logging
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Set, Tuple
+from paho.mqtt.client import topic_matches_sub
+
+from caqes_core.settings.worker_settings import WorkerSettings
+from caqes_core.mq.client import Client
+from .memory_message import MemoryMessage
+
+
+class MemoryBroker:
+    """In-process stand-in for an MQTT broker.
+
+    Mirrors broker fan-out semantics: every matching subscription receives a
+    copy of the message, except ``$share/<group>/<filter>`` subscriptions,
+    which are served round-robin within their group.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger("caqes.mq.memory")
+        self._subscribers: List[Tuple["MemoryClient", str, Callable]] = []
+        self._share_cursors: Dict[str, itertools.count] = {}
+
+    def attach(self, client: "MemoryClient", topic: str, callback: Callable) -> None:
+        self._subscribers.append((client, topic, callback))
+
+    def detach(self, client: "MemoryClient", topic: str | None = None) -> None:
+        """Remove a client's subscriptions, or only its subscription to ``topic``."""
+        self._subscribers = [
+            s for s in self._subscribers if s[0] is not client or (topic is not None and s[1] != topic)
+        ]
+
+    def publish(self, topic: str, payload: bytes) -> int:
+        """Deliver a message to matching subscribers, returns the delivery count."""
+        delivered = 0
+        shared: Dict[str, List[Tuple["MemoryClient", Callable]]] = {}
+        for client, sub, callback in self._subscribers:
+            if sub.startswith("$share/"):
+                _, group, sub_filter = sub.split("/", 2)
+                if topic_matches_sub(sub_filter, topic):
+                    shared.setdefault(f"{group}/{sub_filter}", []).append((client, callback))
+            elif topic_matches_sub(sub, topic):
+                client._deliver(callback, MemoryMessage(topic, payload))
+                delivered += 1
+
+        for key, members in shared.items():
+            cursor = self._share_cursors.setdefault(key, itertools.count())
+            client, callback = members[next(cursor) % len(members)]
+            client._deliver(callback, MemoryMessage(topic, payload))
+            delivered += 1
+
+        return delivered
+
+    def pending(self) -> int:
+        """Number of delivered messages whose callback has not finished yet."""
+        return sum(len(client.pending) for client in {s[0] for s in self._subscribers})
+
+
+default_broker = MemoryBroker()
+
+
+class MemoryClient(Client):
+    def __init__(self, settings: WorkerSettings, broker: MemoryBroker | None = None):
+        self.settings = settings
+        self.broker = broker or default_broker
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.subscriptions: List[str] = []
+        self.pending: Set[Future] = set()
+        self._connected = False
+
+    def _deliver(self, callback: Callable, message: MemoryMessage) -> None:
+        if self._connected and self.loop:
+            future = asyncio.run_coroutine_threadsafe(callback(message), self.loop)
+            self.pending.add(future)
+            future.add_done_callback(self.pending.discard)
+
+    async def connect(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self._connected = True
+
+    async def close(self) -> None:
+        self._connected = False
+        self.broker.detach(self)
+
+    async def is_connected(self) -> bool:
+        return self._connected
+
+    async def subscribe(self, topic: str, callback: Callable) -> None:
+        if not await self.is_connected():
+            raise RuntimeError("Not connected to in-memory broker")
+        self.subscriptions.append(topic)
+        self.broker.attach(self, topic, callback)
+
+    async def publish(self, topic: str, payload: bytes) -> None:
+        if not await self.is_connected():
+            raise RuntimeError("Not connected to in-memory broker")
+        self.broker.publish(topic, payload)
+
+    async def unsubscribe(self, topic: str) -> None:
+        if topic in self.subscriptions:
+            self.subscriptions.remove(topic)
+        self.broker.detach(self, topic)
+
+    async def drain(self) -> None:
+        await asyncio.gather(*(asyncio.wrap_future(future) for future in list(self.pending)), return_exceptions=True)
@@ -0,0 +1,22 @@
+from caqes_core.mq.message import Message
+
+class MemoryMessage(Message):
+    def __init__(self, topic: str, payload: bytes):
+        self._topic = topic
+        self._data = payload
+
+    @property
+    def topic(self) -> str:
+        return self._topic
+
+    @property
+    def data(self) -> bytes:
+        return self._data
+
+    async def ack(self) -> None:
+        # Nothing to acknowledge for in-process delivery
+        pass
+
+    async def nak(self) -> None:
+        # Nothing to redeliver for in-process delivery
+        pass
@@ -1,6 +1,15 @@
 from abc import ABC, abstractmethod
 
 class Message(ABC):
+    # Lets subclasses declare slots, one message is alive per alert in flight
+    __slots__ = ()
+
+    @property
+    @abstractmethod
+    def topic(self) -> str:
+        """Return the topic the message was published to"""
+        pass
+
     @property
     @abstractmethod
     def data(self) -> bytes:
@@ -1,7 +1,8 @@
 import asyncio
 import logging
-from typing import Callable, List
-from paho.mqtt.client import Client as MQTTClient, MQTTMessage
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Set
+from paho.mqtt.client import Client as MQTTClient, MQTTMessage, MQTT_ERR_SUCCESS
 
 from caqes_core.settings.worker_settings import WorkerSettings
 from caqes_core.mq.client import Client
@@ -12,14 +13,19 @@ class MqttClient(Client):
     def __init__(self, settings: WorkerSettings):
         self.settings = settings
         self._connect_future: asyncio.Future | None = None
-        self.callback: Callable | None = None
+        self.callbacks: Dict[str, Callable] = {}
         self.loop: asyncio.AbstractEventLoop | None = None
         self.subscriptions : List[str] = []
+        # Messages handed to the event loop whose callback has not finished yet
+        self.pending: Set[Future] = set()
+        # UNSUBACKs awaited, by message id
+        self._unsubscribing: Dict[int, asyncio.Future] = {}
 
         # Set up callbacks
         self.client = MQTTClient()
         self.client.on_connect = self._on_connect
         self.client.on_message = self._on_message
+        self.client.on_unsubscribe = self._on_unsubscribe
 
     def _on_connect(self, client, userdata, flags, rc):
         if rc == 0:
@@ -32,11 +38,31 @@ class MqttClient(Client):
                 )
 
     def _on_message(self, client, userdata, message: MQTTMessage):
-        if self.callback and self.loop:
-            asyncio.run_coroutine_threadsafe(
-                self.callback(MqttMessage(message)),
-                self.loop
-            )
+        # Only reached by messages matching no subscription's callback
+        logging.getLogger("caqes.mq.mqtt").debug(f"Ignoring message on unsubscribed topic {message.topic}")
+
+    def _on_unsubscribe(self, client, userdata, mid, *args):
+        if self.loop:
+            # Looked up on the event loop, where unsubscribe registers the future before it yields
+            self.loop.call_soon_threadsafe(self._unsubscribed, mid)
+
+    def _unsubscribed(self, mid: int) -> None:
+        future = self._unsubscribing.pop(mid, None)
+        if future is not None and not future.done():
+            future.set_result(True)
+
+    @staticmethod
+    def _topic_filter(topic: str) -> str:
+        # Messages of shared subscriptions arrive under the topic filter without its $share/<group>/ prefix
+        return topic.split("/", 2)[2] if topic.startswith("$share/") else topic
+
+    def _dispatcher(self, callback: Callable) -> Callable:
+        def on_message(client, userdata, message: MQTTMessage):
+            if self.loop:
+                future = asyncio.run_coroutine_threadsafe(callback(MqttMessage(message)), self.loop)
+                self.pending.add(future)
+                future.add_done_callback(self.pending.discard)
+        return on_message
 
     async def connect(self) -> None:
         self.loop = asyncio.get_event_loop()
@@ -84,7 +110,7 @@ class MqttClient(Client):
     async def reconnect(self) -> None:
         await self.close()
         await self.connect()
-        # Restore subscriptions
+        # Restore subscriptions, their callbacks are kept by the paho client
         for topic in self.subscriptions:
             self.client.subscribe(topic)
 
@@ -95,4 +121,35 @@ class MqttClient(Client):
             self.client.subscribe(topic)
         except Exception as e:
             raise e
-        self.callback = callback
+        self.client.message_callback_add(self._topic_filter(topic), self._dispatcher(callback))
+        self.callbacks[topic] = callback
+        if topic not in self.subscriptions:
+            self.subscriptions.append(topic)
+
+    async def publish(self, topic: str, payload: bytes) -> None:
+        # Queued for the network loop thread, QoS 1 so the broker stores it once
+        info = self.client.publish(topic, payload, qos=1)
+        if info.rc != MQTT_ERR_SUCCESS:
+            raise RuntimeError(f"Failed to publish to {topic}, error code {info.rc}")
+
+    async def unsubscribe(self, topic: str) -> None:
+        if topic in self.subscriptions:
+            self.subscriptions.remove(topic)
+        acknowledged = asyncio.get_running_loop().create_future()
+        rc, mid = self.client.unsubscribe(topic)
+        if rc != MQTT_ERR_SUCCESS:
+            raise RuntimeError(f"Failed to unsubscribe from {topic}, error code {rc}")
+        self._unsubscribing[mid] = acknowledged
+        try:
+            # The broker sends nothing for the subscription after its UNSUBACK, and the messages
+            # it sent before are dispatched by then, so the callback can go without losing any
+            await asyncio.wait_for(acknowledged, timeout=self.settings.retry_delay)
+        except asyncio.TimeoutError:
+            self._unsubscribing.pop(mid, None)
+            logging.getLogger("caqes.mq.mqtt").warning(f"No UNSUBACK for {topic}, keeping its callback")
+            return
+        self.client.message_callback_remove(self._topic_filter(topic))
+        self.callbacks.pop(topic, None)
+
+    async def drain(self) -> None:
+        await asyncio.gather(*(asyncio.wrap_future(future) for future in list(self.pending)), return_exceptions=True)
@@ -1,12 +1,18 @@
-from typing import Any
 from paho.mqtt.client import MQTTMessage
 from caqes_core.mq.message import Message
 
 class MqttMessage(Message):
+    # Only the topic and payload are kept, the paho message and its properties are freed once dispatched
+    __slots__ = ("_topic", "_data")
+
     def __init__(self, message: MQTTMessage):
-        self._message = message
+        self._topic = message.topic
         self._data = message.payload
 
+    @property
+    def topic(self) -> str:
+        return self._topic
+
     @property
     def data(self) -> bytes:
         return self._data
@@ -1,13 +1,30 @@
-from rule_engine import Rule
+from typing import Any, Dict, Optional
 from caqes_core.models.alert import Alert
 from caqes_core.models.policy import Policy
+from caqes_core.profiling import timed
 
 class PolicyEvaluator:
     def __init__(self, policy_config: Policy):
         self.name = policy_config.name
         self.description = policy_config.description
+        self.ban_duration = policy_config.ban_duration
+        self.actions = policy_config.actions
+        # Imported here as rule_engine is slow to import and only needed once policies are built
+        from rule_engine import Rule
         self.rules = [Rule(rule) for rule in policy_config.rules]
 
-    def evaluate(self, alert: Alert) -> bool:
+    @timed("policy_evaluate")
+    def evaluate(self, alert: Alert, context: Optional[Dict[str, Any]] = None) -> bool:
+        """Match the alert against the policy rules.
+
+        ``context`` adds derived fields, such as the aggregation ``window``,
+        alongside the alert's own fields.
+        """
         alert_dict = alert.model_dump()
-        return any(rule.matches(alert_dict) for rule in self.rules)
+        if context:
+            alert_dict.update(context)
+        return self.matches(alert_dict)
+
+    def matches(self, data: Dict[str, Any]) -> bool:
+        """Match already prepared rule input, so one dump can be shared by many policies."""
+        return any(rule.matches(data) for rule in self.rules)
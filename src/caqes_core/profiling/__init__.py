@@ -0,0 +1,4 @@
+from .stage_timings import StageTimings, stage_timings, timed
+from .profiler import ProfileMode, Profiler
+
+__all__ = ['ProfileMode', 'Profiler', 'StageTimings', 'stage_timings', 'timed']
@@ -0,0 +1,142 @@
+import asyncio
+import cProfile
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from types import CodeType
+from typing import Any, Dict, Optional
+
+from .stage_timings import stage_timings
+
+
+class ProfileMode(Enum):
+    SAMPLING = "sampling"
+    CPROFILE = "cprofile"
+
+
+class Profiler:
+    """Profiles the live process for a fixed window, one window at a time.
+
+    ``sampling`` mode snapshots the stack of every thread, the paho network
+    loop and the dispatch lanes included, every ``interval`` seconds and
+    writes the counts as folded stacks (``.folded``), ready for flamegraph.pl
+    or speedscope. Its cost is bounded by the interval whatever the alert
+    rate. ``cprofile`` mode traces every call on the event loop thread into a
+    pstats file (``.prof``) for snakeviz or ``python -m pstats``, exact but
+    much slower while it runs. Stage timings are recorded during a window
+    even if they are otherwise disabled.
+    """
+
+    def __init__(self, output_dir: str, interval: float = 0.005, max_duration: float = 300.0):
+        self.logger = logging.getLogger("caqes.profiling")
+        self.output_dir = Path(output_dir)
+        self.interval = interval
+        self.max_duration = max_duration
+        self.mode: Optional[ProfileMode] = None
+        self.last_profile: Optional[Path] = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, mode: ProfileMode, seconds: float) -> Path:
+        """Start profiling a window in the background, returns the file it will be written to.
+
+        Raises ValueError for a window outside (0, max_duration] and
+        RuntimeError if a window is already running.
+        """
+        if not 0 < seconds <= self.max_duration:
+            raise ValueError(f"Profile window must be between 0 and {self.max_duration} seconds")
+        if self.running:
+            raise RuntimeError(f"A {self.mode.value} profile is already running")
+        suffix = "folded" if mode == ProfileMode.SAMPLING else "prof"
+        path = self.output_dir / f"caqes-{mode.value}-{datetime.now().strftime('%Y%m%dT%H%M%S')}.{suffix}"
+        self.mode = mode
+        self._task = asyncio.create_task(self._profile(mode, seconds, path))
+        return path
+
+    async def _profile(self, mode: ProfileMode, seconds: float, path: Path) -> None:
+        self.logger.info(f"Profiling for {seconds}s in {mode.value} mode")
+        timings_enabled = stage_timings.enabled
+        stage_timings.enabled = True
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if mode == ProfileMode.SAMPLING:
+                stop = threading.Event()
+                sampling = asyncio.create_task(asyncio.to_thread(self._sample, stop))
+                await self._window(seconds)
+                stop.set()
+                await asyncio.to_thread(self._write_folded, await sampling, path)
+            else:
+                profile = cProfile.Profile()
+                profile.enable()
+                await self._window(seconds)
+                profile.disable()
+                await asyncio.to_thread(profile.dump_stats, str(path))
+            self.last_profile = path
+            self.logger.info(f"Wrote {mode.value} profile to {path}")
+        except Exception as e:
+            self.logger.error(f"Failed to write {mode.value} profile")
+            self.logger.debug(f"Profiling error details: {str(e)}")
+        finally:
+            stage_timings.enabled = timings_enabled
+
+    async def _window(self, seconds: float) -> None:
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            # Stopped early, what was collected so far is still written
+            self.logger.info("Profile window cut short")
+
+    def _sample(self, stop: threading.Event) -> Counter[str]:
+        """Count the stacks of every other thread until ``stop`` is set."""
+        stacks: Counter[str] = Counter()
+        labels: Dict[CodeType, str] = {}
+        own = threading.get_ident()
+        names: Dict[int, str] = {}
+        while not stop.is_set():
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if ident not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+                    frames.append(label)
+                    frame = frame.f_back
+                frames.append(names.get(ident, str(ident)))
+                stacks[";".join(reversed(frames))] += 1
+            time.sleep(self.interval)
+        return stacks
+
+    @staticmethod
+    def _write_folded(stacks: Counter[str], path: Path) -> None:
+        with open(path, "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.mode.value if self.running else None,
+            "last_profile": str(self.last_profile) if self.last_profile else None,
+            "stages": stage_timings.snapshot(),
+        }
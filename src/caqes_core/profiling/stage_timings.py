@@ -0,0 +1,82 @@
+import functools
+import inspect
+import threading
+import time
+from typing import Callable, Dict, List
+
+
+class StageTimings:
+    """Count, total and worst duration of each instrumented stage.
+
+    Nothing is recorded unless ``enabled`` is set. The ``timed`` decorators
+    then only check the flag before calling through, so stages stay
+    instrumented in production at the cost of one attribute lookup per call.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        # Stage -> [count, total seconds, max seconds]
+        self._stats: Dict[str, List[float]] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        # Bans are timed on the dispatch lanes' threads
+        with self._lock:
+            stats = self._stats.get(stage)
+            if stats is None:
+                self._stats[stage] = [1, seconds, seconds]
+                return
+            stats[0] += 1
+            stats[1] += seconds
+            if seconds > stats[2]:
+                stats[2] = seconds
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                stage: {
+                    "count": int(count),
+                    "total_ms": round(total * 1000, 3),
+                    "mean_ms": round(total * 1000 / count, 3),
+                    "max_ms": round(worst * 1000, 3),
+                }
+                for stage, (count, total, worst) in sorted(self._stats.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+stage_timings = StageTimings()
+
+
+def timed(stage: str) -> Callable[[Callable], Callable]:
+    """Decorator recording the duration of each call in ``stage_timings`` while it is enabled."""
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            async def timed_coroutine(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    stage_timings.record(stage, time.perf_counter() - start)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                # Disabled, the coroutine is handed back as is rather than awaited through another frame
+                if not stage_timings.enabled:
+                    return func(*args, **kwargs)
+                return timed_coroutine(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not stage_timings.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    stage_timings.record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
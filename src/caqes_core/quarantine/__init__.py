@@ -1,6 +1,5 @@
 from .network_integration import NetworkIntegration
 from .protocol_integration import ProtocolIntegration
 from .integration_factory import integration_factory
-from . import integrations  # This will trigger auto-discovery
 
 __all__ = ['NetworkIntegration', 'ProtocolIntegration', 'integration_factory']
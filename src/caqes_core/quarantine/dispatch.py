@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from caqes_core.profiling import timed
+from caqes_core.quarantine import NetworkIntegration, ProtocolIntegration
+from caqes_core.settings.dispatch_settings import DispatchSettings
+
+Integration = Union[ProtocolIntegration, NetworkIntegration]
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    Opens after ``threshold`` consecutive failures and rejects calls until
+    ``reset_timeout`` has passed, then lets a single trial call through
+    (half-open). A success closes it again, a failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self.clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self._opened_at is not None or self.failures >= self.threshold:
+            self._opened_at = self.clock()
+
+    def release_trial(self) -> None:
+        """Let another half-open trial through when one ended without an outcome."""
+        self._trial_in_flight = False
+
+
+@dataclass
+class BanJob:
+    ip_address: str
+    reason: Optional[str]
+    expire_at: Optional[str] = None
+    action: Optional[str] = None
+    future: asyncio.Future = field(default=None, repr=False)
+
+
+class IntegrationLane:
+    """Dedicated queue, consumers and thread pool for one integration.
+
+    Each integration is driven independently so a slow or failing one never
+    delays the others: calls run on the lane's own executor, every ban has a
+    deadline covering all of its attempts, a duplicate call can be hedged
+    against a slow one and a circuit breaker fails fast while the
+    integration is down.
+    """
+
+    def __init__(self, integration: Integration, settings: DispatchSettings):
+        self.integration = integration
+        self.name = integration.name
+        self.logger = logging.getLogger(f"caqes.quarantine.dispatch.{self.name}")
+        self.settings = settings
+        self.breaker = CircuitBreaker(settings.breaker_threshold, settings.breaker_reset)
+        self._queue: asyncio.Queue | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._consumers: List[asyncio.Task] = []
+        self.in_flight = 0
+        self.stats: Dict[str, int] = {"succeeded": 0, "failed": 0, "rejected": 0, "hedged": 0, "timeouts": 0}
+        self._timed_ban = timed(f"ban.{self.name}")(self._ban)
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def start(self) -> None:
+        if self._consumers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.settings.queue_size)
+        # Hedged calls may briefly double the threads in use
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.settings.concurrency * 2,
+            thread_name_prefix=f"caqes-{self.name}"
+        )
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.settings.concurrency)]
+
+    async def stop(self) -> None:
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, job: BanJob) -> asyncio.Future:
+        """Queue a ban, the returned future resolves to whether it succeeded."""
+        self.start()
+        job.future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.logger.error(f"Dispatch queue for {self.name} is full, rejecting ban")
+            self.stats["rejected"] += 1
+            job.future.set_result(False)
+        return job.future
+
+    async def _consume(self) -> None:
+        while True:
+            job = await self._queue.get()
+            self.in_flight += 1
+            try:
+                success = await self._execute(job)
+            except Exception as e:
+                self.logger.debug(f"Unexpected dispatch error: {str(e)}")
+                success = False
+            finally:
+                self.in_flight -= 1
+                self._queue.task_done()
+            self.stats["succeeded" if success else "failed"] += 1
+            if not job.future.done():
+                job.future.set_result(success)
+
+    async def _execute(self, job: BanJob) -> bool:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.settings.deadline
+        for attempt in range(self.settings.max_attempts):
+            if not self.breaker.allow():
+                self.logger.warning(f"Circuit open for {self.name}, failing ban fast")
+                self.stats["rejected"] += 1
+                return False
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                success = await asyncio.wait_for(self._hedged_call(job), timeout=remaining)
+            except asyncio.TimeoutError:
+                self.logger.error(f"Ban on {self.name} exceeded its {self.settings.deadline}s deadline")
+                self.stats["timeouts"] += 1
+                self.breaker.record_failure()
+                return False
+            except Exception as e:
+                self.logger.error(f"Exception during {self.name} quarantine")
+                self.logger.debug(f"Quarantine error details: {str(e)}")
+                success = False
+            finally:
+                # A consumer cancelled mid-trial records nothing, which would otherwise leave the breaker stuck half-open
+                self.breaker.release_trial()
+            if success:
+                self.breaker.record_success()
+                return True
+            self.breaker.record_failure()
+            backoff = self.settings.retry_backoff * (2 ** attempt)
+            await asyncio.sleep(min(backoff, max(0.0, deadline - loop.time())))
+        return False
+
+    def _ban(self, job: BanJob) -> bool:
+        # Only routed bans pass an action, so integrations without actions keep working
+        kwargs = {"action": job.action} if job.action else {}
+        return self.integration.ban(ip_address=job.ip_address, reason=job.reason, expire_at=job.expire_at, **kwargs)
+
+    def _call(self, job: BanJob) -> asyncio.Future:
+        return asyncio.get_running_loop().run_in_executor(self._executor, self._timed_ban, job)
+
+    async def _hedged_call(self, job: BanJob) -> bool:
+        first = self._call(job)
+        if self.settings.hedge_after is None:
+            return bool(await first)
+
+        done, _ = await asyncio.wait({first}, timeout=self.settings.hedge_after)
+        if done:
+            return bool(first.result())
+
+        # Bans are idempotent, so race a second call against the slow one
+        self.stats["hedged"] += 1
+        pending = {first, self._call(job)}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for call in done:
+                    if call.exception() is None and call.result():
+                        return True
+                    error = call.exception() or error
+        finally:
+            for call in pending:
+                call.cancel()
+        if error:
+            raise error
+        return False
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.depth,
+            "in_flight": self.in_flight,
+            "circuit_breaker": self.breaker.state,
+            **self.stats,
+            "connections": self.integration.connection_stats(),
+        }
@@ -0,0 +1,41 @@
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class PooledSession(requests.Session):
+    """HTTP session owning a sized, keep-alive connection pool.
+
+    Reusing connections saves a TCP and TLS handshake on every call after the
+    first. Idempotent requests are retried with exponential backoff on
+    connection errors and 429/5xx answers; other methods are only retried when
+    the connection could not be established, so a request is never sent twice.
+    """
+
+    def __init__(self, pool_size: int = 10, retries: int = 3, retry_backoff: float = 0.2, keep_alive: bool = True):
+        super().__init__()
+        retry = Retry(
+            total=retries,
+            backoff_factor=retry_backoff,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+            raise_on_status=False
+        )
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.mount("http://", self.adapter)
+        self.mount("https://", self.adapter)
+        if not keep_alive:
+            self.headers["Connection"] = "close"
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Connections opened, requests sent and idle connections, summed over every host's pool."""
+        manager = self.adapter.poolmanager
+        pools = [manager.pools[key] for key in manager.pools.keys()]
+        return {
+            "pools": len(pools),
+            "connections_opened": sum(pool.num_connections for pool in pools),
+            "requests": sum(pool.num_requests for pool in pools),
+            "idle_connections": sum(1 for pool in pools for conn in list(pool.pool.queue) if conn is not None),
+        }
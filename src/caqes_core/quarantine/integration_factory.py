@@ -1,29 +1,74 @@
+import importlib
 import logging
-from typing import Dict, Type, TypeVar
+from importlib.metadata import entry_points
+from typing import Dict, List, Type, TypeVar
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+# Entry point group for third-party integrations, named "<type>.<name>",
+# e.g. ``protocol.mosquitto = "caqes_mosquitto:MosquittoIntegration"``
+ENTRY_POINT_GROUP = "caqes.integrations"
+
 class IntegrationFactory:
-    """Generic factory for quarantine modules."""
+    """Generic factory for quarantine modules.
+
+    Integration modules are imported lazily, only when ``create`` is first
+    asked for their type, from the built-in manifest or an entry point.
+    """
     
     def __init__(self):
         self._registry: Dict[str, Dict[str, Type[T]]] = {
             "protocol": {},
             "network": {}
         }
+        self._entry_points: Dict[str, Dict[str, object]] | None = None
         
     def register(self, type_: str, name: str):
         """Decorator to register a quarantine module."""
         def decorator(subclass):
+            subclass.name = name
             self._registry[type_][name] = subclass
             logger.debug(f"Registering {type_} module: {name} -> {subclass.__name__}")
             return subclass
         return decorator
 
+    def _discovered(self) -> Dict[str, Dict[str, object]]:
+        if self._entry_points is None:
+            self._entry_points = {type_: {} for type_ in self._registry}
+            for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+                type_, _, name = entry_point.name.partition(".")
+                if type_ in self._entry_points and name:
+                    self._entry_points[type_][name] = entry_point
+        return self._entry_points
+
+    def _load(self, type_: str, module_type: str) -> None:
+        from caqes_core.quarantine.integrations import MANIFEST
+
+        module = MANIFEST.get((type_, module_type))
+        if module is not None:
+            importlib.import_module(module)
+            logger.debug(f"Loaded {type_} integration: {module_type}")
+            return
+        entry_point = self._discovered()[type_].get(module_type)
+        if entry_point is not None:
+            subclass = entry_point.load()
+            if module_type not in self._registry[type_]:
+                self.register(type_, module_type)(subclass)
+            logger.debug(f"Loaded {type_} integration {module_type} from {entry_point.value}")
+
+    def available(self, type_: str) -> List[str]:
+        """Names of the integrations that can be created, without importing them."""
+        from caqes_core.quarantine.integrations import MANIFEST
+
+        names = {name for manifest_type, name in MANIFEST if manifest_type == type_}
+        return sorted(names | self._registry[type_].keys() | self._discovered()[type_].keys())
+
     def create(self, type_: str, module_type: str, **kwargs) -> T:
         """Factory method to create a module instance."""
+        if module_type not in self._registry[type_]:
+            self._load(type_, module_type)
         if module_type not in self._registry[type_]:
             raise ValueError(f"Unknown {type_} quarantine module: {module_type}")
         return self._registry[type_][module_type](**kwargs)
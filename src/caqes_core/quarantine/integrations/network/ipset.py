@@ -0,0 +1,44 @@
+from typing import List, Optional, Set
+from caqes_core.quarantine import integration_factory
+from caqes_core.quarantine.integrations.network.local_firewall import LocalFirewallIntegration
+
+SET_TYPES = {"ip4": "hash:ip family inet", "ip6": "hash:ip family inet6", "mac": "hash:mac"}
+
+
+@integration_factory.register("network", "ipset")
+class IpsetIntegration(LocalFirewallIntegration):
+    """Quarantine into ipset sets on the local host.
+
+    Bans are added with ``ipset restore``, one per batch. ipset does not
+    filter by itself, the sets are matched by the host's iptables rules, e.g.
+    ``iptables -I FORWARD -m set --match-set caqes_ip4 src -j DROP``.
+    """
+
+    def __init__(self, set_prefix: str = "caqes", ipset: str = "ipset", timeout: float = 5,
+                 max_tracked_bans: int = 10_000):
+        super().__init__(ipset, timeout, max_tracked_bans)
+        self.sets = {kind: f"{set_prefix}_{kind}" for kind in SET_TYPES}
+
+    def _setup_lines(self) -> List[str]:
+        # A default timeout of 0 lets each entry carry its own, or none
+        return [f"create {self.sets[kind]} {set_type} timeout 0" for kind, set_type in SET_TYPES.items()]
+
+    def _add_lines(self, entry: str, kind: str, timeout: Optional[int]) -> List[str]:
+        return [f"add {self.sets[kind]} {entry} timeout {timeout or 0}"]
+
+    def _commit(self, lines: List[str]) -> None:
+        # -exist makes creating an existing set and re-adding an entry no-ops
+        self._run(["-exist", "restore"], input="\n".join(lines) + "\n")
+
+    def _delete(self, entry: str, kind: str) -> None:
+        self._run(["-exist", "del", self.sets[kind], entry])
+
+    def _entries(self) -> Set[str]:
+        entries: Set[str] = set()
+        for kind, name in self.sets.items():
+            for line in self._run(["save", name]).splitlines():
+                parts = line.split()
+                if len(parts) >= 3 and parts[0] == "add":
+                    # ipset prints MACs in upper case, bans and list_banned use lower case
+                    entries.add(parts[2].lower() if kind == "mac" else parts[2])
+        return entries
@@ -0,0 +1,220 @@
+import ipaddress
+import logging
+import re
+import subprocess
+import threading
+from collections import OrderedDict
+from abc import abstractmethod
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Sequence, Set, Tuple
+from caqes_core.quarantine import NetworkIntegration
+
+MAC_PATTERN = re.compile(r"^([0-9a-f]{2}[:-]){5}[0-9a-f]{2}$", re.IGNORECASE)
+LLADDR_PATTERN = re.compile(r"\blladdr\s+(([0-9a-f]{2}:){5}[0-9a-f]{2})\b", re.IGNORECASE)
+
+
+class CommandBatcher:
+    """Group commit for firewall updates submitted from several threads.
+
+    The first caller commits its lines straight away; lines submitted while
+    that commit runs are written together by the next one, so concurrent bans
+    share a single transaction. A failed commit fails every ban in it.
+    """
+
+    def __init__(self, commit: Callable[[List[str]], None]):
+        self._commit = commit
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[List[str], Future]] = []
+        self._committing = False
+        self.commits = 0
+
+    def submit(self, lines: List[str]) -> None:
+        """Commit the lines, returns once they are applied and raises if the commit failed."""
+        future: Future = Future()
+        with self._lock:
+            self._pending.append((lines, future))
+            leader = not self._committing
+            self._committing = True
+        if leader:
+            self._drain()
+        future.result()
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                if not batch:
+                    self._committing = False
+                    return
+            try:
+                self._commit([line for lines, _ in batch for line in lines])
+                self.commits += 1
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for _, future in batch:
+                    future.set_result(None)
+
+
+class LocalFirewallIntegration(NetworkIntegration):
+    """Base for integrations that ban into kernel sets of the host CAQES runs on.
+
+    IPv4, IPv6 and MAC entries each go to their own set. Bans are written
+    through a CommandBatcher, and expiring bans carry a kernel timeout so they
+    lapse even if CAQES is not running to lift them. The entry used to ban
+    each IP is remembered for the last ``max_tracked_bans`` bans, older ones
+    fall back to the address.
+    """
+
+    # "ip" adds the source address, "mac" its MAC from the neighbour table, falling back to the address
+    actions = ("ip", "mac")
+
+    def __init__(self, command: str, timeout: float = 5, max_tracked_bans: int = 10_000):
+        self.logger = logging.getLogger(f"caqes.quarantine.{self.name or 'firewall'}")
+        self.command = command
+        self.timeout = timeout  # Timeout for commands in seconds
+        self._batcher = CommandBatcher(self._commit)
+        self._ready = False
+        self._setup_lock = threading.Lock()
+        self.max_tracked_bans = max_tracked_bans
+        self._banned_content: OrderedDict[str, Tuple[str, str]] = OrderedDict()  # IP -> (entry, kind) used to ban it
+        self._banned_lock = threading.Lock()
+
+    def _run(self, args: Sequence[str], input: Optional[str] = None) -> str:
+        """Run the firewall command, returns its output and raises RuntimeError if it fails."""
+        try:
+            result = subprocess.run(
+                [self.command, *args], input=input, capture_output=True, text=True, timeout=self.timeout)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise RuntimeError(f"Failed to run {self.command}: {str(e)}") from e
+        if result.returncode != 0:
+            raise RuntimeError(f"{self.command} {' '.join(args[:2])} failed: {result.stderr.strip()}")
+        return result.stdout
+
+    def _neighbour_mac(self, ip_address: str) -> Optional[str]:
+        """Look up the MAC address of an IP in the kernel neighbour table."""
+        try:
+            result = subprocess.run(
+                ["ip", "neigh", "show", "to", ip_address], capture_output=True, text=True, timeout=self.timeout)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            self.logger.debug(f"Neighbour lookup error details: {str(e)}")
+            return None
+        match = LLADDR_PATTERN.search(result.stdout)
+        return match.group(1).lower() if match else None
+
+    @staticmethod
+    def _kind(entry: str) -> str:
+        """Set an entry belongs to: ip4, ip6 or mac."""
+        if MAC_PATTERN.match(entry):
+            return "mac"
+        return "ip4" if ipaddress.ip_address(entry).version == 4 else "ip6"
+
+    @staticmethod
+    def _seconds_left(expire_at: Optional[str]) -> Optional[int]:
+        if not expire_at:
+            return None
+        expires = datetime.fromisoformat(expire_at)
+        if expires.tzinfo is None:
+            expires = expires.replace(tzinfo=timezone.utc)
+        return int((expires - datetime.now(timezone.utc)).total_seconds())
+
+    def _ensure_sets(self) -> None:
+        if self._ready:
+            return
+        with self._setup_lock:
+            if not self._ready:
+                self._commit(self._setup_lines())
+                self._ready = True
+
+    @abstractmethod
+    def _setup_lines(self) -> List[str]:
+        """Commands creating the sets, and any rules using them, idempotently."""
+        pass
+
+    @abstractmethod
+    def _add_lines(self, entry: str, kind: str, timeout: Optional[int]) -> List[str]:
+        pass
+
+    @abstractmethod
+    def _commit(self, lines: List[str]) -> None:
+        """Apply the commands in a single transaction."""
+        pass
+
+    @abstractmethod
+    def _delete(self, entry: str, kind: str) -> None:
+        """Remove an entry, succeeding if it is already gone."""
+        pass
+
+    @abstractmethod
+    def _entries(self) -> Set[str]:
+        """Every entry of the quarantine sets."""
+        pass
+
+    def ban(self, ip_address: str, reason: str, expire_at: Optional[str] = None, action: Optional[str] = None) -> bool:
+        self.logger.info("Starting network ban operation")
+        entry = str(ipaddress.ip_address(ip_address))
+        if action == "mac":
+            mac = self._neighbour_mac(entry)
+            if mac:
+                entry = mac
+            else:
+                self.logger.warning("MAC resolution failed, falling back to IP ban")
+        timeout = self._seconds_left(expire_at)
+        if timeout is not None and timeout <= 0:
+            self.logger.info("Ban has already expired, nothing to add")
+            return True
+        kind = self._kind(entry)
+        self._ensure_sets()
+        self._batcher.submit(self._add_lines(entry, kind, timeout))
+        with self._banned_lock:
+            self._banned_content[ip_address] = (entry, "mac" if kind == "mac" else "ip")
+            self._banned_content.move_to_end(ip_address)
+            while len(self._banned_content) > self.max_tracked_bans:
+                self._banned_content.popitem(last=False)
+        self.logger.info("Network ban operation completed successfully")
+        return True
+
+    def ban_target(self, ip_address: str) -> Tuple[str, str]:
+        with self._banned_lock:
+            return self._banned_content.get(ip_address, (ip_address, "ip"))
+
+    def unban(self, identifier: str, identifier_type: str) -> bool:
+        if identifier_type not in ["ip", "mac"]:
+            return False
+        self.logger.info(f"Starting network unban operation for {identifier_type}")
+        try:
+            self._delete(identifier, self._kind(identifier))
+        except (RuntimeError, ValueError) as e:
+            self.logger.error("Network unban operation failed")
+            self.logger.debug(f"Unban operation error details: {str(e)}")
+            return False
+        with self._banned_lock:
+            for ip in [ip for ip, (entry, _) in self._banned_content.items() if entry == identifier]:
+                del self._banned_content[ip]
+        return True
+
+    def list_banned(self) -> Set[Tuple[str, str]]:
+        return {
+            (entry.lower(), "mac") if MAC_PATTERN.match(entry) else (entry, "ip")
+            for entry in self._entries()
+        }
+
+    def is_banned(self, identifier: str, identifier_type: str) -> bool:
+        if identifier_type not in ["ip", "mac"]:
+            return False
+        try:
+            return (identifier.lower() if identifier_type == "mac" else identifier) in self._entries()
+        except RuntimeError as e:
+            self.logger.debug(f"Failed to list quarantine sets: {str(e)}")
+            return False
+
+    def health_check(self) -> bool:
+        try:
+            self._ensure_sets()
+            self._entries()
+            return True
+        except RuntimeError as e:
+            self.logger.debug(f"Health check failed: {str(e)}")
+            return False
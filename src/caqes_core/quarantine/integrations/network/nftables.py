@@ -0,0 +1,74 @@
+import json
+from typing import Any, Dict, List, Optional, Set
+from caqes_core.quarantine import integration_factory
+from caqes_core.quarantine.integrations.network.local_firewall import LocalFirewallIntegration
+
+SET_TYPES = {"ip4": "ipv4_addr", "ip6": "ipv6_addr", "mac": "ether_addr"}
+MATCHES = {"ip4": "ip saddr", "ip6": "ip6 saddr", "mac": "ether saddr"}
+
+
+@integration_factory.register("network", "nftables")
+class NftablesIntegration(LocalFirewallIntegration):
+    """Quarantine into nftables sets on the local host.
+
+    Bans are added with ``nft -f`` scripts, one per batch. Unless
+    ``manage_rules`` is off, a base chain on ``hook`` drops traffic from the
+    sets; otherwise the sets are left for the operator's own ruleset.
+    """
+
+    def __init__(self, table: str = "caqes", family: str = "inet", set_prefix: str = "quarantine",
+                 hook: str = "forward", priority: int = -10, manage_rules: bool = True,
+                 nft: str = "nft", timeout: float = 5, max_tracked_bans: int = 10_000):
+        super().__init__(nft, timeout, max_tracked_bans)
+        self.table = table
+        self.family = family
+        self.hook = hook
+        self.priority = priority
+        self.manage_rules = manage_rules
+        self.sets = {kind: f"{set_prefix}_{kind}" for kind in SET_TYPES}
+
+    def _setup_lines(self) -> List[str]:
+        lines = [f"add table {self.family} {self.table}"]
+        for kind, set_type in SET_TYPES.items():
+            lines.append(f"add set {self.family} {self.table} {self.sets[kind]} {{ type {set_type}; flags timeout; }}")
+        if self.manage_rules:
+            chain = f"{self.family} {self.table} {self.hook}"
+            lines += [
+                f"add chain {chain} {{ type filter hook {self.hook} priority {self.priority}; policy accept; }}",
+                # Replaced as a whole in the same transaction, so restarts do not duplicate rules
+                f"flush chain {chain}",
+            ]
+            lines += [f"add rule {chain} {MATCHES[kind]} @{self.sets[kind]} drop" for kind in SET_TYPES]
+        return lines
+
+    def _add_lines(self, entry: str, kind: str, timeout: Optional[int]) -> List[str]:
+        element = f"{entry} timeout {timeout}s" if timeout else entry
+        return [f"add element {self.family} {self.table} {self.sets[kind]} {{ {element} }}"]
+
+    def _commit(self, lines: List[str]) -> None:
+        self._run(["-f", "-"], input="\n".join(lines) + "\n")
+
+    def _delete(self, entry: str, kind: str) -> None:
+        try:
+            self._run(["delete", "element", self.family, self.table, self.sets[kind], f"{{ {entry} }}"])
+        except RuntimeError as e:
+            # Already lifted, or lapsed through its kernel timeout
+            if "No such file or directory" not in str(e):
+                raise
+
+    @staticmethod
+    def _element_value(element: Any) -> Optional[str]:
+        if isinstance(element, dict):
+            element = element.get("elem", {}).get("val")
+        return element if isinstance(element, str) else None
+
+    def _entries(self) -> Set[str]:
+        entries: Set[str] = set()
+        for name in self.sets.values():
+            listing: Dict[str, Any] = json.loads(self._run(["-j", "list", "set", self.family, self.table, name]))
+            for item in listing.get("nftables", []):
+                for element in item.get("set", {}).get("elem", []):
+                    value = self._element_value(element)
+                    if value:
+                        entries.add(value)
+        return entries
@@ -1,20 +1,40 @@
 import logging
-from typing import Optional
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
 import requests
 from caqes_core.quarantine import NetworkIntegration, integration_factory
+from caqes_core.quarantine.http_session import PooledSession
+
+MAC_PATTERN = re.compile(r"^([0-9a-f]{2}[:-]){5}[0-9a-f]{2}$", re.IGNORECASE)
 
 @integration_factory.register("network", "opnsense")
 class OPNSenseIntegration(NetworkIntegration):
-    """OPNSense Quarantine Module"""
+    """OPNSense Quarantine Module
+
+    The alias entry used to ban each IP is remembered for the last
+    ``max_tracked_bans`` bans, older ones fall back to the address.
+    """
+
+    # "mac" adds the device's MAC to the alias, falling back to its IP, "ip" adds the IP directly
+    actions = ("mac", "ip")
 
-    def __init__(self, base_url: str, api_key: str, api_secret: str):
+    def __init__(self, base_url: str, api_key: str, api_secret: str, timeout: float = 5,
+                 pool_size: int = 10, retries: int = 3, retry_backoff: float = 0.2, keep_alive: bool = True,
+                 max_tracked_bans: int = 10_000):
         """Initialize the OPNSense quarantine module with API credentials."""
         self.logger = logging.getLogger("caqes.quarantine.opnsense")
         self.base_url = base_url.rstrip('/')  # Ensure no trailing slash
         self.auth = (api_key, api_secret)
         self.headers = {"Content-Type": "application/json"}
-        self.timeout = 5  # Timeout for requests in seconds
+        self.timeout = timeout  # Timeout for requests in seconds
+        self.session = PooledSession(pool_size=pool_size, retries=retries, retry_backoff=retry_backoff, keep_alive=keep_alive)
         self.alias_name = "quarantine_iot"  # Define alias name as a class attribute
+        self.max_tracked_bans = max_tracked_bans
+        self._banned_content: OrderedDict[str, str] = OrderedDict()  # IP -> alias entry used to ban it
+        # Bans and unbans run on several dispatch threads
+        self._banned_lock = threading.Lock()
 
     def _get_mac_from_ip(self, ip_address: str) -> str:
         """Fetch MAC address for a given IP using ARP or DHCP leases."""
@@ -22,7 +42,7 @@ class OPNSenseIntegration(NetworkIntegration):
         try:
             # Try ARP table first
             arp_url = f"{self.base_url}/api/diagnostics/interface/getArp"
-            arp_response = requests.get(arp_url, auth=self.auth, headers=self.headers, timeout=self.timeout)
+            arp_response = self.session.get(arp_url, auth=self.auth, headers=self.headers, timeout=self.timeout)
             arp_response.raise_for_status()
             arp_data = arp_response.json()
             
@@ -35,7 +55,7 @@ class OPNSenseIntegration(NetworkIntegration):
             
             # Fallback to DHCP leases
             dhcp_url = f"{self.base_url}/api/dhcpv4/leases/searchLease"
-            dhcp_response = requests.get(dhcp_url, auth=self.auth, headers=self.headers, timeout=self.timeout)
+            dhcp_response = self.session.get(dhcp_url, auth=self.auth, headers=self.headers, timeout=self.timeout)
             dhcp_response.raise_for_status()
             dhcp_data = dhcp_response.json()
             
@@ -55,7 +75,7 @@ class OPNSenseIntegration(NetworkIntegration):
         """Check if the quarantine_iot alias exists by name."""
         try:
             get_url = f"{self.base_url}/api/firewall/alias/getAliasUUID/?name={self.alias_name}"
-            response = requests.get(get_url, auth=self.auth, headers=self.headers, timeout=self.timeout)
+            response = self.session.get(get_url, auth=self.auth, headers=self.headers, timeout=self.timeout)
             response.raise_for_status()
             return bool(response.json().get('uuid'))  # UUID present means alias exists
         except requests.RequestException as e:
@@ -75,7 +95,7 @@ class OPNSenseIntegration(NetworkIntegration):
         }
         try:
             add_url = f"{self.base_url}/api/firewall/alias/addItem"
-            response = requests.post(
+            response = self.session.post(
                 add_url,
                 auth=self.auth,
                 headers=self.headers,
@@ -106,7 +126,7 @@ class OPNSenseIntegration(NetworkIntegration):
                 }
             }
             alias_url = f"{self.base_url}/api/firewall/alias/set"
-            response = requests.post(
+            response = self.session.post(
                 alias_url,
                 auth=self.auth,
                 headers=self.headers,
@@ -124,7 +144,7 @@ class OPNSenseIntegration(NetworkIntegration):
         self.logger.info("Applying firewall rule changes")
         try:
             apply_url = f"{self.base_url}/api/firewall/filter/apply"
-            response = requests.post(
+            response = self.session.post(
                 apply_url,
                 auth=self.auth,
                 headers=self.headers,
@@ -136,22 +156,27 @@ class OPNSenseIntegration(NetworkIntegration):
         except requests.RequestException as e:
             raise RuntimeError(f"Failed to apply firewall changes: {str(e)}") from e
 
-    def ban(self, ip_address: str, reason: str, expire_at: Optional[str] = None) -> bool:
+    def ban(self, ip_address: str, reason: str, expire_at: Optional[str] = None, action: Optional[str] = None) -> bool:
         """Ban a device by MAC address, falling back to IP if MAC retrieval fails."""
         self.logger.info("Starting network ban operation")
-        try:
-            # Try to ban by MAC address first
-            self.logger.debug(f"Attempting to resolve MAC for IP {ip_address}")
-            content = self._get_mac_from_ip(ip_address)
-            self.logger.info("Successfully resolved MAC address")
-            self.logger.debug(f"Found MAC {content} for IP {ip_address}")
-            description = f"Quarantined MAC for IP {ip_address}: {reason}"
-            
-        except (ValueError, RuntimeError) as e:
-            self.logger.warning("MAC resolution failed, falling back to IP ban")
-            self.logger.debug(f"MAC resolution error: {str(e)}")
+        if action == "ip":
+            # Saves the ARP and DHCP lookups when the policy asks for an IP ban
             content = ip_address
             description = f"Quarantined IP: {reason}"
+        else:
+            try:
+                # Try to ban by MAC address first
+                self.logger.debug(f"Attempting to resolve MAC for IP {ip_address}")
+                content = self._get_mac_from_ip(ip_address)
+                self.logger.info("Successfully resolved MAC address")
+                self.logger.debug(f"Found MAC {content} for IP {ip_address}")
+                description = f"Quarantined MAC for IP {ip_address}: {reason}"
+
+            except (ValueError, RuntimeError) as e:
+                self.logger.warning("MAC resolution failed, falling back to IP ban")
+                self.logger.debug(f"MAC resolution error: {str(e)}")
+                content = ip_address
+                description = f"Quarantined IP: {reason}"
 
         try:
             # Add to quarantine alias
@@ -161,17 +186,106 @@ class OPNSenseIntegration(NetworkIntegration):
                 self.logger.error("Failed to update quarantine alias")
                 raise RuntimeError(f"Failed to update quarantine alias")
 
-            # Apply firewall changes
-            self.logger.info("Applying firewall changes")
-            apply_success = self._apply_firewall_changes()
-            if not apply_success:
-                self.logger.error("Failed to apply firewall changes")
-                raise RuntimeError("Failed to apply firewall changes")
+            # Apply firewall changes, unless the apply is batched by the caller
+            if not self.defer_apply:
+                self.logger.info("Applying firewall changes")
+                apply_success = self._apply_firewall_changes()
+                if not apply_success:
+                    self.logger.error("Failed to apply firewall changes")
+                    raise RuntimeError("Failed to apply firewall changes")
 
             self.logger.info("Network ban operation completed successfully")
+            with self._banned_lock:
+                self._banned_content[ip_address] = content
+                self._banned_content.move_to_end(ip_address)
+                while len(self._banned_content) > self.max_tracked_bans:
+                    self._banned_content.popitem(last=False)
             return True
 
         except Exception as e:
             self.logger.error("Network ban operation failed")
             self.logger.debug(f"Ban operation error details: {str(e)}")
             raise e
+
+    def health_check(self) -> bool:
+        try:
+            self._alias_exists()
+            return True
+        except RuntimeError as e:
+            self.logger.debug(f"Health check failed: {str(e)}")
+            return False
+
+    def connection_stats(self) -> Dict[str, int]:
+        return self.session.pool_stats()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def apply_changes(self) -> bool:
+        return self._apply_firewall_changes()
+
+    def ban_target(self, ip_address: str) -> Tuple[str, str]:
+        with self._banned_lock:
+            content = self._banned_content.get(ip_address, ip_address)
+        return (content, "ip") if content == ip_address else (content.lower(), "mac")
+
+    def _alias_entries(self, page_size: int = 500) -> Set[str]:
+        """Fetch the current entries of the quarantine alias table, page by page."""
+        list_url = f"{self.base_url}/api/firewall/alias_util/list/{self.alias_name}"
+        entries: Set[str] = set()
+        page = 1
+        while True:
+            response = self.session.get(
+                list_url,
+                params={"current": page, "rowCount": page_size},
+                auth=self.auth,
+                headers=self.headers,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            body = response.json()
+            rows = body.get("rows", [])
+            entries.update(row["ip"] for row in rows if row.get("ip"))
+            if not rows or len(rows) < page_size or page * page_size >= int(body.get("total", 0)):
+                return entries
+            page += 1
+
+    def list_banned(self) -> Set[Tuple[str, str]]:
+        return {
+            (entry.lower(), "mac") if MAC_PATTERN.match(entry) else (entry, "ip")
+            for entry in self._alias_entries()
+        }
+
+    def unban(self, identifier: str, identifier_type: str) -> bool:
+        """Remove a MAC or IP address from the quarantine alias."""
+        if identifier_type not in ["ip", "mac"]:
+            return False
+        self.logger.info(f"Starting network unban operation for {identifier_type}")
+        try:
+            delete_url = f"{self.base_url}/api/firewall/alias_util/delete/{self.alias_name}"
+            response = self.session.post(
+                delete_url,
+                auth=self.auth,
+                headers=self.headers,
+                json={"address": identifier},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            with self._banned_lock:
+                for ip in [ip for ip, content in self._banned_content.items() if content == identifier]:
+                    del self._banned_content[ip]
+            return True
+        except requests.RequestException as e:
+            self.logger.error("Network unban operation failed")
+            self.logger.debug(f"Unban operation error details: {str(e)}")
+            return False
+
+    def is_banned(self, identifier: str, identifier_type: str) -> bool:
+        """Check whether a MAC or IP address is present in the quarantine alias."""
+        if identifier_type not in ["ip", "mac"]:
+            return False
+        try:
+            return identifier in self._alias_entries()
+        except requests.RequestException as e:
+            self.logger.debug(f"Failed to list quarantine alias: {str(e)}")
+            return False
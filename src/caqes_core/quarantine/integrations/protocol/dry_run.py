@@ -0,0 +1,34 @@
+import logging
+from typing import Dict, Optional, Set, Tuple
+from caqes_core.quarantine import ProtocolIntegration, integration_factory
+
+
+@integration_factory.register("protocol", "dryrun")
+class DryRunIntegration(ProtocolIntegration):
+    """Integration that records bans in memory instead of applying them."""
+
+    actions = ("peerhost", "clientid")
+
+    def __init__(self):
+        self.logger = logging.getLogger("caqes.quarantine.dryrun")
+        self.banned: Set[Tuple[str, str]] = set()
+        self._banned_as: Dict[str, str] = {}
+
+    def ban(self, ip_address: str, reason: str, expire_at: Optional[str] = None, action: Optional[str] = None) -> bool:
+        self.logger.info(f"Would ban {ip_address} by {action or 'peerhost'}: {reason}")
+        self._banned_as[ip_address] = action or "peerhost"
+        self.banned.add(self.ban_target(ip_address))
+        return True
+
+    def ban_target(self, ip_address: str) -> Tuple[str, str]:
+        return ip_address, self._banned_as.get(ip_address, "peerhost")
+
+    def unban(self, identifier: str, identifier_type: str) -> bool:
+        self.banned.discard((identifier, identifier_type))
+        return True
+
+    def is_banned(self, identifier: str, identifier_type: str) -> bool:
+        return (identifier, identifier_type) in self.banned
+
+    def list_banned(self) -> Set[Tuple[str, str]]:
+        return set(self.banned)
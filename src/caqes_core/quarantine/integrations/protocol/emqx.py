@@ -1,26 +1,143 @@
 import requests
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import quote
 import logging
 from caqes_core.quarantine import ProtocolIntegration, integration_factory
+from caqes_core.quarantine.http_session import PooledSession
 
 
 @integration_factory.register("protocol", "emqx")
 class EMQXIntegration(ProtocolIntegration):
-    """Protocol quarantine module for EMQX MQTT broker."""
+    """Protocol quarantine module for EMQX MQTT broker.
 
-    def __init__(self, base_url: str, api_key: str, api_secret: str):
+    Client ID bans resolve the source IP through a snapshot of the connected
+    clients indexed by IP. The snapshot is reused for ``client_cache_ttl``
+    seconds; refreshes in between full ones, every ``client_full_refresh``
+    seconds, only fetch clients that connected since the previous refresh.
+    The entries used to ban each IP are remembered for the last
+    ``max_tracked_bans`` bans, older ones fall back to a peerhost ban.
+    """
+
+    actions = ("peerhost", "clientid")
+
+    def __init__(self, base_url: str, api_key: str, api_secret: str, timeout: float = 5,
+                 client_cache_ttl: float = 10, client_full_refresh: float = 300,
+                 pool_size: int = 10, retries: int = 3, retry_backoff: float = 0.2, keep_alive: bool = True,
+                 max_tracked_bans: int = 10_000):
         self.logger = logging.getLogger("caqes.quarantine.emqx")
         self.base_url = base_url.rstrip('/')
         self.auth = (api_key, api_secret)
         self.by = 'caqes'
+        self.timeout = timeout  # Timeout for requests in seconds
+        self.session = PooledSession(pool_size=pool_size, retries=retries, retry_backoff=retry_backoff, keep_alive=keep_alive)
+        self.client_cache_ttl = client_cache_ttl
+        self.client_full_refresh = client_full_refresh
+        self.max_tracked_bans = max_tracked_bans
+        self._banned_as: OrderedDict[str, List[Tuple[str, str]]] = OrderedDict()  # IP -> (who, as) entries used to ban it
+        # Bans and unbans run on several dispatch threads
+        self._banned_lock = threading.Lock()
+        self._clients: Dict[str, Dict[str, Any]] = {}  # Client ID -> client info
+        self._clients_by_ip: Dict[str, Set[str]] = {}
+        self._index_lock = threading.Lock()
+        # Held for a whole refresh so concurrent bans share a single fetch
+        self._refresh_lock = threading.Lock()
+        self._refreshed_at: float | None = None
+        self._full_refreshed_at: float | None = None
+        self._synced_at: datetime | None = None
 
-    def ban(self, ip_address: str, reason: str, expire_at: Optional[str] = None) -> bool:
-        self.logger.info("Starting ban operation")
-        self.logger.info(f"Ban details - IP: {ip_address}, Reason: {reason}")
+    def _iter_pages(self, path: str, params: Optional[Dict[str, Any]] = None, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """Page through an EMQX list endpoint."""
+        page = 1
+        while True:
+            response = self.session.get(
+                f"{self.base_url}{path}", params={**(params or {}), "page": page, "limit": page_size},
+                auth=self.auth, timeout=self.timeout)
+            response.raise_for_status()
+            body = response.json()
+            yield from body.get("data", [])
+            if not body.get("meta", {}).get("hasnext"):
+                return
+            page += 1
 
-        ban_method = 'peerhost'
-        ban_object = ip_address
+    def _index_client(self, client: Dict[str, Any]) -> None:
+        client_id, ip = client.get("clientid"), client.get("ip_address")
+        if not client_id or not ip:
+            return
+        with self._index_lock:
+            previous = self._clients.get(client_id)
+            if previous and previous["ip"] != ip:
+                # Reconnected from another address
+                self._clients_by_ip.get(previous["ip"], set()).discard(client_id)
+            self._clients[client_id] = {
+                "clientid": client_id,
+                "ip": ip,
+                "connected": client.get("connected", True),
+                "connected_at": client.get("connected_at")
+            }
+            self._clients_by_ip.setdefault(ip, set()).add(client_id)
+
+    def _forget_client(self, client_id: str) -> None:
+        with self._index_lock:
+            client = self._clients.pop(client_id, None)
+            if client:
+                self._clients_by_ip.get(client["ip"], set()).discard(client_id)
+
+    def refresh_clients(self, force: bool = False) -> None:
+        """Bring the snapshot of connected clients up to date, unless it is recent enough."""
+        with self._refresh_lock:
+            now = time.monotonic()
+            if not force and self._refreshed_at is not None and now - self._refreshed_at < self.client_cache_ttl:
+                return
+            started = datetime.now(timezone.utc)
+            full = force or self._full_refreshed_at is None or now - self._full_refreshed_at >= self.client_full_refresh
+            params: Dict[str, Any] = {"conn_state": "connected"}
+            if not full:
+                # Overlap the previous refresh so clients connecting during it are not missed
+                params["gte_connected_at"] = (self._synced_at - timedelta(seconds=1)).isoformat()
+            clients = list(self._iter_pages("/clients", params, page_size=500))
+            if full:
+                # Drops clients that disconnected since the last full refresh
+                with self._index_lock:
+                    self._clients, self._clients_by_ip = {}, {}
+                self._full_refreshed_at = now
+            for client in clients:
+                self._index_client(client)
+            self._refreshed_at, self._synced_at = now, started
+            self.logger.debug(f"Refreshed {'all' if full else 'new'} clients, {len(clients)} fetched")
+
+    def client_ids(self, ip_address: str) -> List[str]:
+        """Return the IDs of the clients connected from an IP, from the snapshot where possible."""
+        try:
+            self.refresh_clients()
+        except requests.RequestException as e:
+            self.logger.warning("Failed to refresh EMQX clients, using the previous snapshot")
+            self.logger.debug(f"Client refresh error details: {str(e)}")
+        with self._index_lock:
+            client_ids = sorted(self._clients_by_ip.get(ip_address, ()))
+        if client_ids:
+            return client_ids
+        # Connected after the last refresh, ask for this IP alone
+        try:
+            for client in self._iter_pages("/clients", {"ip_address": ip_address, "conn_state": "connected"}):
+                self._index_client(client)
+        except requests.RequestException as e:
+            self.logger.debug(f"Client lookup error details: {str(e)}")
+        with self._index_lock:
+            return sorted(self._clients_by_ip.get(ip_address, ()))
+
+    def get_client_info(self, ip: str) -> Optional[Dict[str, Any]]:
+        client_ids = self.client_ids(ip)
+        if not client_ids:
+            return None
+        with self._index_lock:
+            client = self._clients.get(client_ids[0])
+            return dict(client) if client else None
 
+    def _post_ban(self, ban_method: str, ban_object: str, reason: str, expire_at: Optional[str]) -> bool:
         payload = {"as": ban_method, "who": ban_object,
                    "by": self.by, "reason": reason}
         if expire_at:
@@ -28,13 +145,12 @@ class EMQXIntegration(ProtocolIntegration):
 
         self.logger.debug(f"Sending ban request with payload: {payload}")
         try:
-            response = requests.post(
-                f"{self.base_url}/banned", json=payload, auth=self.auth, timeout=5)
+            response = self.session.post(
+                f"{self.base_url}/banned", json=payload, auth=self.auth, timeout=self.timeout)
             self.logger.debug(
                 f"Ban response: {response.status_code} {response.content}")
 
             if response.status_code == 200:
-                self.logger.info(f"Successfully banned by {ban_method}")
                 return True
             else:
                 self.logger.error(
@@ -47,33 +163,102 @@ class EMQXIntegration(ProtocolIntegration):
             self.logger.debug(f"Request exception details: {str(e)}")
             raise e
 
-    # def unban(self, identifier: str, identifier_type: str) -> bool:
-    #     if identifier_type not in ["peerhost", "clientid"]:
-    #         return False
-    #     try:
-    #         response = requests.delete(f"{self.base_url}/banned/{identifier_type}/{identifier}", auth=self.auth, timeout=5)
-    #         return response.status_code == 200
-    #     except requests.RequestException:
-    #         return False
-
-    # def get_client_info(self, ip: str) -> Optional[Dict[str, Any]]:
-    #     try:
-    #         response = requests.get(f"{self.base_url}/clients?ip_address={ip}", auth=self.auth, timeout=5)
-    #         if response.status_code == 200 and response.json()["data"]:
-    #             client = response.json()["data"][0]
-    #             return {"clientid": client["clientid"], "ip": client["ip_address"], "connected": client["connected"]}
-    #         return None
-    #     except requests.RequestException:
-    #         return None
-
-    # def is_banned(self, identifier: str, identifier_type: str) -> bool:
-    #     if identifier_type not in ["peerhost", "clientid"]:
-    #         return False
-    #     try:
-    #         response = requests.get(f"{self.base_url}/blacklist", auth=self.auth, timeout=5)
-    #         if response.status_code == 200:
-    #             banned = [item for item in response.json()["data"] if item["type"] == identifier_type and item["value"] == identifier]
-    #             return bool(banned)
-    #         return False
-    #     except requests.RequestException:
-    #         return False
+    def _kick(self, client_id: str) -> None:
+        """Disconnect a banned client so its open session ends too."""
+        try:
+            response = self.session.delete(
+                f"{self.base_url}/clients/{quote(client_id, safe='')}", auth=self.auth, timeout=self.timeout)
+            if response.status_code not in (200, 204, 404):
+                self.logger.warning(f"Failed to kick client, status code {response.status_code}")
+        except requests.RequestException as e:
+            self.logger.warning("Request exception while kicking client")
+            self.logger.debug(f"Request exception details: {str(e)}")
+        self._forget_client(client_id)
+
+    def ban(self, ip_address: str, reason: str, expire_at: Optional[str] = None, action: Optional[str] = None) -> bool:
+        self.logger.info("Starting ban operation")
+        self.logger.info(f"Ban details - IP: {ip_address}, Reason: {reason}")
+
+        ban_method = 'peerhost'
+        ban_objects = [ip_address]
+        if action == 'clientid':
+            client_ids = self.client_ids(ip_address)
+            if client_ids:
+                ban_method, ban_objects = 'clientid', client_ids
+            else:
+                self.logger.warning("No client found for IP, falling back to peerhost ban")
+
+        for ban_object in ban_objects:
+            self._post_ban(ban_method, ban_object, reason, expire_at)
+        if ban_method == 'clientid':
+            for client_id in ban_objects:
+                self._kick(client_id)
+        self.logger.info(f"Successfully banned by {ban_method}")
+        with self._banned_lock:
+            self._banned_as[ip_address] = [(ban_object, ban_method) for ban_object in ban_objects]
+            self._banned_as.move_to_end(ip_address)
+            while len(self._banned_as) > self.max_tracked_bans:
+                self._banned_as.popitem(last=False)
+        return True
+
+    def health_check(self) -> bool:
+        try:
+            response = self.session.get(
+                f"{self.base_url}/banned", params={"page": 1, "limit": 1}, auth=self.auth, timeout=self.timeout)
+            return response.status_code == 200
+        except requests.RequestException as e:
+            self.logger.debug(f"Health check failed: {str(e)}")
+            return False
+
+    def unban(self, identifier: str, identifier_type: str) -> bool:
+        if identifier_type not in ["peerhost", "clientid"]:
+            return False
+        self.logger.info(f"Starting unban operation for {identifier_type}")
+        try:
+            response = self.session.delete(
+                f"{self.base_url}/banned/{identifier_type}/{quote(identifier, safe='')}", auth=self.auth, timeout=self.timeout)
+            # 404 means the ban has already expired or been removed
+            if response.status_code in (200, 204, 404):
+                with self._banned_lock:
+                    for ip in [ip for ip, targets in self._banned_as.items() if (identifier, identifier_type) in targets]:
+                        del self._banned_as[ip]
+                return True
+            return False
+        except requests.RequestException as e:
+            self.logger.error("Request exception during unban operation")
+            self.logger.debug(f"Request exception details: {str(e)}")
+            return False
+
+    def connection_stats(self) -> Dict[str, int]:
+        return self.session.pool_stats()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def ban_target(self, ip_address: str) -> Tuple[str, str]:
+        return self.ban_targets(ip_address)[0]
+
+    def ban_targets(self, ip_address: str) -> List[Tuple[str, str]]:
+        with self._banned_lock:
+            return list(self._banned_as.get(ip_address) or [(ip_address, "peerhost")])
+
+    def _iter_banned(self, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """Page through the EMQX ban list."""
+        return self._iter_pages("/banned", page_size=page_size)
+
+    def list_banned(self) -> Set[Tuple[str, str]]:
+        # Only entries created by CAQES, bans added by operators are left alone
+        return {
+            (item["who"], item["as"])
+            for item in self._iter_banned()
+            if item.get("by") == self.by and item.get("as") in ("peerhost", "clientid")
+        }
+
+    def is_banned(self, identifier: str, identifier_type: str) -> bool:
+        if identifier_type not in ["peerhost", "clientid"]:
+            return False
+        try:
+            return any(item.get("as") == identifier_type and item.get("who") == identifier
+                       for item in self._iter_banned())
+        except requests.RequestException:
+            return False
@@ -1,17 +1,53 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Dict, List, Optional, Set, Tuple
 
 class NetworkIntegration(ABC):
     """Abstract base class for network-level quarantine modules."""
 
+    # Registered name, set by integration_factory.register
+    name: str = ""
+    # Ways a policy can ask this integration to ban, passed to ban() as ``action``
+    actions: Tuple[str, ...] = ("ip",)
+    # When set, bans only stage their change and apply_changes() activates them in one batch
+    defer_apply: bool = False
+
     @abstractmethod
     def ban(self, ip_address: str, reason: str, expire_at: Optional[str] = None) -> bool:
         pass
 
-    # @abstractmethod
-    # def unban(self, identifier: str, identifier_type: str) -> bool:
-    #     pass
+    @abstractmethod
+    def unban(self, identifier: str, identifier_type: str) -> bool:
+        pass
+
+    @abstractmethod
+    def is_banned(self, identifier: str, identifier_type: str) -> bool:
+        pass
+
+    @abstractmethod
+    def list_banned(self) -> Set[Tuple[str, str]]:
+        """Return every (identifier, identifier_type) this integration currently has banned on behalf of CAQES."""
+        pass
+
+    def health_check(self) -> bool:
+        """Return whether the integration's API is reachable and accepts our credentials."""
+        return True
+
+    def connection_stats(self) -> Dict[str, int]:
+        """Return statistics of the integration's connection pool, empty when it has none."""
+        return {}
+
+    def close(self) -> None:
+        """Release the integration's connections once no more calls will be made."""
+        pass
+
+    def ban_target(self, ip_address: str) -> Tuple[str, str]:
+        """Return the (identifier, identifier_type) the last ban of this IP was applied to."""
+        return ip_address, "ip"
+
+    def ban_targets(self, ip_address: str) -> List[Tuple[str, str]]:
+        """Return every (identifier, identifier_type) the last ban of this IP was applied to, all of one type."""
+        return [self.ban_target(ip_address)]
 
-    # @abstractmethod
-    # def is_banned(self, identifier: str, identifier_type: str) -> bool:
-    #     pass
\ No newline at end of file
+    def apply_changes(self) -> bool:
+        """Activate staged changes, for integrations that separate staging from applying."""
+        return True
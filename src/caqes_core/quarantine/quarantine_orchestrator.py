@@ -1,70 +1,442 @@
 import asyncio
 import logging
-from caqes_core.models import Alert
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from caqes_core.aggregation import WindowStats
+from caqes_core.dead_letter import DeadLetterQueue
+from caqes_core.models import Alert, BanRoute, BanTarget, DeviceInfo, QuarantineRecord, ip_text
+from caqes_core.policies import PolicyEvaluator
+from caqes_core.profiling import timed
 from caqes_core.quarantine import NetworkIntegration, ProtocolIntegration
+from caqes_core.quarantine.dispatch import BanJob, IntegrationLane
+from caqes_core.quarantine.quarantine_store import QuarantineStore
+from caqes_core.quarantine.reconciler import Reconciler
+from caqes_core.quarantine.unban_scheduler import UnbanScheduler
 from caqes_core.settings import OrchestratorSettings
 
 class QuarantineOrchestrator:
-    def __init__(self, settings: OrchestratorSettings):
+    def __init__(self, settings: OrchestratorSettings, dead_letters: Optional[DeadLetterQueue] = None):
         self.logger = logging.getLogger("caqes.quarantine.orchestrator")
         self.protocols = settings.protocols
         self.networks = settings.networks
         self.policies = settings.policies
+        self.shadow_policies = settings.shadow_policies
+        self.dry_run = settings.dry_run
+        self.decision_logger = settings.decision_logger
+        # Receives alerts whose ban failed on every integration once the lanes gave up retrying
+        self.dead_letters = dead_letters
+        self.aggregator = settings.aggregator
+        self.enricher = settings.enricher
+        self.allowlist = settings.allowlist
+        self.reset_on_quarantine = settings.aggregation_config.reset_on_quarantine
+        self.coordinator = settings.coordinator
+        # Dry runs track would-be bans in memory only, apart from the real state
+        self.store = QuarantineStore() if self.dry_run else settings.quarantine_store(self.coordinator)
+        self.sync_interval = settings.coordination_config.sync_interval
+        self.apply_interval = settings.coordination_config.apply_interval
+        if self.apply_interval:
+            for network in self.networks:
+                network.defer_apply = True
+        self._coordination_tasks: List[asyncio.Task] = []
+        self.default_ban_duration = settings.state_config.default_ban_duration
+        self.scheduler = UnbanScheduler(
+            self.store,
+            self._lift_bans,
+            batch_size=settings.state_config.unban_batch_size,
+            batch_window=settings.state_config.unban_batch_window,
+            retry_delay=settings.state_config.unban_retry_delay
+        )
+        self._validate_actions()
+        self.lanes: Dict[str, IntegrationLane] = {} if self.dry_run else {
+            integration.name: IntegrationLane(integration, settings.dispatch_for(integration.name))
+            for integration in self._integrations()
+        }
+        # Bans dispatched but not yet completed on every integration, by IP
+        self._in_flight: Dict[str, QuarantineRecord] = {}
+        self._trackers: Set[asyncio.Task] = set()
+        # Alerts matched per policy, and alerts no policy matched
+        self.policy_hits: Counter[str] = Counter()
+        self.unmatched = 0
+        self.protected_hits = 0
+        # Live versus shadow policy outcomes: both_ban, both_pass, live_only, shadow_only
+        self.shadow_stats: Counter[str] = Counter()
+        self.reconciliation_enabled = settings.reconciliation_config.enabled and not self.dry_run
+        self.reconciler = Reconciler(
+            self.store,
+            self._integrations,
+            interval=settings.reconciliation_config.interval,
+            prune_unknown=settings.reconciliation_config.prune_unknown,
+            is_leader=lambda: self.coordinator.is_leader("reconcile"),
+            in_flight=lambda: self._in_flight
+        )
 
-    async def quarantine(self, alert: Alert) -> None:
+    async def start(self) -> None:
+        """Load persisted quarantine state, reconcile it with the integrations and start lifting expired bans."""
+        if self.decision_logger:
+            self.decision_logger.start()
+        self.allowlist.start()
+        for record in self.store.load():
+            self.scheduler.schedule(record)
+        if self.reconciliation_enabled:
+            try:
+                await self.reconciler.reconcile()
+            except Exception as e:
+                self.logger.error("Startup reconciliation failed")
+                self.logger.debug(f"Reconciliation error details: {str(e)}")
+            self.reconciler.start()
+        self.scheduler.start()
+        for lane in self.lanes.values():
+            lane.start()
+        if self.store.backend:
+            self._coordination_tasks.append(asyncio.create_task(self._sync_loop()))
+        if self.apply_interval:
+            self._coordination_tasks.append(asyncio.create_task(self._apply_loop()))
+
+    async def stop(self) -> None:
+        """Stop dispatching, activate the staged firewall changes and release every connection.
+
+        Bans still in flight are abandoned, call drain() first to let them land.
+        """
+        for lane in self.lanes.values():
+            await lane.stop()
+        # Abandoned bans release their claim so another node, or the next start, can retry them
+        for tracker in self._trackers:
+            tracker.cancel()
+        await asyncio.gather(*self._trackers, return_exceptions=True)
+        for task in self._coordination_tasks:
+            task.cancel()
+        await asyncio.gather(*self._coordination_tasks, return_exceptions=True)
+        self._coordination_tasks.clear()
+        if self.apply_interval:
+            # Bans staged since the last batch would otherwise wait for the next start
+            await self._apply_deferred()
+        await self.reconciler.stop()
+        await self.scheduler.stop()
+        try:
+            await self.store.flushed()
+        except Exception as e:
+            self.logger.error("Failed to write quarantine state on shutdown")
+            self.logger.debug(f"Write error details: {str(e)}")
+        self.store.close()
+        self.coordinator.close()
+        if self.decision_logger:
+            await self.decision_logger.stop()
+        if self.enricher:
+            await self.enricher.close()
+        await self.allowlist.stop()
+        for integration in self._integrations():
+            integration.close()
+
+    async def __aenter__(self) -> "QuarantineOrchestrator":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    def is_banned(self, identifier: str) -> bool:
+        """Answer from local state whether an IP or MAC address is quarantined."""
+        return self.store.is_banned(identifier)
+
+    def policy_set(self, names: List[str]) -> List[PolicyEvaluator]:
+        """The live policies with the given names, in configuration order."""
+        unknown = set(names) - {policy.name for policy in self.policies}
+        if unknown:
+            raise ValueError(f"Unknown policies {sorted(unknown)}")
+        return [policy for policy in self.policies if policy.name in names]
+
+    async def quarantine(self, alert: Alert, policies: Optional[List[PolicyEvaluator]] = None) -> None:
+        """Judge an alert by ``policies``, every live policy by default, and ban its source if one matches.
+
+        Returns once the ban has completed on every integration, so the
+        caller's concurrency limit, usually the scheduler's, bounds the
+        integration calls too and urgent alerts are not queued behind a lane
+        backlog of less urgent ones.
+        """
         self.logger.info(f"Processing quarantine request for alert {alert.alert_id}")
-        
-        if not self._should_quarantine_alert(alert):
+        policies = self.policies if policies is None else policies
+
+        context = await self._build_context(alert)
+        # Built once and shared by every policy, live and shadow
+        rule_input = alert.model_dump()
+        rule_input.update(context)
+        policy = self._first_match(policies, rule_input)
+        if self.shadow_policies:
+            self._compare_shadow(alert, policy, self._first_match(self.shadow_policies, rule_input))
+        if policy is None:
+            self.unmatched += 1
             self.logger.info(f"No matching policies for alert {alert.alert_id}")
             self.logger.debug(f"Alert details: {alert.model_dump()}")
             return
+        self.policy_hits[policy.name] += 1
+
+        if self.aggregator and self.reset_on_quarantine:
+            # Start counting afresh so the same burst does not trigger repeated bans
+            self.aggregator.reset(alert.source_ip)
+
+        source_ip = ip_text(alert.source_ip)
+        if self.store.is_banned(source_ip) or source_ip in self._in_flight:
+            self.logger.info(f"Source of alert {alert.alert_id} is already quarantined")
+            self._log_decision("already_banned", alert, policy)
+            return
+        protected = self.allowlist.protected(alert.source_ip, context["device"]["mac"])
+        if protected:
+            self.protected_hits += 1
+            self.logger.warning(f"Not quarantining {source_ip} for alert {alert.alert_id}, protected by allowlist entry {protected}")
+            self._log_decision("protected", alert, policy, allowlist_entry=protected)
+            return
+        record = QuarantineRecord(ip=source_ip, mac=context["device"]["mac"], reason=alert.classification,
+                                  policy=policy.name)
+        duration = policy.ban_duration or self.default_ban_duration
+        if duration:
+            record.expire_at = record.banned_at + timedelta(seconds=duration)
+        if policy.actions is not None:
+            self._route(record, policy, duration)
+
+        if self.dry_run:
+            self.logger.info(f"Dry run, would quarantine {source_ip} for alert {alert.alert_id}")
+            matched = [p.name for p in policies if p.matches(rule_input)]
+            self._log_decision("would_ban", alert, policy, expire_at=record.expire_at, matched=matched)
+            self.store.add(record)
+            self.scheduler.schedule(record)
+            return
+
+        # Held while claiming so alerts from the same source meanwhile are not dispatched twice
+        self._in_flight[source_ip] = record
+        if not await asyncio.to_thread(self.coordinator.claim_ban, source_ip):
+            self._in_flight.pop(source_ip, None)
+            self.logger.info(f"Source of alert {alert.alert_id} is being quarantined by another node")
+            return
+
+        self._log_decision("ban", alert, policy, expire_at=record.expire_at)
+        self.logger.info("Dispatching quarantine tasks")
+        quarantine_tasks = self._create_quarantine_tasks(alert, record)
+        tracker = asyncio.create_task(self._track(alert, record, quarantine_tasks))
+        self._trackers.add(tracker)
+        tracker.add_done_callback(self._trackers.discard)
+        # Shielded so a cancelled caller leaves the ban to drain() and stop(), like any other in flight
+        await asyncio.shield(tracker)
+
+    async def _track(self, alert: Alert, record: QuarantineRecord,
+                     quarantine_tasks: List[Tuple[str, asyncio.Future]]) -> None:
+        """Record each integration's ban as soon as it lands, independently of the others."""
+        async def wait(name: str, future: asyncio.Future) -> Tuple[str, bool]:
+            return name, await future
 
-        self.logger.info("Creating quarantine tasks")
-        quarantine_tasks = self._create_quarantine_tasks(alert)
+        failed: List[str] = []
         try:
-            await asyncio.gather(*quarantine_tasks)
+            for completed in asyncio.as_completed([wait(name, future) for name, future in quarantine_tasks]):
+                name, success = await completed
+                if not success:
+                    self.logger.error(f"Quarantine on {name} failed for alert {alert.alert_id}")
+                    failed.append(name)
+                    continue
+                integration = self.lanes[name].integration
+                if getattr(integration, "defer_apply", False):
+                    await asyncio.to_thread(self.coordinator.request_apply, name)
+                target = BanTarget.from_pairs(integration.ban_targets(record.ip))
+                record.targets[name] = target
+                if target.identifier_type == "mac":
+                    record.mac = target.identifier
+                first = len(record.targets) == 1
+                self.store.add(record)
+                if first:
+                    self.scheduler.schedule(record)
             self.logger.info(f"Quarantine tasks completed for alert {alert.alert_id}")
-        except Exception as e:
-            self.logger.error(f"Error executing quarantine tasks")
-            self.logger.debug(f"Quarantine error details: {str(e)}")
-            raise
-
-    def _should_quarantine_alert(self, alert: Alert) -> bool:
-        return any(policy.evaluate(alert) for policy in self.policies)
-
-    def _create_quarantine_tasks(self, alert: Alert) -> list:
-        protocol_tasks = [
-            self._quarantine_by_protocol(protocol, alert)
-            for protocol in self.protocols
-        ]
-        network_tasks = [
-            self._quarantine_by_network(network, alert)
-            for network in self.networks
-        ]
-        return protocol_tasks + network_tasks
-
-    async def _quarantine_by_protocol(self, protocol: ProtocolIntegration, alert: Alert) -> None:
-        self.logger.debug(f"Executing protocol quarantine for IP {alert.source_ip}")
-        try:
-            success = protocol.ban(
-                ip_address=str(alert.source_ip),
-                reason=alert.classification
+        finally:
+            self._in_flight.pop(record.ip, None)
+            if not record.targets:
+                # Let a later alert, on any node, retry the ban
+                await asyncio.to_thread(self.coordinator.release_ban, record.ip)
+                if failed and self.dead_letters is not None:
+                    self.dead_letters.reject(
+                        "quarantine_failed", alert.model_dump_json().encode(),
+                        integrations=failed, alert_id=alert.alert_id)
+
+    async def drain(self, timeout: float | None = None) -> bool:
+        """Wait for dispatched bans to complete, returns False if the timeout expired first."""
+        if not self._trackers:
+            return True
+        _, pending = await asyncio.wait(set(self._trackers), timeout=timeout)
+        return not pending
+
+    async def _build_context(self, alert: Alert) -> Dict[str, Any]:
+        """Derived fields exposed to policy rules next to the alert's own fields."""
+        stats = self.aggregator.observe(alert) if self.aggregator else WindowStats.single()
+        source_ip = ip_text(alert.source_ip)
+        device = await self.enricher.lookup(source_ip) if self.enricher else None
+        # Unknown devices still expose every field so rules can test them for None
+        return {"window": stats.as_dict(), "device": (device or DeviceInfo(ip=source_ip)).model_dump()}
+
+    @staticmethod
+    @timed("policy_match")
+    def _first_match(policies: List[PolicyEvaluator], rule_input: Dict[str, Any]) -> Optional[PolicyEvaluator]:
+        return next((policy for policy in policies if policy.matches(rule_input)), None)
+
+    def _compare_shadow(self, alert: Alert, live: Optional[PolicyEvaluator], shadow: Optional[PolicyEvaluator]) -> None:
+        if live and shadow:
+            outcome = "both_ban"
+        elif not live and not shadow:
+            outcome = "both_pass"
+        else:
+            outcome = "live_only" if live else "shadow_only"
+        self.shadow_stats[outcome] += 1
+        if outcome in ("live_only", "shadow_only"):
+            self._log_decision("shadow", alert, live, outcome=outcome, shadow_policy=shadow.name if shadow else None)
+
+    def _log_decision(self, decision: str, alert: Alert, policy: Optional[PolicyEvaluator], **fields: Any) -> None:
+        if self.decision_logger:
+            self.decision_logger.log(
+                decision,
+                alert_id=alert.alert_id,
+                source_ip=ip_text(alert.source_ip),
+                policy=policy.name if policy else None,
+                dry_run=self.dry_run,
+                **fields
             )
-            if not success:
-                self.logger.error("Protocol quarantine operation failed")
-        except Exception as e:
-            self.logger.error("Exception during protocol quarantine")
-            self.logger.debug(f"Protocol quarantine error: {str(e)}")
 
-    async def _quarantine_by_network(self, network: NetworkIntegration, alert: Alert) -> None:
-        self.logger.debug(f"Executing network quarantine for IP {alert.source_ip}")
-        try:
-            success = network.ban(
-                ip_address=str(alert.source_ip),
-                reason=alert.classification
+    def _integrations(self) -> List[Union[ProtocolIntegration, NetworkIntegration]]:
+        return [*self.protocols, *self.networks]
+
+    def _validate_actions(self) -> None:
+        """Fail at startup on policy actions no configured integration can carry out."""
+        integrations = {integration.name: integration for integration in self._integrations()}
+        for policy in self.policies:
+            for action in policy.actions or []:
+                integration = integrations.get(action.integration)
+                if integration is None:
+                    raise ValueError(f"Policy {policy.name} routes bans to unknown integration {action.integration}")
+                if action.action is not None and action.action not in integration.actions:
+                    raise ValueError(
+                        f"Policy {policy.name} asks {action.integration} to ban by {action.action}, "
+                        f"supported actions are {', '.join(integration.actions)}"
+                    )
+
+    @staticmethod
+    def _route(record: QuarantineRecord, policy: PolicyEvaluator, duration: Optional[float]) -> None:
+        """Restrict the ban to the policy's actions, each with its own expiry."""
+        for action in policy.actions:
+            seconds = action.ban_duration or duration
+            record.routes[action.integration] = BanRoute(
+                action=action.action,
+                expire_at=record.banned_at + timedelta(seconds=seconds) if seconds else None
             )
-            if not success:
-                self.logger.error("Network quarantine operation failed")
-        except Exception as e:
-            self.logger.error("Exception during network quarantine")
-            self.logger.debug(f"Network quarantine error: {str(e)}")
\ No newline at end of file
+        # The source stays quarantined until its last routed ban is lifted
+        expiries = [route.expire_at for route in record.routes.values()]
+        record.expire_at = None if None in expiries else max(expiries)
+
+    def _create_quarantine_tasks(self, alert: Alert, record: QuarantineRecord) -> List[Tuple[str, asyncio.Future]]:
+        """Hand the ban to the dispatch lane of every integration it is routed to, returns a future per integration."""
+        names = list(record.routes) if record.routes else list(self.lanes)
+        tasks = []
+        for name in names:
+            route = record.routes.get(name)
+            expire_at = record.expiry_of(name)
+            job = BanJob(
+                ip_address=record.ip,
+                reason=alert.classification,
+                expire_at=expire_at.isoformat() if expire_at else None,
+                action=route.action if route else None
+            )
+            tasks.append((name, self.lanes[name].submit(job)))
+        return tasks
+
+    def dispatch_status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: lane.status() for name, lane in self.lanes.items()}
+
+    @property
+    def in_flight(self) -> int:
+        """Number of bans dispatched but not yet completed on every integration."""
+        return len(self._in_flight)
+
+    async def check_integrations(self, timeout: float) -> Dict[str, bool]:
+        """Probe every integration concurrently, an integration that does not answer in time is unreachable."""
+        async def check(integration: Union[ProtocolIntegration, NetworkIntegration]) -> bool:
+            try:
+                return bool(await asyncio.wait_for(asyncio.to_thread(integration.health_check), timeout))
+            except Exception as e:
+                self.logger.debug(f"Health check of {integration.name} failed: {str(e)}")
+                return False
+
+        integrations = self._integrations()
+        results = await asyncio.gather(*(check(integration) for integration in integrations))
+        return {integration.name: result for integration, result in zip(integrations, results)}
+
+    async def _lift_bans(self, records: List[QuarantineRecord]) -> List[QuarantineRecord]:
+        """Unban the due bans of expired records, returns the records that failed."""
+        if not await asyncio.to_thread(self.coordinator.is_leader, "unban"):
+            # The leader lifts shared bans, retry in case leadership moves here
+            return records
+        integrations = {integration.name: integration for integration in self._integrations()}
+
+        def unban(integration: Union[ProtocolIntegration, NetworkIntegration], target: BanTarget) -> bool:
+            # Every identifier is attempted, unbans are idempotent so a partial failure is simply retried
+            return all([integration.unban(identifier, target.identifier_type) for identifier in target.identifiers()])
+
+        async def lift(record: QuarantineRecord) -> bool:
+            now = datetime.now(timezone.utc)
+            pending = {
+                name: target for name, target in record.targets.items()
+                if name in integrations and record.is_expired(now, name)
+            }
+            results = await asyncio.gather(*(
+                asyncio.to_thread(unban, integrations[name], target)
+                for name, target in pending.items()
+            ), return_exceptions=True)
+            for name, result in zip(pending, results):
+                if result is True:
+                    record.targets.pop(name)
+            # Routes whose ban is lifted, or never landed, are done with
+            for name in [name for name in record.routes if name not in record.targets and record.is_expired(now, name)]:
+                record.routes.pop(name)
+            if pending.keys() & record.targets.keys():
+                # Keep the remaining targets so only they are retried
+                self.store.add(record)
+                return False
+            if record.targets.keys() & integrations.keys():
+                # Routed bans that expire later
+                self.store.add(record)
+                self.scheduler.schedule(record)
+                return True
+            self.store.remove(record.ip)
+            self.logger.info(f"Lifted expired quarantine for IP {record.ip}")
+            return True
+
+        results = await asyncio.gather(*(lift(record) for record in records))
+        return [record for record, lifted in zip(records, results) if not lifted]
+
+    async def _sync_loop(self) -> None:
+        """Pick up bans recorded by other nodes so their expiry is scheduled here too."""
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                for record in await asyncio.to_thread(self.store.refresh):
+                    self.scheduler.schedule(record)
+            except Exception as e:
+                self.logger.error("Failed to refresh shared quarantine state")
+                self.logger.debug(f"Refresh error details: {str(e)}")
+
+    async def _apply_loop(self) -> None:
+        """Activate staged firewall changes in one batch per interval."""
+        while True:
+            await asyncio.sleep(self.apply_interval)
+            await self._apply_deferred()
+
+    async def _apply_deferred(self) -> None:
+        """Activate the staged firewall changes of every deferred network, on the apply leader only."""
+        if not await asyncio.to_thread(self.coordinator.is_leader, "apply"):
+            return
+        for network in self.networks:
+            if not network.defer_apply:
+                continue
+            try:
+                if not await asyncio.to_thread(self.coordinator.take_apply, network.name):
+                    continue
+                if not await asyncio.to_thread(network.apply_changes):
+                    raise RuntimeError("apply reported failure")
+                self.logger.info(f"Applied batched firewall changes on {network.name}")
+            except Exception as e:
+                self.logger.error(f"Failed to apply batched firewall changes on {network.name}")
+                self.logger.debug(f"Apply error details: {str(e)}")
+                await asyncio.to_thread(self.coordinator.request_apply, network.name)
@@ -0,0 +1,246 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from caqes_core.coordination import CoordinationBackend
+from caqes_core.models import QuarantineRecord
+
+
+class QuarantineStore:
+    """Local quarantine state indexed by IP and MAC address.
+
+    Lookups are served from in-memory indexes. When a ``path`` is given
+    changes are persisted to a SQLite database, which is loaded back on
+    ``load()`` so the state survives restarts. With a shared coordination
+    ``backend`` the records are persisted to it instead, so every node sees
+    the same state after ``refresh()``. Either way changes are written behind:
+    coalesced per IP and written in batches off the event loop, one commit
+    per batch. Call ``flushed()`` to wait for outstanding writes.
+    """
+
+    def __init__(self, path: Optional[str] = None, backend: Optional[CoordinationBackend] = None):
+        self.logger = logging.getLogger("caqes.quarantine.store")
+        self.path = path
+        self.backend = backend
+        self._by_ip: Dict[str, QuarantineRecord] = {}
+        self._by_mac: Dict[str, QuarantineRecord] = {}
+        self._db: sqlite3.Connection | None = None
+        # Changes not yet persisted, by IP, None for a removal
+        self._pending: Dict[str, Optional[QuarantineRecord]] = {}
+        self._pending_lock = threading.Lock()
+        # The batch flush() is writing, still newer than what the backend holds until it lands
+        self._writing: Dict[str, Optional[QuarantineRecord]] = {}
+        self._write_lock = threading.Lock()
+        # Held to change the indexes, refresh() swaps them from a worker thread
+        self._index_lock = threading.Lock()
+        # Local changes made while each running refresh() loads the shared state
+        self._refreshing: List[Dict[str, Optional[QuarantineRecord]]] = []
+        self._flushing: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._by_ip)
+
+    @property
+    def persistent(self) -> bool:
+        """Whether records outlive the process, in a database or the shared backend."""
+        return bool(self.path or self.backend)
+
+    def __contains__(self, identifier: str) -> bool:
+        return self.get(identifier) is not None
+
+    def load(self) -> List[QuarantineRecord]:
+        """Open the backing database and load the persisted records into memory."""
+        if self.backend:
+            self.refresh()
+            self.logger.info(f"Loaded {len(self)} quarantine records from the shared state")
+            return self.records()
+        if not self.path or self._db:
+            return self.records()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        # Written to from a worker thread by flush()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS quarantine (ip TEXT PRIMARY KEY, record TEXT NOT NULL)"
+        )
+        self._db.commit()
+        for (data,) in self._db.execute("SELECT record FROM quarantine"):
+            self._index(QuarantineRecord.model_validate_json(data))
+        self.logger.info(f"Loaded {len(self)} quarantine records from {self.path}")
+        return self.records()
+
+    def refresh(self) -> List[QuarantineRecord]:
+        """Replace local state with the shared state, returns records added or changed by other nodes.
+
+        May run in a worker thread: local changes not yet written, or made
+        while the shared state loads, are applied on top of it.
+        """
+        if not self.backend:
+            return []
+        since_load: Dict[str, Optional[QuarantineRecord]] = {}
+        with self._index_lock:
+            self._refreshing.append(since_load)
+        try:
+            shared = {record.ip: record for record in self.backend.load_records()}
+            with self._pending_lock:
+                # Local changes not written yet are newer than what the backend holds
+                local = {**self._writing, **self._pending}
+            with self._index_lock:
+                # And those made during the load are newer still, whether written yet or not
+                local.update(since_load)
+                for ip, record in local.items():
+                    if record is None:
+                        shared.pop(ip, None)
+                    else:
+                        # The indexed record, which callers keep updating, rather than its written snapshot
+                        shared[ip] = self._by_ip.get(ip, record)
+                changed = [
+                    record for ip, record in shared.items()
+                    if self._by_ip.get(ip) != record
+                ]
+                # Built aside and swapped in, lookups on the event loop never see a half-built index
+                by_mac = {record.mac.lower(): record for record in shared.values() if record.mac}
+                self._by_ip, self._by_mac = shared, by_mac
+        finally:
+            with self._index_lock:
+                self._refreshing.remove(since_load)
+        return changed
+
+    def close(self) -> None:
+        if self._db:
+            try:
+                self.flush()
+            except Exception as e:
+                self.logger.error("Failed to persist quarantine state on close")
+                self.logger.debug(f"Write error details: {str(e)}")
+            with self._write_lock:
+                self._db.close()
+                self._db = None
+
+    def _index(self, record: QuarantineRecord) -> None:
+        self._by_ip[record.ip] = record
+        if record.mac:
+            self._by_mac[record.mac.lower()] = record
+
+    def _unindex(self, record: QuarantineRecord) -> None:
+        self._by_ip.pop(record.ip, None)
+        if record.mac:
+            self._by_mac.pop(record.mac.lower(), None)
+
+    def add(self, record: QuarantineRecord) -> None:
+        with self._index_lock:
+            existing = self._by_ip.get(record.ip)
+            if existing:
+                self._unindex(existing)
+            self._index(record)
+            for since_load in self._refreshing:
+                since_load[record.ip] = record
+        if self.backend or self._db:
+            # Snapshot, the caller keeps updating the record while it waits to be written
+            self._write_behind(record.ip, record.model_copy(deep=True))
+
+    def remove(self, ip: str) -> Optional[QuarantineRecord]:
+        with self._index_lock:
+            record = self._by_ip.get(ip)
+            if record is None:
+                return None
+            self._unindex(record)
+            for since_load in self._refreshing:
+                since_load[ip] = None
+        if self.backend or self._db:
+            self._write_behind(ip, None)
+        return record
+
+    def _write_behind(self, ip: str, record: Optional[QuarantineRecord]) -> None:
+        with self._pending_lock:
+            self._pending[ip] = record
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to block, write through
+            self.flush()
+            return
+        if self._flushing is None:
+            self._flushing = loop.create_task(self._flush_pending())
+
+    async def _flush_pending(self) -> None:
+        try:
+            # Changes made while a flush runs are picked up by the next one
+            while self._pending:
+                await asyncio.to_thread(self.flush)
+        except Exception as e:
+            self.logger.error("Failed to persist quarantine state")
+            self.logger.debug(f"Write error details: {str(e)}")
+        finally:
+            self._flushing = None
+
+    def flush(self) -> int:
+        """Persist pending changes in one batch, returns how many were written.
+
+        Changes that could not be written are kept for the next flush.
+        """
+        with self._write_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+                self._writing = pending
+            if not pending:
+                return 0
+            try:
+                self._write(pending)
+            except Exception:
+                with self._pending_lock:
+                    # Changes made since are newer, writes are idempotent so the batch is simply retried
+                    for ip, record in pending.items():
+                        self._pending.setdefault(ip, record)
+                raise
+            finally:
+                with self._pending_lock:
+                    self._writing = {}
+        return len(pending)
+
+    def _write(self, pending: Dict[str, Optional[QuarantineRecord]]) -> None:
+        if self.backend:
+            for ip, record in pending.items():
+                if record is None:
+                    self.backend.delete_record(ip)
+                else:
+                    self.backend.save_record(record)
+            return
+        if self._db is None:
+            return
+        # The connection context commits the batch, or rolls it back on error
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO quarantine (ip, record) VALUES (?, ?)",
+                [(ip, record.model_dump_json()) for ip, record in pending.items() if record is not None]
+            )
+            self._db.executemany(
+                "DELETE FROM quarantine WHERE ip = ?",
+                [(ip,) for ip, record in pending.items() if record is None]
+            )
+
+    async def flushed(self) -> None:
+        """Wait until the changes made so far are persisted."""
+        if self._flushing is not None:
+            await asyncio.shield(self._flushing)
+        if self._pending:
+            await asyncio.to_thread(self.flush)
+
+    def get(self, identifier: str) -> Optional[QuarantineRecord]:
+        """Look up a record by IP or MAC address."""
+        return self._by_ip.get(identifier) or self._by_mac.get(identifier.lower())
+
+    def is_banned(self, identifier: str, now: datetime | None = None) -> bool:
+        record = self.get(identifier)
+        return record is not None and not record.is_expired(now)
+
+    def records(self) -> List[QuarantineRecord]:
+        return list(self._by_ip.values())
+
+    def expired(self, now: datetime | None = None) -> Iterable[QuarantineRecord]:
+        now = now or datetime.now(timezone.utc)
+        return [record for record in self._by_ip.values() if record.is_expired(now)]
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Collection, Dict, List, Optional, Set, Tuple, Union
+
+from caqes_core.models import BanTarget, QuarantineRecord
+from caqes_core.quarantine import NetworkIntegration, ProtocolIntegration
+from caqes_core.quarantine.quarantine_store import QuarantineStore
+
+Integration = Union[ProtocolIntegration, NetworkIntegration]
+
+
+@dataclass
+class ReconcileReport:
+    """Outcome of reconciling one integration."""
+    integration: str
+    remote: int = 0
+    rebanned: List[str] = field(default_factory=list)
+    pruned: List[Tuple[str, str]] = field(default_factory=list)
+    errors: int = 0
+
+
+class Reconciler:
+    """Bring remote ban lists in line with the local quarantine state.
+
+    Each pass bulk-fetches an integration's ban list once and diffs it against
+    the targets recorded in the store with set operations. Only the delta
+    generates traffic: active records missing remotely are banned again and,
+    with ``prune_unknown``, remote entries without a local record are unbanned.
+    Pruning needs a persistent store, an empty in-memory one after a restart
+    would otherwise unban everything. IPs returned by ``in_flight`` are being
+    banned right now and are left alone. When ``is_leader`` is given, passes
+    are skipped on nodes that do not lead.
+    """
+
+    def __init__(
+        self,
+        store: QuarantineStore,
+        integrations: Callable[[], List[Integration]],
+        interval: float = 300.0,
+        prune_unknown: bool = False,
+        is_leader: Optional[Callable[[], bool]] = None,
+        in_flight: Callable[[], Collection[str]] = lambda: ()
+    ):
+        self.logger = logging.getLogger("caqes.quarantine.reconciler")
+        self.store = store
+        self.integrations = integrations
+        self.interval = interval
+        self.prune_unknown = prune_unknown and store.persistent
+        if prune_unknown and not store.persistent:
+            self.logger.warning("Not pruning unknown remote bans, quarantine state is not persisted")
+        self.is_leader = is_leader
+        self.in_flight = in_flight
+        self._task: asyncio.Task | None = None
+
+    async def reconcile(self) -> List[ReconcileReport]:
+        # Renewing the lease is a round trip to the coordination backend
+        if self.is_leader and not await asyncio.to_thread(self.is_leader):
+            # Another node reconciles the shared state
+            return []
+        reports = await asyncio.gather(*(
+            self._reconcile_integration(integration) for integration in self.integrations()
+        ))
+        for report in reports:
+            if report.rebanned or report.pruned or report.errors:
+                self.logger.info(
+                    f"Reconciled {report.integration}: {len(report.rebanned)} re-banned, "
+                    f"{len(report.pruned)} pruned, {report.errors} errors"
+                )
+        return list(reports)
+
+    async def _reconcile_integration(self, integration: Integration) -> ReconcileReport:
+        report = ReconcileReport(integration=integration.name)
+        try:
+            remote: Set[Tuple[str, str]] = await asyncio.to_thread(integration.list_banned)
+        except Exception as e:
+            self.logger.error(f"Failed to fetch ban list from {integration.name}")
+            self.logger.debug(f"Reconciliation error details: {str(e)}")
+            report.errors += 1
+            return report
+        report.remote = len(remote)
+
+        now = datetime.now(timezone.utc)
+        in_flight = set(self.in_flight())
+        # Identifiers a ban in flight may already have landed on
+        landing = self._identifiers(integration, in_flight)
+        expected: Dict[Tuple[str, str], QuarantineRecord] = {}
+        untargeted: List[QuarantineRecord] = []
+        for record in self.store.records():
+            if record.ip in in_flight:
+                continue
+            target = record.targets.get(integration.name)
+            if target is None:
+                if not record.routes or integration.name in record.routes:
+                    untargeted.append(record)
+            else:
+                for identifier in target.identifiers():
+                    expected[(identifier, target.identifier_type)] = record
+
+        # Expired records are left to the unban scheduler
+        missing = list({
+            record.ip: record for key, record in expected.items()
+            if key not in remote and not record.is_expired(now, integration.name)
+        }.values()) + [record for record in untargeted if not record.is_expired(now, integration.name)]
+        stale = {
+            key for key in remote - expected.keys() if key[0] not in landing
+        } if self.prune_unknown else set()
+
+        for record in missing:
+            if await self._reban(integration, record):
+                report.rebanned.append(record.ip)
+            else:
+                report.errors += 1
+        for identifier, identifier_type in stale:
+            if await asyncio.to_thread(integration.unban, identifier, identifier_type):
+                report.pruned.append((identifier, identifier_type))
+            else:
+                report.errors += 1
+        return report
+
+    def _identifiers(self, integration: Integration, ips: Set[str]) -> Set[str]:
+        identifiers = set(ips)
+        for ip in ips:
+            try:
+                identifiers.update(identifier for identifier, _ in integration.ban_targets(ip))
+            except Exception as e:
+                self.logger.debug(f"Failed to look up ban targets of {ip} on {integration.name}: {str(e)}")
+        return identifiers
+
+    async def _reban(self, integration: Integration, record: QuarantineRecord) -> bool:
+        route = record.routes.get(integration.name)
+        kwargs = {"action": route.action} if route and route.action else {}
+        expire_at = record.expiry_of(integration.name)
+        try:
+            success = await asyncio.to_thread(
+                integration.ban,
+                ip_address=record.ip,
+                reason=record.reason,
+                expire_at=expire_at.isoformat() if expire_at else None,
+                **kwargs
+            )
+        except Exception as e:
+            self.logger.debug(f"Re-ban of {record.ip} on {integration.name} failed: {str(e)}")
+            return False
+        if success:
+            record.targets[integration.name] = BanTarget.from_pairs(integration.ban_targets(record.ip))
+            self.store.add(record)
+        return bool(success)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                self.logger.error("Periodic reconciliation failed")
+                self.logger.debug(f"Reconciliation error details: {str(e)}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,108 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from typing import Awaitable, Callable, List, Tuple
+from datetime import datetime
+
+from caqes_core.models import QuarantineRecord
+from caqes_core.quarantine.quarantine_store import QuarantineStore
+
+
+class UnbanScheduler:
+    """Heap-based scheduler that lifts bans once they expire.
+
+    Expiries are kept in a min-heap; the scheduler sleeps until the earliest
+    one is due plus ``batch_window`` seconds, so bans expiring close together
+    are lifted in a single batch. Entries superseded by a re-ban or removed
+    from the store are skipped when popped rather than deleted from the heap.
+    The ``unban`` callback returns the records it failed to lift, which are
+    retried after ``retry_delay`` seconds.
+    """
+
+    def __init__(
+        self,
+        store: QuarantineStore,
+        unban: Callable[[List[QuarantineRecord]], Awaitable[List[QuarantineRecord]]],
+        batch_size: int = 100,
+        batch_window: float = 1.0,
+        retry_delay: float = 30.0
+    ):
+        self.logger = logging.getLogger("caqes.quarantine.scheduler")
+        self.store = store
+        self.unban = unban
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.retry_delay = retry_delay
+        self._heap: List[Tuple[float, int, str, datetime]] = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, record: QuarantineRecord, at: float | None = None) -> None:
+        if at is None:
+            # Routed bans may expire one integration at a time
+            next_expiry = record.next_expiry()
+            if next_expiry is None:
+                return
+            at = next_expiry.timestamp()
+        entry = (at, next(self._counter), record.ip, record.expire_at)
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            # New earliest expiry, re-arm the timer
+            self._wakeup.set()
+
+    def _pop_due(self, now: float) -> List[QuarantineRecord]:
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+            _, _, ip, expire_at = heapq.heappop(self._heap)
+            record = self.store.get(ip)
+            if record is not None and record.expire_at == expire_at:
+                due.append(record)
+        return due
+
+    async def run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            if self._heap:
+                now = datetime.now().timestamp()
+                timeout = max(0.0, self._heap[0][0] + self.batch_window - now)
+            else:
+                timeout = None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                continue
+            except asyncio.TimeoutError:
+                pass
+
+            due = self._pop_due(datetime.now().timestamp())
+            if not due:
+                continue
+            self.logger.info(f"Lifting {len(due)} expired bans")
+            try:
+                failed = await self.unban(due)
+            except Exception as e:
+                self.logger.error("Failed to lift expired bans")
+                self.logger.debug(f"Unban error details: {str(e)}")
+                failed = due
+            retry_at = datetime.now().timestamp() + self.retry_delay
+            for record in failed:
+                self.schedule(record, at=retry_at)
+            # Yield between batches so a large backlog doesn't starve the loop
+            await asyncio.sleep(0)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,237 @@
+"""Replay recorded IDS alerts through the Worker decode, policy and orchestrator path.
+
+    caqes-replay alerts.jsonl.gz --config caqes.conf --dry-run --rate 500
+
+Files are read line by line as JSON alerts. ``.gz``, ``.bz2`` and ``.xz``
+captures are decompressed on the fly and plain files are memory-mapped, so
+captures larger than memory can be replayed. Publishing waits whenever the
+alerts queued anywhere on the way, in the broker, the schedulers or the
+dispatch lanes, reach ``--max-pending`` or fill any of those queues, so a
+replay evaluates every alert instead of having them shed as overload.
+Quarantine state is kept in
+memory, coordination is local and reconciliation is disabled, so a replay
+never touches the persisted or shared state of running nodes, nor prunes
+real bans.
+"""
+import argparse
+import asyncio
+import bz2
+import gzip
+import json
+import logging
+import lzma
+import mmap
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from caqes_core.coordination import CoordinationType
+from caqes_core.models import Policy, PolicyAction
+from caqes_core.mq import ClientType
+from caqes_core.mq.memory.memory_client import MemoryBroker, MemoryClient
+from caqes_core.quarantine.quarantine_orchestrator import QuarantineOrchestrator
+from caqes_core.scheduling import PriorityScheduler
+from caqes_core.settings import CoordinationSettings, ReconciliationSettings, StateSettings
+from caqes_core.settings.config import ConfigManager
+from caqes_core.worker import Worker
+
+logger = logging.getLogger("caqes.replay")
+
+OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+@contextmanager
+def open_capture(path: str) -> Iterator[Iterator[bytes]]:
+    """Yield an iterator over the raw lines of a capture file."""
+    opener = OPENERS.get(Path(path).suffix)
+    if opener:
+        with opener(path, "rb") as f:
+            yield iter(f)
+        return
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            yield iter(())
+            return
+        with mapped:
+            yield iter(mapped.readline, b"")
+
+
+def dry_run_policy(policy: Policy) -> Policy:
+    """Route a policy's actions to the dry-run integration, which stands in for every configured one.
+
+    The routed bans collapse into one that lasts as long as the longest of
+    them, so the quarantine still expires when it would have.
+    """
+    if not policy.actions:
+        return policy
+    durations = [action.ban_duration or policy.ban_duration for action in policy.actions]
+    duration = None if None in durations else max(durations)
+    return policy.model_copy(update={"actions": [PolicyAction(integration="dryrun", ban_duration=duration)]})
+
+
+def backlog_limit(max_pending: int, schedulers: List[PriorityScheduler], orchestrator: QuarantineOrchestrator) -> int:
+    """Alerts that may be queued at once without any scheduler or lane queue filling up."""
+    sizes = [scheduler.max_queue_size for scheduler in schedulers]
+    sizes += [lane.settings.queue_size for lane in orchestrator.lanes.values()]
+    return max(1, min([max_pending, *sizes]))
+
+
+def build_orchestrator(config: ConfigManager, dry_run: bool) -> QuarantineOrchestrator:
+    settings = config.orchestrator_settings
+    update = {
+        "state_config": StateSettings(**{**settings.state_config.model_dump(), "path": None}),
+        # Claims, leases and records of a shared backend belong to the running nodes
+        "coordination_config": CoordinationSettings(
+            **{**settings.coordination_config.model_dump(), "type": CoordinationType.LOCAL}),
+        "reconciliation_config": ReconciliationSettings(enabled=False),
+    }
+    if dry_run:
+        update.update(
+            protocols_config=[{"type": "dryrun"}],
+            networks_config=[],
+            policies_config=[dry_run_policy(policy) for policy in settings.policies_config],
+            shadow_policies_config=[dry_run_policy(policy) for policy in settings.shadow_policies_config],
+        )
+    return QuarantineOrchestrator(settings=settings.model_copy(update=update))
+
+
+async def replay(args) -> Dict:
+    config = ConfigManager(config_path=args.config)
+    orchestrator = build_orchestrator(config, args.dry_run)
+    await orchestrator.start()
+
+    scheduler = None
+    if config.scheduler_settings.enabled:
+        scheduler_settings = config.scheduler_settings
+        scheduler = PriorityScheduler(
+            orchestrator.quarantine,
+            weights=scheduler_settings.weights,
+            concurrency=scheduler_settings.concurrency,
+            max_queue_size=scheduler_settings.max_queue_size,
+            max_wait=scheduler_settings.max_wait,
+            overdue_every=scheduler_settings.overdue_every
+        )
+        scheduler.start()
+
+    broker = MemoryBroker()
+    worker_settings = config.worker_settings.model_copy(update={"client_type": ClientType.MEMORY})
+    pipelines = worker_settings.pipelines(orchestrator, scheduler, config.scheduler_settings)
+    for pipeline in pipelines:
+        pipeline.start()
+    workers = []
+    for _ in range(args.num_workers):
+        worker = Worker(settings=worker_settings, orchestrator=orchestrator, scheduler=scheduler, pipelines=pipelines)
+        worker.mq = MemoryClient(worker_settings, broker)
+        workers.append(worker)
+    worker_tasks = [asyncio.create_task(worker.run()) for worker in workers]
+    while not all(worker.running for worker in workers):
+        await asyncio.sleep(0.01)
+
+    # Pipelines may share a scheduler, whose alerts and drops are counted once
+    queues = list({id(p.scheduler if p.scheduler is not None else p): p for p in pipelines}.values())
+    schedulers = [pipeline.scheduler for pipeline in queues if pipeline.scheduler is not None]
+    limit = backlog_limit(args.max_pending, schedulers, orchestrator)
+
+    def backlog() -> int:
+        return (broker.pending() + sum(pipeline.pending for pipeline in queues)
+                + sum(lane.depth for lane in orchestrator.lanes.values()))
+
+    interval = 1 / args.rate if args.rate else 0
+    published = 0
+    start = time.perf_counter()
+    with open_capture(args.capture) as lines:
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            broker.publish(args.topic, line)
+            published += 1
+            if args.limit and published >= args.limit:
+                break
+            if interval:
+                await asyncio.sleep(max(0.0, start + published * interval - time.perf_counter()))
+            # Let workers catch up, a full queue would shed alerts rather than evaluate them
+            while backlog() >= limit:
+                await asyncio.sleep(0.001)
+
+    while broker.pending() or any(pipeline.pending for pipeline in pipelines):
+        await asyncio.sleep(0.01)
+    await orchestrator.drain(timeout=args.timeout)
+    elapsed = time.perf_counter() - start
+
+    for worker in workers:
+        worker.stop()
+    await asyncio.gather(*worker_tasks, return_exceptions=True)
+    for pipeline in pipelines:
+        await pipeline.stop()
+    if scheduler is not None:
+        await scheduler.stop()
+    dispatch = orchestrator.dispatch_status()
+    await orchestrator.stop()
+
+    evaluated = sum(orchestrator.policy_hits.values()) + orchestrator.unmatched
+    shed = sum(scheduler.dropped for scheduler in schedulers)
+    return {
+        "capture": args.capture,
+        "dry_run": args.dry_run,
+        "alerts_published": published,
+        "alerts_evaluated": evaluated,
+        "rejections": {
+            # Shed by a full scheduler queue before reaching the policies
+            "scheduler_shed": shed,
+            # Dropped by the worker, e.g. undecodable, or still queued when the timeout expired
+            "not_evaluated": published - evaluated - shed,
+            # Matched by no policy
+            "policy_unmatched": orchestrator.unmatched,
+            # Matched, but the source is on the allowlist
+            "allowlisted": orchestrator.protected_hits,
+            # Bans a full dispatch lane, or an open circuit, turned away
+            "lane_rejected": sum(status["rejected"] for status in dispatch.values()),
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "alerts_per_sec": round(published / elapsed, 2) if elapsed else None,
+        "policy_hits": dict(orchestrator.policy_hits.most_common()),
+        "unmatched": orchestrator.unmatched,
+        "shadow": dict(orchestrator.shadow_stats),
+        "quarantined": len(orchestrator.store),
+        "integrations": {
+            name: {key: status[key] for key in ("succeeded", "failed", "rejected", "timeouts")}
+            for name, status in dispatch.items()
+        },
+    }
+
+
+def parse_args(argv: List[str] | None = None):
+    parser = argparse.ArgumentParser(description="Replay recorded IDS alerts through the CAQES pipeline")
+    parser.add_argument("capture", help="JSONL file of alerts, optionally .gz, .bz2 or .xz compressed")
+    parser.add_argument("--config", default="caqes.conf", help="CAQES configuration providing policies and integrations")
+    parser.add_argument("--dry-run", action="store_true", help="record bans instead of calling the configured integrations")
+    parser.add_argument("--rate", type=float, default=0, help="replay rate in alerts/sec (0 = as fast as possible)")
+    parser.add_argument("--limit", type=int, default=0, help="stop after this many alerts (0 = whole capture)")
+    parser.add_argument("--num-workers", type=int, default=1, help="number of Worker instances")
+    parser.add_argument("--topic", default="alerts")
+    parser.add_argument("--max-pending", type=int, default=1000,
+                        help="alerts queued at once before publishing waits for the workers to catch up")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for outstanding bans")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--log-level", default="WARNING")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s|%(name)s|%(levelname)s|%(message)s")
+    report = asyncio.run(replay(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+from .priority_scheduler import PriorityScheduler
+from .topic_pipeline import TopicPipeline
+
+__all__ = ['PriorityScheduler', 'TopicPipeline']
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from caqes_core.models import Alert
+
+Handler = Callable[[Alert], Awaitable[None]]
+
+
+class PriorityScheduler:
+    """Multi-level queue feeding quarantine work in priority order.
+
+    Alerts are queued by ``Alert.priority`` (1 is most urgent) and served by
+    smooth weighted round robin, so urgent alerts get the larger share of the
+    consumers without starving the rest. Alerts that have waited longer than
+    ``max_wait`` get a bounded share on top: one dequeue in ``overdue_every``
+    serves the longest-waiting overdue alert regardless of weight, so a
+    saturated backlog of old, less urgent alerts cannot push urgent ones back.
+    When the queues are full the oldest alert of a less urgent level is shed
+    to make room. An alert may be submitted with a handler of its own, so
+    pipelines judging alerts by different policy sets can share one
+    concurrency budget.
+    """
+
+    def __init__(
+        self,
+        handler: Handler,
+        weights: List[int] | None = None,
+        concurrency: int = 8,
+        max_queue_size: int = 10_000,
+        max_wait: float = 5.0,
+        overdue_every: int = 4,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.logger = logging.getLogger("caqes.scheduler")
+        self.handler = handler
+        self.weights = weights or [8, 4, 2, 1]
+        self.concurrency = concurrency
+        self.max_queue_size = max_queue_size
+        self.max_wait = max_wait
+        self.overdue_every = overdue_every
+        # Dequeues since an overdue alert was last served out of turn, capped at overdue_every
+        self._since_overdue = overdue_every
+        self.clock = clock
+        # Entries are (enqueued at, alert, handler or None for the default one)
+        self._queues: List[Deque[Tuple[float, Alert, Optional[Handler]]]] = [deque() for _ in self.weights]
+        self._current = [0] * len(self.weights)
+        self._size = 0
+        self._available = asyncio.Semaphore(0)
+        # Set while nothing is queued or being handled
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._consumers: List[asyncio.Task] = []
+        self.in_flight = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def level(self, alert: Alert) -> int:
+        """Map an alert priority onto a queue index, unknown priorities are least urgent."""
+        try:
+            priority = int(alert.priority)
+        except (TypeError, ValueError):
+            return len(self._queues) - 1
+        return min(max(priority, 1), len(self._queues)) - 1
+
+    def submit(self, alert: Alert, handler: Optional[Handler] = None) -> bool:
+        """Queue an alert for ``handler``, the scheduler's by default, returns False if it was shed because the queues are full."""
+        level = self.level(alert)
+        if self._size >= self.max_queue_size:
+            if not self._shed(below=level):
+                self.dropped += 1
+                return False
+            # The incoming alert takes the shed alert's slot, size is unchanged
+            self._queues[level].append((self.clock(), alert, handler))
+            return True
+        self._queues[level].append((self.clock(), alert, handler))
+        self._size += 1
+        self._idle.clear()
+        self._available.release()
+        return True
+
+    def _shed(self, below: int) -> bool:
+        """Drop the oldest alert from the least urgent level less urgent than ``below``."""
+        for level in range(len(self._queues) - 1, below, -1):
+            if self._queues[level]:
+                _, alert, _ = self._queues[level].popleft()
+                self.dropped += 1
+                self.logger.warning(f"Queue full, shedding priority {alert.priority} alert {alert.alert_id}")
+                return True
+        return False
+
+    def _select(self) -> int:
+        """Pick the queue to serve next, callers guarantee at least one is non-empty."""
+        self._since_overdue = min(self._since_overdue + 1, self.overdue_every)
+        if self._since_overdue >= self.overdue_every:
+            # Starvation protection: a bounded share of dequeues goes to the longest-waiting overdue head
+            now = self.clock()
+            overdue = [
+                (queue[0][0], level) for level, queue in enumerate(self._queues)
+                if queue and now - queue[0][0] >= self.max_wait
+            ]
+            if overdue:
+                self._since_overdue = 0
+                return min(overdue)[1]
+
+        # Smooth weighted round robin over the non-empty levels
+        total = 0
+        best = -1
+        for level, queue in enumerate(self._queues):
+            if not queue:
+                continue
+            self._current[level] += self.weights[level]
+            total += self.weights[level]
+            if best < 0 or self._current[level] > self._current[best]:
+                best = level
+        self._current[best] -= total
+        return best
+
+    async def next(self) -> Alert:
+        return (await self._take())[0]
+
+    async def _take(self) -> Tuple[Alert, Handler]:
+        await self._available.acquire()
+        _, alert, handler = self._queues[self._select()].popleft()
+        self._size -= 1
+        return alert, handler or self.handler
+
+    async def _consume(self) -> None:
+        while True:
+            alert, handler = await self._take()
+            self.in_flight += 1
+            try:
+                await handler(alert)
+            except Exception as e:
+                self.logger.error(f"Quarantine of alert {alert.alert_id} failed")
+                self.logger.debug(f"Quarantine error details: {str(e)}")
+            finally:
+                self.in_flight -= 1
+                if not self._size and not self.in_flight:
+                    self._idle.set()
+
+    def depths(self) -> Dict[int, int]:
+        return {level + 1: len(queue) for level, queue in enumerate(self._queues)}
+
+    def oldest_wait(self) -> float:
+        """Seconds the longest-queued alert has been waiting, a measure of consumer lag."""
+        heads = [queue[0][0] for queue in self._queues if queue]
+        return self.clock() - min(heads) if heads else 0.0
+
+    async def drain(self, timeout: float | None = None) -> bool:
+        """Wait for every queued alert to be handled, returns False if the timeout expired first."""
+        if self._idle.is_set():
+            return True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def start(self) -> None:
+        if not self._consumers:
+            self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
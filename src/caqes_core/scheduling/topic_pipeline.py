@@ -0,0 +1,69 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional, Set
+
+from paho.mqtt.client import topic_matches_sub
+
+from caqes_core.models import Alert, AlertAdapter
+from .priority_scheduler import PriorityScheduler
+
+
+class TopicPipeline:
+    """Route of the alerts published to one topic filter, from message to quarantine.
+
+    Each pipeline decodes its messages with its own adapter and hands the
+    alerts to its own handler, usually the orchestrator bound to a policy
+    set. A pipeline that owns its scheduler has a concurrency budget of its
+    own, so a flood on one topic does not hold up alerts on another. The
+    others share the scheduler they are given, their alerts queued along with
+    the pipeline's handler, or quarantine each alert in a task of its own when
+    there is none.
+    """
+
+    def __init__(self, topic: str, adapter: AlertAdapter, handler: Callable[[Alert], Awaitable[None]],
+                 scheduler: Optional[PriorityScheduler] = None, owns_scheduler: bool = False):
+        self.logger = logging.getLogger("caqes.pipeline")
+        self.topic = topic
+        # Shared subscriptions deliver messages under the topic filter without its $share/<group>/ prefix
+        self.topic_filter = topic.split("/", 2)[2] if topic.startswith("$share/") else topic
+        self.adapter = adapter
+        self.handler = handler
+        self.scheduler = scheduler
+        self.owns_scheduler = owns_scheduler
+        self._tasks: Set[asyncio.Task] = set()
+
+    def matches(self, topic: str) -> bool:
+        return topic_matches_sub(self.topic_filter, topic)
+
+    def submit(self, alert: Alert) -> bool:
+        """Queue an alert for quarantine, returns False if it was dropped."""
+        if self.scheduler is not None:
+            return self.scheduler.submit(alert, self.handler)
+        task = asyncio.get_running_loop().create_task(self.handler(alert))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    @property
+    def pending(self) -> int:
+        """Alerts submitted to this pipeline and not yet quarantined."""
+        if self.scheduler is not None:
+            return len(self.scheduler) + self.scheduler.in_flight
+        return len(self._tasks)
+
+    async def drain(self, timeout: float | None = None) -> bool:
+        """Wait for the submitted alerts to be quarantined, returns False if the timeout expired first."""
+        if self.scheduler is not None:
+            return await self.scheduler.drain(timeout)
+        if not self._tasks:
+            return True
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        return not pending
+
+    def start(self) -> None:
+        if self.owns_scheduler:
+            self.scheduler.start()
+
+    async def stop(self) -> None:
+        if self.owns_scheduler:
+            await self.scheduler.stop()
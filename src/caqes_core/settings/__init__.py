@@ -1,4 +1,15 @@
+from .aggregation_settings import AggregationSettings
+from .allowlist_settings import AllowlistSettings
+from .coordination_settings import CoordinationSettings
+from .dead_letter_settings import DeadLetterSettings
+from .enrichment_settings import EnrichmentSettings
+from .health_settings import HealthSettings
+from .memory_settings import MemorySettings
+from .profiling_settings import ProfilingSettings
+from .reconciliation_settings import ReconciliationSettings
+from .scheduler_settings import SchedulerSettings
+from .state_settings import StateSettings
 from .orchestrator_settings import OrchestratorSettings
 from .worker_settings import WorkerSettings
 
-__all__ = ['OrchestratorSettings', 'WorkerSettings']
\ No newline at end of file
+__all__ = ['AggregationSettings', 'AllowlistSettings', 'CoordinationSettings', 'DeadLetterSettings', 'EnrichmentSettings', 'HealthSettings', 'MemorySettings', 'OrchestratorSettings', 'ProfilingSettings', 'ReconciliationSettings', 'SchedulerSettings', 'StateSettings', 'WorkerSettings']
\ No newline at end of file
@@ -0,0 +1,12 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class AggregationSettings(BaseSettings):
+    """Settings for the per-source sliding-window alert aggregation stage."""
+    enabled: bool = Field(default=False, description="Aggregate alerts per source IP before policy evaluation")
+    window_seconds: float = Field(default=60.0, gt=0, description="Length of the sliding window")
+    bucket_seconds: float = Field(default=1.0, gt=0, description="Resolution of the window's time buckets")
+    max_sources: int = Field(default=100_000, gt=0, description="Maximum number of source IPs tracked at once")
+    reset_on_quarantine: bool = Field(default=True, description="Clear a source's window once it is quarantined")
+
+    model_config = SettingsConfigDict(env_prefix="CAQES_AGGREGATION_", extra="ignore")
@@ -0,0 +1,12 @@
+from typing import List, Optional
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class AllowlistSettings(BaseSettings):
+    """Settings for the protected addresses that are never quarantined."""
+    networks: List[str] = Field(default_factory=list, description="IPv4/IPv6 addresses and CIDR networks never to ban")
+    macs: List[str] = Field(default_factory=list, description="MAC addresses never to ban")
+    path: Optional[str] = Field(default=None, description="YAML file with further networks and macs lists, reloaded on change")
+    reload_interval: float = Field(default=10.0, gt=0, description="Seconds between checks of the allowlist file for changes")
+
+    model_config = SettingsConfigDict(env_prefix="CAQES_ALLOWLIST_", extra="ignore")
@@ -1,7 +1,7 @@
 import logging
 import yaml
 from pathlib import Path
-from caqes_core.settings import WorkerSettings, OrchestratorSettings
+from caqes_core.settings import WorkerSettings, OrchestratorSettings, SchedulerSettings, HealthSettings, DeadLetterSettings, MemorySettings, ProfilingSettings
 
 logger = logging.getLogger(__name__)
 
@@ -21,32 +21,75 @@ class ConfigManager:
             if not config_path.exists():
                 logger.warning(f"Configuration file {config_path} not found, using defaults")
                 self._num_workers = 1
+                self._shutdown_timeout = 30.0
                 self._worker_settings = WorkerSettings()
                 self._orchestrator_settings = OrchestratorSettings()
+                self._scheduler_settings = SchedulerSettings()
+                self._health_settings = HealthSettings()
+                self._dead_letter_settings = DeadLetterSettings()
+                self._profiling_settings = ProfilingSettings()
+                self._memory_settings = MemorySettings()
                 return
 
             with open(config_path, "r") as f:
                 config_data = yaml.safe_load(f) or {}
 
             self._num_workers = config_data.get("num_workers", 1)
+            self._shutdown_timeout = float(config_data.get("shutdown_timeout", 30.0))
             self._worker_settings = WorkerSettings(config_dict=config_data.get("worker", {}))
             self._orchestrator_settings = OrchestratorSettings(config_dict=config_data.get("quarantine", {}))
+            self._scheduler_settings = SchedulerSettings(**config_data.get("scheduler", {}))
+            self._health_settings = HealthSettings(**config_data.get("health", {}))
+            self._dead_letter_settings = DeadLetterSettings(**config_data.get("dead_letter", {}))
+            self._profiling_settings = ProfilingSettings(**config_data.get("profiling", {}))
+            self._memory_settings = MemorySettings(**config_data.get("memory", {}))
             logger.info(f"Loaded configuration from {config_path}")
 
         except Exception as e:
             logger.error(f"Error initializing ConfigManager: {e}")
             self._num_workers = 1
+            self._shutdown_timeout = 30.0
             self._worker_settings = WorkerSettings()
             self._orchestrator_settings = OrchestratorSettings()
+            self._scheduler_settings = SchedulerSettings()
+            self._health_settings = HealthSettings()
+            self._dead_letter_settings = DeadLetterSettings()
+            self._profiling_settings = ProfilingSettings()
+            self._memory_settings = MemorySettings()
 
     @property
     def num_workers(self) -> int:
         return self._num_workers
 
+    @property
+    def shutdown_timeout(self) -> float:
+        """Seconds allowed on SIGTERM for the alerts already received to be quarantined."""
+        return self._shutdown_timeout
+
     @property
     def worker_settings(self) -> WorkerSettings:
         return self._worker_settings
 
     @property
     def orchestrator_settings(self) -> OrchestratorSettings:
-        return self._orchestrator_settings
\ No newline at end of file
+        return self._orchestrator_settings
+
+    @property
+    def scheduler_settings(self) -> SchedulerSettings:
+        return self._scheduler_settings
+
+    @property
+    def health_settings(self) -> HealthSettings:
+        return self._health_settings
+
+    @property
+    def dead_letter_settings(self) -> DeadLetterSettings:
+        return self._dead_letter_settings
+
+    @property
+    def profiling_settings(self) -> ProfilingSettings:
+        return self._profiling_settings
+
+    @property
+    def memory_settings(self) -> MemorySettings:
+        return self._memory_settings
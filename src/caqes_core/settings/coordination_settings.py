@@ -0,0 +1,21 @@
+import os
+import socket
+from typing import Optional
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from caqes_core.coordination import CoordinationType
+
+class CoordinationSettings(BaseSettings):
+    """Settings for coordinating several CAQES nodes that share the same integrations."""
+    type: CoordinationType = Field(default=CoordinationType.LOCAL, description="Coordination backend: local, sqlite or redis")
+    node_id: str = Field(default_factory=lambda: f"{socket.gethostname()}-{os.getpid()}", description="Unique identifier of this node")
+    path: str = Field(default="/var/lib/caqes/coordination.db", description="SQLite file shared by the nodes, for the sqlite backend")
+    url: str = Field(default="redis://localhost:6379/0", description="Server URL, for the redis backend")
+    prefix: str = Field(default="caqes", description="Key prefix, for the redis backend")
+    claim_ttl: float = Field(default=60.0, gt=0, description="Seconds a node holds the claim on a ban it dispatched")
+    lease_ttl: float = Field(default=15.0, gt=0, description="Seconds a leader holds its lease without renewing it")
+    sync_interval: float = Field(default=5.0, gt=0, description="Seconds between refreshes of the shared quarantine state")
+    apply_interval: Optional[float] = Field(default=None, gt=0, description="Seconds between batched firewall applies by the leader, applied per ban if unset")
+
+    model_config = SettingsConfigDict(env_prefix="CAQES_COORDINATION_", extra="ignore")
@@ -0,0 +1,19 @@
+from typing import Optional
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from caqes_core.dead_letter import SinkType
+
+class DeadLetterSettings(BaseSettings):
+    """Settings for keeping alerts that could not be decoded or quarantined."""
+    type: Optional[SinkType] = Field(default=None, description="Dead letter sink, file or mqtt, disabled if unset")
+    path: str = Field(default="/var/log/caqes/dead_letters.jsonl", description="JSON lines file receiving dead letters, file only")
+    max_bytes: int = Field(default=10 * 1024 * 1024, gt=0, description="Size at which the dead letter file is rotated, file only")
+    backup_count: int = Field(default=5, ge=0, description="Rotated dead letter files kept, file only")
+    topic: str = Field(default="alerts/dead_letter", description="Topic dead letters are published to on the worker broker, mqtt only")
+    rate: float = Field(default=10.0, gt=0, description="Dead letters kept per second, others are only counted")
+    burst: int = Field(default=100, gt=0, description="Dead letters kept at once before the rate applies")
+    max_payload: int = Field(default=4096, gt=0, description="Bytes of each payload kept, longer payloads are truncated")
+    flush_interval: float = Field(default=1.0, gt=0, description="Seconds between writes of kept dead letters")
+    log_interval: float = Field(default=60.0, gt=0, description="Seconds between log summaries of rejected messages")
+
+    model_config = SettingsConfigDict(env_prefix="CAQES_DEAD_LETTER_", extra="ignore")
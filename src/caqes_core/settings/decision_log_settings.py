@@ -0,0 +1,11 @@
+from typing import Optional
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class DecisionLogSettings(BaseSettings):
+    """Settings for the append-only log of quarantine decisions."""
+    path: Optional[str] = Field(default=None, description="JSON lines file receiving every decision, disabled if unset")
+    buffer_size: int = Field(default=1000, gt=0, description="Decisions buffered before they are written")
+    flush_interval: float = Field(default=1.0, gt=0, description="Seconds between writes of buffered decisions")
+
+    model_config = SettingsConfigDict(env_prefix="CAQES_DECISION_LOG_", extra="ignore")
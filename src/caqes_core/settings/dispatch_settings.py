@@ -0,0 +1,20 @@
+from typing import Optional
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class DispatchSettings(BaseSettings):
+    """Settings for an integration's dispatch lane.
+
+    Set globally under ``quarantine.dispatch`` and overridden per integration
+    with a ``dispatch`` key in the integration's config.
+    """
+    concurrency: int = Field(default=4, gt=0, description="Concurrent calls into the integration")
+    queue_size: int = Field(default=1000, gt=0, description="Bans queued for the integration before new ones are rejected")
+    deadline: float = Field(default=15.0, gt=0, description="Seconds a ban may take, including retries")
+    hedge_after: Optional[float] = Field(default=None, gt=0, description="Seconds before a duplicate call is raced against a slow one, disabled if unset")
+    max_attempts: int = Field(default=3, gt=0, description="Attempts per ban within the deadline")
+    retry_backoff: float = Field(default=0.5, ge=0, description="Initial delay between attempts, doubled on each retry")
+    breaker_threshold: int = Field(default=5, gt=0, description="Consecutive failures that open the circuit breaker")
+    breaker_reset: float = Field(default=30.0, gt=0, description="Seconds the breaker stays open before a trial call")
+
+    model_config = SettingsConfigDict(env_prefix="CAQES_DISPATCH_", extra="ignore")
@@ -0,0 +1,16 @@
+from typing import List
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class EnrichmentSettings(BaseSettings):
+    """Settings for the device enrichment stage exposing ``device`` to policy rules."""
+    enabled: bool = Field(default=False, description="Look up device details for each alert's source")
+    providers: List[dict] = Field(default_factory=list, description="Enrichment providers by type, consulted in order")
+    ttl: float = Field(default=300.0, gt=0, description="Seconds a found device stays cached")
+    negative_ttl: float = Field(default=60.0, ge=0, description="Seconds an unknown address stays cached")
+    max_size: int = Field(default=10_000, gt=0, description="Maximum number of cached addresses")
+    batch_window: float = Field(default=0.005, ge=0, description="Seconds cache misses are collected into one batched lookup")
+    max_batch: int = Field(default=100, gt=0, description="Maximum addresses per batched lookup")
+    timeout: float = Field(default=0.5, gt=0, description="Seconds an alert waits for enrichment before being evaluated without it")
+
+    model_config = SettingsConfigDict(env_prefix="CAQES_ENRICHMENT_", extra="ignore")
@@ -0,0 +1,12 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class HealthSettings(BaseSettings):
+    """Settings for the embedded liveness, readiness and status HTTP server."""
+    enabled: bool = Field(default=True, description="Serve /livez, /readyz and /status")
+    host: str = Field(default="0.0.0.0", description="Address the health server listens on")
+    port: int = Field(default=8080, ge=0, le=65535, description="Port the health server listens on")
+    probe_interval: float = Field(default=30.0, gt=0, description="Seconds between integration reachability probes")
+    probe_timeout: float = Field(default=5.0, gt=0, description="Seconds before an integration probe counts as unreachable")
+
+    model_config = SettingsConfigDict(env_prefix="CAQES_HEALTH_", extra="ignore")
@@ -0,0 +1,38 @@
+from typing import Optional
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from caqes_core.budget import MemoryBudget, container_memory_limit
+
+class MemorySettings(BaseSettings):
+    """Settings for keeping CAQES inside its memory budget under alert floods."""
+    enabled: bool = Field(default=False, description="Shed incoming alerts while RSS exceeds the budget")
+    limit_mb: Optional[int] = Field(default=None, gt=0, description="Budget in MiB, container_ratio of the container memory limit if unset")
+    container_ratio: float = Field(default=0.8, gt=0, le=1, description="Share of the container memory limit used as the budget")
+    resume_ratio: float = Field(default=0.9, gt=0, le=1, description="Share of the budget RSS must fall under before alerts are accepted again")
+    check_interval: float = Field(default=1.0, gt=0, description="Seconds between RSS samples")
+    max_shed_seconds: Optional[float] = Field(default=300.0, gt=0, description="Seconds after which alerts are accepted again even if RSS stays high, never if unset")
+    trace: bool = Field(default=False, description="Trace allocations with tracemalloc from startup rather than from the first snapshot")
+    trace_frames: int = Field(default=5, gt=0, description="Stack frames kept per traced allocation")
+    snapshot_top: int = Field(default=20, gt=0, description="Allocation sites reported per snapshot")
+
+    model_config = SettingsConfigDict(env_prefix="CAQES_MEMORY_", extra="ignore")
+
+    def budget(self) -> Optional[MemoryBudget]:
+        """Build the memory budget, None if disabled or no limit is known."""
+        if not self.enabled:
+            return None
+        if self.limit_mb is not None:
+            limit = self.limit_mb * 1024 * 1024
+        else:
+            container_limit = container_memory_limit()
+            if container_limit is None:
+                return None
+            limit = int(container_limit * self.container_ratio)
+        return MemoryBudget(
+            limit,
+            resume_ratio=self.resume_ratio,
+            interval=self.check_interval,
+            max_shed_seconds=self.max_shed_seconds,
+            trace_frames=self.trace_frames,
+            snapshot_top=self.snapshot_top
+        )
@@ -1,33 +1,82 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from caqes_core.quarantine import NetworkIntegration, ProtocolIntegration, integration_factory
 from caqes_core.models.policy import Policy
 from caqes_core.policies import PolicyEvaluator
+from caqes_core.aggregation import AlertAggregator
+from caqes_core.allowlist import Allowlist
+from caqes_core.coordination import CoordinationFactory, Coordinator
+from caqes_core.enrichment import EnrichmentCache, EnrichmentFactory, Enricher, ProviderType
+from caqes_core.loggers.decision_logger import DecisionLogger
+from caqes_core.quarantine.quarantine_store import QuarantineStore
+from caqes_core.settings.aggregation_settings import AggregationSettings
+from caqes_core.settings.allowlist_settings import AllowlistSettings
+from caqes_core.settings.coordination_settings import CoordinationSettings
+from caqes_core.settings.decision_log_settings import DecisionLogSettings
+from caqes_core.settings.enrichment_settings import EnrichmentSettings
+from caqes_core.settings.dispatch_settings import DispatchSettings
+from caqes_core.settings.reconciliation_settings import ReconciliationSettings
+from caqes_core.settings.state_settings import StateSettings
+
+# Integration config keys consumed by CAQES rather than the integration itself
+RESERVED_INTEGRATION_KEYS = ("type", "dispatch")
 
 class OrchestratorSettings(BaseSettings):
     networks_config: List[dict] = Field(default_factory=list, description="List of network quarantine configs")
     protocols_config: List[dict] = Field(default_factory=list, description="List of protocol quarantine configs")
     policies_config: List[Policy] = Field(default_factory=list, description="List of policy configurations")
+    shadow_policies_config: List[Policy] = Field(default_factory=list, description="Candidate policies evaluated alongside the live ones without acting")
+    dry_run: bool = Field(default=False, description="Evaluate policies and log decisions without calling any integration")
+    decision_log_config: DecisionLogSettings = Field(default_factory=DecisionLogSettings, description="Decision log settings")
+    aggregation_config: AggregationSettings = Field(default_factory=AggregationSettings, description="Alert aggregation settings")
+    allowlist_config: AllowlistSettings = Field(default_factory=AllowlistSettings, description="Protected addresses never quarantined")
+    enrichment_config: EnrichmentSettings = Field(default_factory=EnrichmentSettings, description="Device enrichment settings")
+    state_config: StateSettings = Field(default_factory=StateSettings, description="Quarantine state settings")
+    reconciliation_config: ReconciliationSettings = Field(default_factory=ReconciliationSettings, description="State reconciliation settings")
+    dispatch_config: DispatchSettings = Field(default_factory=DispatchSettings, description="Default integration dispatch settings")
+    coordination_config: CoordinationSettings = Field(default_factory=CoordinationSettings, description="Multi-node coordination settings")
 
     def __init__(self, config_dict: Dict[str, Any] | None = None, **kwargs):
         if config_dict is not None:
             kwargs = {
                 "networks_config": config_dict.get("network", []),
                 "protocols_config": config_dict.get("protocol", []),
-                "policies_config": [Policy(**p) for p in config_dict.get("policies", [])]
+                "policies_config": [Policy(**p) for p in config_dict.get("policies", [])],
+                "shadow_policies_config": [Policy(**p) for p in config_dict.get("shadow_policies", [])],
+                "dry_run": config_dict.get("dry_run", False),
+                "decision_log_config": DecisionLogSettings(**config_dict.get("decision_log", {})),
+                "aggregation_config": AggregationSettings(**config_dict.get("aggregation", {})),
+                "allowlist_config": AllowlistSettings(**config_dict.get("allowlist", {})),
+                "enrichment_config": EnrichmentSettings(**config_dict.get("enrichment", {})),
+                "state_config": StateSettings(**config_dict.get("state", {})),
+                "reconciliation_config": ReconciliationSettings(**config_dict.get("reconciliation", {})),
+                "dispatch_config": DispatchSettings(**config_dict.get("dispatch", {})),
+                "coordination_config": CoordinationSettings(**config_dict.get("coordination", {}))
             }
 
         super().__init__(**kwargs)
 
+    def _integration_kwargs(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in config.items() if k not in RESERVED_INTEGRATION_KEYS}
+
+    def dispatch_for(self, module_type: str) -> DispatchSettings:
+        """Dispatch settings for an integration, with its own overrides applied."""
+        overrides = next(
+            (config.get("dispatch") or {} for config in self.protocols_config + self.networks_config
+             if config["type"] == module_type),
+            {}
+        )
+        return DispatchSettings(**{**self.dispatch_config.model_dump(), **overrides})
+
     @property
     def networks(self) -> List[NetworkIntegration]:
         return [
             integration_factory.create(
                 "network",
                 module_type=config["type"],
-                **{k: v for k, v in config.items() if k != "type"}
+                **self._integration_kwargs(config)
             )
             for config in self.networks_config
         ]
@@ -38,7 +87,7 @@ class OrchestratorSettings(BaseSettings):
             integration_factory.create(
                 "protocol", 
                 module_type=config["type"],
-                **{k: v for k, v in config.items() if k != "type"}
+                **self._integration_kwargs(config)
             )
             for config in self.protocols_config
         ]
@@ -47,4 +96,65 @@ class OrchestratorSettings(BaseSettings):
     def policies(self) -> List[PolicyEvaluator]:
         return [PolicyEvaluator(policy_config) for policy_config in self.policies_config]
 
+    @property
+    def shadow_policies(self) -> List[PolicyEvaluator]:
+        return [PolicyEvaluator(policy_config) for policy_config in self.shadow_policies_config]
+
+    @property
+    def decision_logger(self) -> Optional[DecisionLogger]:
+        if not self.decision_log_config.path:
+            return None
+        return DecisionLogger(
+            self.decision_log_config.path,
+            buffer_size=self.decision_log_config.buffer_size,
+            flush_interval=self.decision_log_config.flush_interval
+        )
+
+    @property
+    def aggregator(self) -> Optional[AlertAggregator]:
+        if not self.aggregation_config.enabled:
+            return None
+        return AlertAggregator(
+            window_seconds=self.aggregation_config.window_seconds,
+            bucket_seconds=self.aggregation_config.bucket_seconds,
+            max_sources=self.aggregation_config.max_sources
+        )
+
+    @property
+    def allowlist(self) -> Allowlist:
+        return Allowlist(
+            networks=self.allowlist_config.networks,
+            macs=self.allowlist_config.macs,
+            path=self.allowlist_config.path,
+            reload_interval=self.allowlist_config.reload_interval
+        )
+
+    @property
+    def enricher(self) -> Optional[Enricher]:
+        config = self.enrichment_config
+        if not config.enabled:
+            return None
+        providers = [
+            EnrichmentFactory.create(ProviderType(provider["type"]), **self._integration_kwargs(provider))
+            for provider in config.providers
+        ]
+        return Enricher(
+            providers,
+            EnrichmentCache(ttl=config.ttl, negative_ttl=config.negative_ttl, max_size=config.max_size),
+            batch_window=config.batch_window,
+            max_batch=config.max_batch,
+            timeout=config.timeout
+        )
+
+    @property
+    def coordinator(self) -> Coordinator:
+        config = self.coordination_config
+        backend = CoordinationFactory.create(config.type, config.node_id, config.path, config.url, config.prefix)
+        return Coordinator(backend, claim_ttl=config.claim_ttl, lease_ttl=config.lease_ttl)
+
+    def quarantine_store(self, coordinator: Coordinator) -> QuarantineStore:
+        """Quarantine store sharing its records through the coordinator's backend when it is shared."""
+        backend = coordinator.backend if coordinator.backend.shared else None
+        return QuarantineStore(path=self.state_config.path, backend=backend)
+
     model_config = SettingsConfigDict(extra="ignore")
\ No newline at end of file
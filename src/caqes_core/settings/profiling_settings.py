@@ -0,0 +1,16 @@
+from typing import Optional
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from caqes_core.profiling import ProfileMode
+
+class ProfilingSettings(BaseSettings):
+    """Settings for diagnosing where CPU time goes on a live process."""
+    stage_timings: bool = Field(default=False, description="Time alert handling, policy evaluation and bans all the time, not only during profile windows")
+    endpoint: bool = Field(default=False, description="Serve /profile on the health server to profile a window on demand")
+    startup_window: Optional[float] = Field(default=None, gt=0, description="Seconds to profile from startup, disabled if unset")
+    mode: ProfileMode = Field(default=ProfileMode.SAMPLING, description="Profiler of the startup window, sampling or cprofile")
+    output_dir: str = Field(default="/tmp/caqes-profiles", description="Directory profiles are written to")
+    sample_interval: float = Field(default=0.005, gt=0, description="Seconds between stack samples, sampling mode only")
+    max_duration: float = Field(default=300.0, gt=0, description="Longest profile window accepted")
+
+    model_config = SettingsConfigDict(env_prefix="CAQES_PROFILING_", extra="ignore")
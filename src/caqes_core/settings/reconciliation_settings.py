@@ -0,0 +1,10 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class ReconciliationSettings(BaseSettings):
+    """Settings for reconciling local quarantine state with the integrations."""
+    enabled: bool = Field(default=True, description="Reconcile at startup and periodically afterwards")
+    interval: float = Field(default=300.0, gt=0, description="Seconds between periodic reconciliation passes")
+    prune_unknown: bool = Field(default=False, description="Unban remote entries that have no local quarantine record, only with persisted or shared state")
+
+    model_config = SettingsConfigDict(env_prefix="CAQES_RECONCILIATION_", extra="ignore")
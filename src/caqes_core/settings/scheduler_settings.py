@@ -0,0 +1,20 @@
+from typing import List
+from pydantic import Field, model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class SchedulerSettings(BaseSettings):
+    """Settings for the priority scheduler between alert decoding and quarantine."""
+    enabled: bool = Field(default=True, description="Schedule quarantine work by alert priority")
+    weights: List[int] = Field(default_factory=lambda: [8, 4, 2, 1], description="Dequeue weight per priority level, highest priority first")
+    concurrency: int = Field(default=8, gt=0, description="Number of alerts quarantined concurrently")
+    max_queue_size: int = Field(default=10_000, gt=0, description="Maximum queued alerts across all levels")
+    max_wait: float = Field(default=5.0, gt=0, description="Seconds after which a queued alert is overdue")
+    overdue_every: int = Field(default=4, gt=0, description="One dequeue in this many serves the longest-waiting overdue alert regardless of weight")
+
+    @model_validator(mode="after")
+    def validate_weights(self):
+        if not self.weights or any(weight <= 0 for weight in self.weights):
+            raise ValueError("weights must be a non-empty list of positive integers")
+        return self
+
+    model_config = SettingsConfigDict(env_prefix="CAQES_SCHEDULER_", extra="ignore")
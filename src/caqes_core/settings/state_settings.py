@@ -0,0 +1,13 @@
+from typing import Optional
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class StateSettings(BaseSettings):
+    """Settings for the local quarantine state store and unban scheduler."""
+    path: Optional[str] = Field(default=None, description="SQLite file persisting quarantine state, in-memory only if unset")
+    default_ban_duration: Optional[float] = Field(default=None, gt=0, description="Ban duration in seconds when a policy sets none, permanent if unset")
+    unban_batch_size: int = Field(default=100, gt=0, description="Maximum number of expired bans lifted per batch")
+    unban_batch_window: float = Field(default=1.0, ge=0, description="Seconds to wait after an expiry so nearby expiries share a batch")
+    unban_retry_delay: float = Field(default=30.0, gt=0, description="Seconds before retrying a failed unban")
+
+    model_config = SettingsConfigDict(env_prefix="CAQES_STATE_", extra="ignore")
@@ -1,6 +1,25 @@
-from typing import Dict, Any
+from functools import partial
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from caqes_core.models import alert_formats, create_adapter
 from caqes_core.mq import ClientType
+from caqes_core.scheduling import PriorityScheduler, TopicPipeline
+from caqes_core.settings.scheduler_settings import SchedulerSettings
+
+class TopicSubscription(BaseModel):
+    """A topic filter the workers subscribe to, and how the alerts published to it are handled."""
+    topic: str = Field(description="MQTT topic filter, wildcards and $share/<group>/ prefixes allowed")
+    format: str = Field(default="caqes", description="Alert format published to the topic")
+    policies: Optional[List[str]] = Field(default=None, description="Names of the policies judging these alerts, all of them if unset")
+    concurrency: Optional[int] = Field(default=None, gt=0, description="Alerts of the topic quarantined at once, sharing the scheduler if unset")
+
+    @field_validator("format")
+    @classmethod
+    def validate_format(cls, value: str) -> str:
+        if value not in alert_formats():
+            raise ValueError(f"Unknown alert format {value}, available formats are {alert_formats()}")
+        return value
 
 class WorkerSettings(BaseSettings):
     client_type: ClientType = ClientType.MQTT
@@ -11,6 +30,7 @@ class WorkerSettings(BaseSettings):
     username: str = ""
     password: str = ""
     topic: str = "alerts"
+    subscriptions: List[TopicSubscription] = Field(default_factory=list, description="Topics subscribed to instead of topic, the first matching one handles a message")
 
     def __init__(self, config_dict: Dict[str, Any] | None = None, **kwargs):
         if config_dict is not None:
@@ -22,9 +42,47 @@ class WorkerSettings(BaseSettings):
                 "port": config_dict.get("port", 1883),
                 "username": config_dict.get("username", ""),
                 "password": config_dict.get("password", ""),
-                "topic": config_dict.get("topic", "alerts")
+                "topic": config_dict.get("topic", "alerts"),
+                "subscriptions": config_dict.get("subscriptions", [])
             }
 
         super().__init__(**kwargs)
 
-    model_config = SettingsConfigDict(extra="ignore")
\ No newline at end of file
+    @property
+    def topic_subscriptions(self) -> List[TopicSubscription]:
+        return self.subscriptions or [TopicSubscription(topic=self.topic)]
+
+    def pipelines(self, orchestrator, scheduler: Optional[PriorityScheduler] = None,
+                  scheduler_settings: Optional[SchedulerSettings] = None) -> List[TopicPipeline]:
+        """Build a pipeline per subscription, handing alerts to the orchestrator.
+
+        Subscriptions with a concurrency get a scheduler of their own, the
+        others share ``scheduler``, each alert queued with the policy set of
+        its subscription.
+        """
+        scheduler_settings = scheduler_settings or SchedulerSettings()
+        pipelines = []
+        for subscription in self.topic_subscriptions:
+            handler = orchestrator.quarantine
+            if subscription.policies is not None:
+                handler = partial(orchestrator.quarantine, policies=orchestrator.policy_set(subscription.policies))
+            own = None
+            if subscription.concurrency:
+                own = PriorityScheduler(
+                    handler,
+                    weights=scheduler_settings.weights,
+                    concurrency=subscription.concurrency,
+                    max_queue_size=scheduler_settings.max_queue_size,
+                    max_wait=scheduler_settings.max_wait,
+                    overdue_every=scheduler_settings.overdue_every
+                )
+            pipelines.append(TopicPipeline(
+                subscription.topic,
+                create_adapter(subscription.format),
+                handler,
+                scheduler=own if own is not None else scheduler,
+                owns_scheduler=own is not None
+            ))
+        return pipelines
+
+    model_config = SettingsConfigDict(extra="ignore")
@@ -1,42 +1,100 @@
 import asyncio
-import json
 import logging
 import secrets
+from functools import partial
+from typing import Dict, List, Optional
+from pydantic import ValidationError
 
 from .settings import WorkerSettings
 
-from .models import Alert
+from .budget import MemoryBudget
+from .models import AlertFormatError
+from .dead_letter import DeadLetterQueue
+from .profiling import timed
 
 from .mq.client_factory import ClientFactory as MqClientFactory
 from .mq.message import Message
 from .mq.client import Client as MqClient
 
 from .quarantine.quarantine_orchestrator import QuarantineOrchestrator
+from .scheduling import PriorityScheduler, TopicPipeline
+
+# Topics whose pipeline is remembered, in case publishers use a topic per device
+MAX_CACHED_TOPICS = 1024
 
 class Worker:
-    def __init__(self, settings: WorkerSettings , orchestrator: QuarantineOrchestrator) -> None:
+    def __init__(self, settings: WorkerSettings , orchestrator: QuarantineOrchestrator,
+                 scheduler: Optional[PriorityScheduler] = None,
+                 dead_letters: Optional[DeadLetterQueue] = None,
+                 pipelines: Optional[List[TopicPipeline]] = None,
+                 memory_budget: Optional[MemoryBudget] = None) -> None:
         self.worker_id = secrets.token_hex(4)
         self.logger = logging.getLogger(f"caqes.worker-{self.worker_id}")
         self.mq : MqClient = None
         self.settings = settings
         self.quarantine_orchestrator = orchestrator
+        self.scheduler = scheduler
+        self.dead_letters = dead_letters
+        self.memory_budget = memory_budget
+        self.running = False
+        # Pipelines shared with the other workers are started by the caller, the worker starts those it builds
+        self.owns_pipelines = pipelines is None
+        self.pipelines = settings.pipelines(orchestrator, scheduler) if pipelines is None else pipelines
+        self._topic_pipelines: Dict[str, TopicPipeline] = {}
+        self._stopping = asyncio.Event()
+        self._consuming = False
 
     async def run(self) -> None:
         self.logger.info("Starting worker")
         try:
             await self._ensure_connected()
 
-            await self.mq.subscribe("alerts", self._handle_alert)
+            if self.owns_pipelines:
+                for pipeline in self.pipelines:
+                    pipeline.start()
+            for pipeline in self.pipelines:
+                await self.mq.subscribe(pipeline.topic, partial(self._handle_alert, pipeline=pipeline))
+            self._consuming = True
+            self.running = True
 
-            # Keep the worker running
-            while True:
-                await asyncio.sleep(1)
+            # Keep the worker running until stop() is called
+            await self._stopping.wait()
 
         except Exception as e:
             self.logger.error(f"Worker error: {e}")
         finally:
+            self.running = False
+            self._consuming = False
             if self.mq:
                 await self.mq.close()
+            if self.owns_pipelines:
+                for pipeline in self.pipelines:
+                    await pipeline.stop()
+
+    async def stop_consuming(self) -> None:
+        """Unsubscribe from every topic and wait for the messages already received to be submitted.
+
+        The connection stays open, so alerts submitted before can still be
+        quarantined, until stop() is called.
+        """
+        if not self._consuming:
+            return
+        self._consuming = False
+        for pipeline in self.pipelines:
+            try:
+                await self.mq.unsubscribe(pipeline.topic)
+            except Exception as e:
+                self.logger.error(f"Failed to unsubscribe from {pipeline.topic}")
+                self.logger.debug(f"Unsubscribe error details: {str(e)}")
+        await self.mq.drain()
+        self.logger.info("Stopped consuming alerts")
+
+    def stop(self) -> None:
+        """Let run() return, closing the message queue connection."""
+        self._stopping.set()
+
+    async def is_connected(self) -> bool:
+        return self.mq is not None and await self.mq.is_connected()
 
     async def _ensure_connected(self) -> None:
         if not self.mq:
@@ -51,33 +109,66 @@ class Worker:
                 self.logger.error(f"Failed to connect to message queue: {e}")
                 raise e
 
-    async def _handle_alert(self, msg: Message) -> None:
-        if not msg.data:
-            self.logger.warning("Received empty message")
+    def _pipeline(self, topic: str) -> TopicPipeline:
+        """Pipeline handling the alerts published to a topic, the first subscription matching it."""
+        pipeline = self._topic_pipelines.get(topic)
+        if pipeline is None:
+            pipeline = next((p for p in self.pipelines if p.matches(topic)), self.pipelines[0])
+            if len(self._topic_pipelines) >= MAX_CACHED_TOPICS:
+                self._topic_pipelines.clear()
+            self._topic_pipelines[topic] = pipeline
+        return pipeline
+
+    async def _reject(self, msg: Message, reason: str, error: Optional[Exception] = None) -> None:
+        """Dead-letter a message that cannot be processed, or NAK it when there is no dead letter queue."""
+        if self.dead_letters is None:
+            self.logger.error(f"Rejected {reason} alert message")
+            if error is not None:
+                self.logger.debug(f"Rejection details: {str(error)}")
             await msg.nak()
-            raise ValueError("Message data is empty")
+            return
+        # The dead letter queue now owns the message, so the broker must not redeliver it
+        self.dead_letters.reject(reason, msg.data or b"", error, worker=self.worker_id)
+        await msg.ack()
 
-        self.logger.debug("Processing new alert message")
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+    @timed("handle_alert")
+    async def _handle_alert(self, msg: Message, pipeline: Optional[TopicPipeline] = None) -> None:
+        owner = self._pipeline(msg.topic)
+        if pipeline is not None and pipeline is not owner:
+            # Delivered again for an overlapping subscription, the first matching one handles it
+            await msg.ack()
+            return
+        if self.memory_budget is not None and not self.memory_budget.admit():
+            # Shed before decoding, the budget counts and logs the alerts dropped
+            await msg.ack()
+            return
+
+        if not msg.data:
+            self.logger.debug("Received empty message")
+            await self._reject(msg, "empty")
+            return
 
-        data = json.loads(msg.data.decode())
+        self.logger.debug("Processing new alert message")
         try:
-            alert = Alert(**data)
-            self.logger.info(f"Created alert object with ID {alert.alert_id}")
-            self.logger.debug(f"Alert details: {alert.model_dump()}")
-        except Exception as e:
-            self.logger.error("Failed to parse alert data")
-            self.logger.debug(f"Parse error: {str(e)}")
-            self.logger.debug(f"Raw data: {data}")
-            await msg.nak()
+            alert = owner.adapter.decode(msg.data)
+        except (ValidationError, AlertFormatError) as e:
+            self.logger.debug("Failed to parse alert data")
+            await self._reject(msg, "invalid", e)
+            return
+        except ValueError as e:
+            # Covers undecodable bytes too, as UnicodeDecodeError is a ValueError.
+            # Poison floods are counted by the dead letter queue rather than logged one by one.
+            self.logger.debug("Failed to decode alert message")
+            await self._reject(msg, "undecodable", e)
+            return
+        if alert is None:
+            self.logger.debug(f"Ignoring non-alert event on {msg.topic}")
+            await msg.ack()
             return
+        self.logger.info(f"Created alert object with ID {alert.alert_id}")
+        self.logger.debug(f"Alert details: {alert.model_dump()}")
 
-        if alert:
-            self.logger.info(f"Scheduling quarantine task for alert {alert.alert_id}")
-            loop.create_task(
-                self.quarantine_orchestrator.quarantine(alert))
+        self.logger.info(f"Scheduling quarantine task for alert {alert.alert_id}")
+        if not owner.submit(alert):
+            self.logger.warning(f"Scheduler queue full, dropped alert {alert.alert_id}")
         await msg.ack()
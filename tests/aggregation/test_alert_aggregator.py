@@ -0,0 +1,96 @@
+import pytest
+from caqes_core.aggregation import AlertAggregator, WindowStats
+from caqes_core.models import Alert, Policy
+from caqes_core.policies import PolicyEvaluator
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_alert(source_ip="192.168.1.50", port=1883, classification="Misc activity") -> Alert:
+    return Alert(source_ip=source_ip, source_port=40000, destination_ip="192.168.1.10",
+                 destination_port=port, classification=classification, raw="test")
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def aggregator(clock) -> AlertAggregator:
+    return AlertAggregator(window_seconds=10, bucket_seconds=1, max_sources=3, clock=clock)
+
+
+def test_observe_counts_distinct_fields(aggregator: AlertAggregator):
+    aggregator.observe(make_alert(port=22, classification="a"))
+    aggregator.observe(make_alert(port=23, classification="a"))
+    stats = aggregator.observe(make_alert(port=22, classification="b"))
+
+    assert stats == WindowStats(count=3, distinct_destination_ports=2, distinct_classifications=2)
+
+
+def test_observe_is_per_source(aggregator: AlertAggregator):
+    aggregator.observe(make_alert(source_ip="10.0.0.1"))
+    stats = aggregator.observe(make_alert(source_ip="10.0.0.2"))
+
+    assert stats.count == 1
+
+
+def test_old_buckets_slide_out_of_window(aggregator: AlertAggregator, clock: FakeClock):
+    aggregator.observe(make_alert(port=22))
+    clock.now += 5
+    aggregator.observe(make_alert(port=23))
+    clock.now += 6
+
+    stats = aggregator.observe(make_alert(port=24))
+
+    assert stats.count == 2
+    assert stats.distinct_destination_ports == 2
+
+
+def test_sweep_evicts_idle_sources(aggregator: AlertAggregator, clock: FakeClock):
+    aggregator.observe(make_alert(source_ip="10.0.0.1"))
+    clock.now += 8
+    aggregator.observe(make_alert(source_ip="10.0.0.2"))
+    clock.now += 5
+
+    assert aggregator.sweep() == 1
+    assert len(aggregator) == 1
+
+
+def test_buckets_are_allocated_on_first_alert(aggregator: AlertAggregator, clock: FakeClock):
+    aggregator.observe(make_alert(port=22))
+    clock.now += 1
+    aggregator.observe(make_alert(port=23))
+
+    [window] = aggregator._windows.values()
+    assert sum(ports is not None for ports in window.ports) == 2
+    assert sum(classifications is not None for classifications in window.classifications) == 2
+
+
+def test_max_sources_evicts_least_recently_seen(aggregator: AlertAggregator):
+    for ip in ["10.0.0.1", "10.0.0.2", "10.0.0.3"]:
+        aggregator.observe(make_alert(source_ip=ip))
+    aggregator.observe(make_alert(source_ip="10.0.0.1"))
+    aggregator.observe(make_alert(source_ip="10.0.0.4"))
+
+    assert len(aggregator) == 3
+    assert aggregator.stats(make_alert(source_ip="10.0.0.2")).count == 0
+    assert aggregator.stats(make_alert(source_ip="10.0.0.1")).count == 2
+
+
+def test_policy_can_reference_window_fields(aggregator: AlertAggregator):
+    policy = PolicyEvaluator(Policy(name="burst", description="3 alerts in window",
+                                    rules=["window['count'] >= 3 and window['distinct_destination_ports'] >= 2"]))
+    results = []
+    for port in [22, 22, 23]:
+        alert = make_alert(port=port)
+        results.append(policy.evaluate(alert, {"window": aggregator.observe(alert).as_dict()}))
+
+    assert results == [False, False, True]
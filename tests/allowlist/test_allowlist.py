@@ -0,0 +1,112 @@
+import asyncio
+import os
+import pytest
+from caqes_core.allowlist import Allowlist, CidrTrie
+from caqes_core.models import Alert
+from caqes_core.quarantine.quarantine_orchestrator import QuarantineOrchestrator
+from caqes_core.settings import OrchestratorSettings
+
+
+def make_alert(ip: str) -> Alert:
+    return Alert(source_ip=ip, source_port=40000, destination_ip="192.168.1.10", destination_port=22,
+                 priority="1", timestamp="2025-01-01T00:00:00", classification="Misc activity", raw="raw")
+
+
+def test_trie_matches_shortest_covering_prefix():
+    trie = CidrTrie()
+    trie.insert("10.0.0.0/8")
+    trie.insert("10.1.2.3")
+    trie.insert("fd00::/64")
+
+    assert trie.match("10.1.2.3") == "10.0.0.0/8"
+    assert trie.match("11.0.0.1") is None
+    assert trie.match("fd00::1") == "fd00::/64"
+    assert trie.match("fd00:0:0:1::1") is None
+    assert trie.match("::ffff:10.9.9.9") == "10.0.0.0/8"
+    assert "10.200.0.1" in trie
+    assert len(trie) == 3
+
+
+def test_trie_rejects_invalid_networks():
+    with pytest.raises(ValueError):
+        CidrTrie().insert("10.0.0.300/8")
+
+
+def test_mac_entries_are_normalised():
+    allowlist = Allowlist(networks=["192.168.1.1"], macs=["AA-BB-CC-DD-EE-FF"])
+
+    assert allowlist.protected("192.168.1.1") == "192.168.1.1/32"
+    assert allowlist.protected("192.168.1.2", "aa:bb:cc:dd:ee:ff") == "aa:bb:cc:dd:ee:ff"
+    assert allowlist.protected("192.168.1.2", "aa:bb:cc:dd:ee:00") is None
+
+
+def test_reload_swaps_entries_and_keeps_previous_on_error(tmp_path):
+    path = tmp_path / "allowlist.yaml"
+    path.write_text("networks: ['192.168.1.0/24']\n")
+    allowlist = Allowlist(networks=["10.0.0.1"], path=str(path))
+
+    assert allowlist.reload()
+    assert allowlist.protected("192.168.1.20") == "192.168.1.0/24"
+    assert allowlist.protected("10.0.0.1") == "10.0.0.1/32"
+    assert not allowlist.reload()
+
+    path.write_text("networks: ['not a network']\n")
+    os.utime(path, (1, 1))
+    assert not allowlist.reload()
+    assert allowlist.protected("192.168.1.20") == "192.168.1.0/24"
+
+    path.write_text("macs: ['aa:bb:cc:dd:ee:ff']\n")
+    os.utime(path, (2, 2))
+    assert allowlist.reload()
+    assert allowlist.protected("192.168.1.20") is None
+    assert allowlist.protected("192.168.1.20", "AA:BB:CC:DD:EE:FF") == "aa:bb:cc:dd:ee:ff"
+
+
+@pytest.mark.parametrize("content", [
+    "macs:\n  - 10:20:30:40:50:59\n",  # unquoted, read as an integer
+    "macs: ['aa:bb:cc']\n",
+    "macs: 5\n",
+    "networks: [{cidr: '10.0.0.0/8'}]\n",
+])
+def test_reload_keeps_previous_on_malformed_entries(tmp_path, content):
+    path = tmp_path / "allowlist.yaml"
+    path.write_text("macs: ['aa:bb:cc:dd:ee:ff']\n")
+    allowlist = Allowlist(path=str(path))
+    assert allowlist.reload()
+
+    path.write_text(content)
+    os.utime(path, (1, 1))
+    assert not allowlist.reload()
+    assert allowlist.protected("10.0.0.1", "aa:bb:cc:dd:ee:ff") == "aa:bb:cc:dd:ee:ff"
+
+
+@pytest.mark.asyncio
+async def test_malformed_file_does_not_stop_startup(tmp_path):
+    path = tmp_path / "allowlist.yaml"
+    path.write_text("macs: 5\n")
+    allowlist = Allowlist(networks=["10.0.0.1"], path=str(path), reload_interval=0.01)
+
+    allowlist.start()
+    await asyncio.sleep(0.05)
+
+    assert not allowlist._task.done()
+    assert allowlist.protected("10.0.0.1") == "10.0.0.1/32"
+    await allowlist.stop()
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_skips_protected_sources():
+    orchestrator = QuarantineOrchestrator(OrchestratorSettings(config_dict={
+        "dry_run": True,
+        "allowlist": {"networks": ["192.168.1.1", "fd00::/64"]},
+        "policies": [{"name": "any", "description": "", "rules": ["true"]}],
+    }))
+    await orchestrator.start()
+
+    await orchestrator.quarantine(make_alert("192.168.1.1"))
+    await orchestrator.quarantine(make_alert("fd00::53"))
+    await orchestrator.quarantine(make_alert("192.168.1.2"))
+    await orchestrator.stop()
+
+    assert orchestrator.protected_hits == 2
+    assert [r.ip for r in orchestrator.store.records()] == ["192.168.1.2"]
@@ -0,0 +1,31 @@
+import os
+import pytest
+from benchmarks import micro
+
+# Allowed slowdown relative to the stored baseline before the run fails
+THRESHOLD = float(os.getenv("CAQES_BENCH_THRESHOLD", "2.0"))
+
+BASELINE = micro.load_baseline().get("cases", {})
+
+
+@pytest.fixture(scope="module")
+def calibration_unit() -> float:
+    return micro.calibrate()
+
+
+@pytest.fixture(scope="module")
+def cases():
+    return micro.cases()
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("name", sorted(BASELINE))
+def test_micro_benchmark_within_threshold(name: str, cases, calibration_unit: float):
+    """Fail when a hot path is slower than the stored baseline by more than THRESHOLD."""
+    relative = micro.measure(cases[name]) / calibration_unit
+    allowed = BASELINE[name]["relative"] * THRESHOLD
+
+    assert relative <= allowed, (
+        f"{name} regressed: {relative:.3f} units vs baseline "
+        f"{BASELINE[name]['relative']:.3f} (threshold {THRESHOLD}x)"
+    )
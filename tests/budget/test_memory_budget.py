@@ -0,0 +1,148 @@
+import asyncio
+import gc
+import json
+import tracemalloc
+import pytest
+from unittest.mock import AsyncMock
+from paho.mqtt.client import MQTTMessage
+from caqes_core.budget import MemoryBudget
+from caqes_core.mq import ClientType
+from caqes_core.mq.memory.memory_client import MemoryBroker, MemoryClient
+from caqes_core.mq.mqtt.mqtt_message import MqttMessage
+from caqes_core.settings import WorkerSettings
+from caqes_core.worker import Worker
+
+MIB = 1024 * 1024
+ALERT = {
+    "source_ip": "192.168.1.50",
+    "source_port": 51234,
+    "destination_ip": "192.168.1.10",
+    "destination_port": 1883,
+    "raw": "test",
+}
+
+
+class FakeRss:
+    def __init__(self, value: int):
+        self.value = value
+
+    def __call__(self) -> int:
+        return self.value
+
+
+def test_sheds_until_back_under_resume_ratio():
+    rss = FakeRss(50 * MIB)
+    budget = MemoryBudget(100 * MIB, resume_ratio=0.8, rss=rss)
+    assert not budget.check() and budget.admit()
+
+    rss.value = 120 * MIB
+    assert budget.check()
+    assert not budget.admit() and not budget.admit()
+    rss.value = 90 * MIB
+    assert budget.check()
+    rss.value = 70 * MIB
+    assert not budget.check() and budget.admit()
+
+    assert budget.shed == 2
+    assert budget.status()["rss_bytes"] == 70 * MIB
+
+
+def test_resumes_once_backlog_drains_even_if_rss_stays_high():
+    rss = FakeRss(120 * MIB)
+    pending = [50]
+    budget = MemoryBudget(100 * MIB, rss=rss, max_shed_seconds=None)
+    budget.track("alerts_pending", lambda: pending[0], backlog=True)
+    budget.track("tasks", lambda: 7)
+    assert budget.check()
+
+    pending[0] = 0
+    # The allocator keeps the freed memory, RSS never falls
+    assert not budget.check() and budget.admit()
+    assert budget.floor == 120 * MIB
+    # Only further growth past the floor sheds again
+    rss.value = 125 * MIB
+    assert not budget.check()
+    rss.value = 140 * MIB
+    assert budget.check()
+
+    rss.value = 80 * MIB
+    assert not budget.check()
+    assert budget.floor is None
+
+
+def test_resumes_after_max_shed_seconds():
+    now = [0.0]
+    rss = FakeRss(120 * MIB)
+    budget = MemoryBudget(100 * MIB, rss=rss, max_shed_seconds=60, clock=lambda: now[0])
+    budget.track("alerts_pending", lambda: 10, backlog=True)
+    assert budget.check()
+
+    now[0] = 30
+    assert budget.check()
+    now[0] = 60
+    assert not budget.check()
+    assert budget.status()["floor_bytes"] == 120 * MIB
+
+
+def test_live_counts_skip_failing_sources():
+    budget = MemoryBudget(100 * MIB, rss=FakeRss(0))
+    budget.track("alerts_pending", lambda: 3)
+    budget.track("broken", lambda: 1 / 0)
+
+    assert budget.counts() == {"alerts_pending": 3}
+
+
+@pytest.mark.asyncio
+async def test_worker_sheds_alerts_while_budget_exceeded():
+    broker = MemoryBroker()
+    settings = WorkerSettings(client_type=ClientType.MEMORY)
+    orchestrator = AsyncMock()
+    rss = FakeRss(200 * MIB)
+    budget = MemoryBudget(100 * MIB, rss=rss)
+    budget.check()
+    worker = Worker(settings, orchestrator, memory_budget=budget)
+    worker.mq = MemoryClient(settings, broker)
+    task = asyncio.create_task(worker.run())
+    while not worker.running:
+        await asyncio.sleep(0.01)
+
+    broker.publish("alerts", json.dumps(ALERT).encode())
+    await worker.mq.drain()
+    rss.value = 10 * MIB
+    budget.check()
+    broker.publish("alerts", json.dumps(ALERT).encode())
+    await worker.mq.drain()
+    await worker.pipelines[0].drain(timeout=1)
+    worker.stop()
+    await task
+
+    assert budget.shed == 1
+    assert orchestrator.quarantine.await_count == 1
+
+
+def test_snapshot_reports_allocation_growth():
+    budget = MemoryBudget(100 * MIB, rss=FakeRss(0))
+    was_tracing = tracemalloc.is_tracing()
+    try:
+        budget.snapshot()
+        assert tracemalloc.is_tracing()
+        budget.snapshot()
+        retained = [bytes(1024) for _ in range(2000)]
+        report = budget.snapshot()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    assert len(retained) == 2000
+    assert report["top"]
+    assert any(__file__ in entry["location"] and entry["size_diff_kb"] > 1000 for entry in report["growth"])
+
+
+def test_mqtt_message_does_not_keep_the_paho_message():
+    message = MQTTMessage(topic=b"alerts")
+    message.payload = b"{}"
+
+    wrapped = MqttMessage(message)
+
+    assert (wrapped.topic, wrapped.data) == ("alerts", b"{}")
+    assert not any(isinstance(referent, MQTTMessage) for referent in gc.get_referents(wrapped))
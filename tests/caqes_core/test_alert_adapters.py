@@ -0,0 +1,124 @@
+import json
+import pytest
+from unittest.mock import AsyncMock
+from pydantic import ValidationError
+from caqes_core.models import AlertFormatError, create_adapter
+from caqes_core.models.alert_adapters import compile_extractor
+from caqes_core.mq import ClientType
+from caqes_core.mq.memory.memory_message import MemoryMessage
+from caqes_core.settings import WorkerSettings
+from caqes_core.worker import Worker
+
+EVE_ALERT = {
+    "timestamp": "2025-03-01T12:00:00.123456+0000",
+    "event_type": "alert",
+    "src_ip": "192.168.1.50",
+    "src_port": 51234,
+    "dest_ip": "192.168.1.10",
+    "dest_port": 1883,
+    "proto": "TCP",
+    "alert": {"gid": 1, "signature_id": 2000000, "rev": 1, "signature": "ET SCAN Potential MQTT scan",
+              "category": "Attempted Information Leak", "severity": 2},
+}
+
+SNORT_FAST = (b"03/01/25-12:00:00.123456  [**] [1:2000000:1] ET SCAN Potential MQTT scan [**] "
+              b"[Classification: Attempted Information Leak] [Priority: 2] {TCP} 192.168.1.50:51234 -> 192.168.1.10:1883")
+
+
+def test_compiled_extractor_tries_paths_in_order_and_converts():
+    extract = compile_extractor({
+        "source_ip": ((("id.orig_h",), ("src",)), None),
+        "priority": ((("alert", "severity"),), str),
+        "classification": ((("note",),), None),
+    })
+
+    assert extract({"src": "10.0.0.1", "alert": {"severity": 3}}) == {"source_ip": "10.0.0.1", "priority": "3"}
+
+
+def test_suricata_eve_alert():
+    alert = create_adapter("suricata").decode(json.dumps(EVE_ALERT).encode())
+
+    assert (str(alert.source_ip), alert.source_port, str(alert.destination_ip), alert.destination_port) == \
+        ("192.168.1.50", 51234, "192.168.1.10", 1883)
+    assert alert.priority == "2"
+    assert alert.classification == "Attempted Information Leak"
+    assert alert.raw.startswith("[1:2000000:1] ET SCAN Potential MQTT scan [Classification: Attempted")
+
+
+def test_suricata_ignores_other_event_types():
+    assert create_adapter("suricata").decode(json.dumps({**EVE_ALERT, "event_type": "flow"}).encode()) is None
+
+
+@pytest.mark.parametrize("payload, expected", [
+    (SNORT_FAST, ("192.168.1.50", 51234, "192.168.1.10", 1883)),
+    (b"03/01-12:00:00  [**] [1:2:1] ping [**] [Priority: 3] {ICMP} fd00::1 -> fd00::2", ("fd00::1", 0, "fd00::2", 0)),
+    (b"03/01-12:00:00  [**] [1:2:1] ssh [**] {TCP} fd00::1:5000 -> [fd00::2]:22", ("fd00::1", 5000, "fd00::2", 22)),
+])
+def test_snort_fast_alert(payload, expected):
+    alert = create_adapter("snort").decode(payload)
+
+    assert (str(alert.source_ip), alert.source_port, str(alert.destination_ip), alert.destination_port) == expected
+    assert alert.raw == payload.decode()
+
+
+def test_snort_json_alert():
+    event = {"src_addr": "10.0.0.1", "src_port": 1234, "dst_addr": "10.0.0.2", "dst_port": 80,
+             "priority": 1, "class": "Web Application Attack", "msg": "SQL injection", "sid": 42, "proto": "TCP"}
+
+    alert = create_adapter("snort").decode(json.dumps(event).encode())
+
+    assert alert.classification == "Web Application Attack"
+    assert alert.raw.startswith("[1:42:0] SQL injection")
+
+
+def test_snort_rejects_other_lines():
+    with pytest.raises(AlertFormatError):
+        create_adapter("snort").decode(b"not an alert")
+
+
+def test_zeek_notice():
+    notice = {"ts": 1740830400.5, "note": "Scan::Port_Scan", "msg": "10.0.0.3 scanned 15 ports", "src": "10.0.0.3", "p": 22}
+
+    alert = create_adapter("zeek").decode(json.dumps(notice).encode())
+
+    assert str(alert.source_ip) == "10.0.0.3"
+    assert alert.destination_port == 22
+    assert alert.classification == "Scan::Port_Scan"
+    assert create_adapter("zeek").decode(json.dumps({"ts": 1, "note": "Weird::Thing"}).encode()) is None
+
+
+def test_caqes_format_is_validated():
+    with pytest.raises(ValidationError):
+        create_adapter("caqes").decode(b'{"source_ip": "10.0.0.1"}')
+
+
+def test_unknown_format_rejected_by_settings():
+    with pytest.raises(ValidationError):
+        WorkerSettings(subscriptions=[{"topic": "ids/#", "format": "bro"}])
+
+
+class ListScheduler:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, alert, handler=None) -> bool:
+        self.submitted.append(alert)
+        return True
+
+
+@pytest.mark.asyncio
+async def test_worker_picks_adapter_by_topic():
+    scheduler = ListScheduler()
+    settings = WorkerSettings(client_type=ClientType.MEMORY, subscriptions=[
+        {"topic": "ids/suricata/#", "format": "suricata"}, {"topic": "alerts"}])
+    worker = Worker(settings, orchestrator=AsyncMock(), scheduler=scheduler)
+
+    for topic, payload in (("ids/suricata/eve", json.dumps(EVE_ALERT).encode()),
+                           ("ids/suricata/eve", json.dumps({**EVE_ALERT, "event_type": "dns"}).encode())):
+        message = MemoryMessage(topic, payload)
+        message.ack = AsyncMock()
+        await worker._handle_alert(message)
+        message.ack.assert_awaited_once()
+
+    assert [str(alert.source_ip) for alert in scheduler.submitted] == ["192.168.1.50"]
+    assert worker._pipeline("alerts").adapter.name == "caqes"
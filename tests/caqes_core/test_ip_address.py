@@ -0,0 +1,38 @@
+import ipaddress
+import json
+import pytest
+from pydantic import ValidationError
+from caqes_core.models import Alert, intern_ip, ip_key, ip_text
+
+
+def make_alert(source_ip: str) -> Alert:
+    return Alert(source_ip=source_ip, source_port=40000, destination_ip="192.168.1.10", destination_port=22,
+                 priority="1", timestamp="2025-01-01T00:00:00", classification="Misc activity", raw="raw")
+
+
+def test_alerts_share_interned_addresses():
+    first, second = make_alert("10.0.0.1"), make_alert("10.0.0.1")
+
+    assert first.source_ip is second.source_ip
+    assert first.source_ip == ipaddress.IPv4Address("10.0.0.1")
+    assert intern_ip(first.source_ip) is first.source_ip
+
+
+def test_invalid_addresses_are_rejected():
+    with pytest.raises(ValidationError):
+        make_alert("10.0.0.300")
+
+
+def test_addresses_serialise_as_text_in_json_only():
+    alert = make_alert("FD00::1")
+
+    assert isinstance(alert.model_dump()["source_ip"], ipaddress.IPv6Address)
+    assert json.loads(alert.model_dump_json())["source_ip"] == "fd00::1"
+
+
+def test_keys_and_text():
+    v4, mapped = ipaddress.ip_address("10.0.0.1"), ipaddress.ip_address("::10.0.0.1")
+
+    assert ip_key(v4) == int(v4)
+    assert ip_key(v4) != ip_key(mapped)
+    assert ip_text(ipaddress.ip_address("FD00:0::1")) == "fd00::1"
@@ -0,0 +1,122 @@
+import gzip
+import json
+import pytest
+from caqes_core.replay import open_capture, parse_args, replay
+from caqes_core.settings.config import ConfigManager
+
+CONFIG = """
+scheduler:
+  enabled: true
+quarantine:
+  protocol:
+    - type: emqx
+      base_url: "http://127.0.0.1:9"
+      api_key: ""
+      api_secret: ""
+  policies:
+    - name: ssh
+      description: ssh
+      rules: ["destination_port == 22"]
+"""
+
+
+def alert(ip: str, port: int) -> bytes:
+    return json.dumps({
+        "source_ip": ip, "source_port": 40000, "destination_ip": "192.168.1.10",
+        "destination_port": port, "priority": "2", "timestamp": "2025-01-01T00:00:00",
+        "classification": "Misc activity", "raw": "raw"
+    }).encode()
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(ConfigManager, "_instance", None)
+    path = tmp_path / "caqes.conf"
+    path.write_text(CONFIG)
+    return str(path)
+
+
+@pytest.mark.parametrize("name", ["capture.jsonl", "capture.jsonl.gz"])
+def test_open_capture_reads_lines(tmp_path, name):
+    path = tmp_path / name
+    opener = gzip.open if name.endswith(".gz") else open
+    with opener(path, "wb") as f:
+        f.write(alert("10.0.0.1", 22) + b"\n" + alert("10.0.0.2", 80) + b"\n")
+
+    with open_capture(str(path)) as lines:
+        assert [json.loads(line)["source_ip"] for line in lines] == ["10.0.0.1", "10.0.0.2"]
+
+
+def test_open_capture_empty_file(tmp_path):
+    path = tmp_path / "empty.jsonl"
+    path.write_bytes(b"")
+
+    with open_capture(str(path)) as lines:
+        assert list(lines) == []
+
+
+@pytest.mark.asyncio
+async def test_dry_run_reports_policy_hits(tmp_path, config_path):
+    capture = tmp_path / "capture.jsonl"
+    capture.write_bytes(b"\n".join([alert("10.0.0.1", 22), alert("10.0.0.2", 80), alert("10.0.0.1", 22)]))
+
+    report = await replay(parse_args([str(capture), "--config", config_path, "--dry-run"]))
+
+    assert report["alerts_published"] == 3
+    assert report["policy_hits"] == {"ssh": 2}
+    assert report["unmatched"] == 1
+    assert report["quarantined"] == 1
+    assert report["integrations"]["dryrun"]["succeeded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_replay_leaves_shared_coordination_untouched(tmp_path, config_path):
+    shared = tmp_path / "coordination.db"
+    with open(config_path, "a") as f:
+        f.write(f"  coordination:\n    type: sqlite\n    path: \"{shared}\"\n")
+    capture = tmp_path / "capture.jsonl"
+    capture.write_bytes(alert("10.0.0.1", 22))
+
+    report = await replay(parse_args([str(capture), "--config", config_path, "--dry-run"]))
+
+    assert report["quarantined"] == 1
+    assert not shared.exists()
+
+
+@pytest.mark.asyncio
+async def test_dry_run_replays_routed_policies(tmp_path, config_path):
+    with open(config_path, "a") as f:
+        f.write("""
+    - name: telnet
+      description: telnet
+      rules: ["destination_port == 23"]
+      actions:
+        - integration: emqx
+          action: clientid
+          ban_duration: 60
+""")
+    capture = tmp_path / "capture.jsonl"
+    capture.write_bytes(b"\n".join([alert("10.0.0.1", 22), alert("10.0.0.2", 23)]))
+
+    report = await replay(parse_args([str(capture), "--config", config_path, "--dry-run"]))
+
+    assert report["policy_hits"] == {"ssh": 1, "telnet": 1}
+    assert report["quarantined"] == 2
+    assert report["integrations"]["dryrun"]["succeeded"] == 2
+
+
+@pytest.mark.asyncio
+async def test_fast_replay_evaluates_every_alert(tmp_path, config_path):
+    with open(config_path) as f:
+        config = f.read()
+    with open(config_path, "w") as f:
+        f.write(config.replace("  enabled: true\n", "  enabled: true\n  concurrency: 2\n  max_queue_size: 5\n", 1))
+    capture = tmp_path / "capture.jsonl"
+    capture.write_bytes(b"\n".join(alert(f"10.0.{host // 250}.{host % 250}", 22) for host in range(500)))
+
+    report = await replay(parse_args([str(capture), "--config", config_path, "--dry-run"]))
+
+    assert report["alerts_evaluated"] == 500
+    assert report["rejections"] == {
+        "scheduler_shed": 0, "not_evaluated": 0, "policy_unmatched": 0, "allowlisted": 0, "lane_rejected": 0}
+    assert report["integrations"]["dryrun"]["succeeded"] == 500
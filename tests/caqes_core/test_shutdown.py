@@ -0,0 +1,102 @@
+import asyncio
+import json
+import time
+import pytest
+from typing import List, Optional, Set, Tuple
+from caqes_core.app import shutdown
+from caqes_core.mq import ClientType
+from caqes_core.mq.memory.memory_client import MemoryBroker, MemoryClient
+from caqes_core.quarantine import NetworkIntegration
+from caqes_core.quarantine.quarantine_orchestrator import QuarantineOrchestrator
+from caqes_core.settings import OrchestratorSettings, WorkerSettings
+from caqes_core.worker import Worker
+
+
+class SlowFirewall(NetworkIntegration):
+    """Stages each ban slowly and records batched applies, like OPNsense with apply_interval set."""
+    name = "firewall"
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.staged: List[str] = []
+        self.applied: List[List[str]] = []
+        self.closed = False
+
+    def ban(self, ip_address: str, reason: str, expire_at: Optional[str] = None) -> bool:
+        time.sleep(self.delay)
+        self.staged.append(ip_address)
+        return True
+
+    def unban(self, identifier: str, identifier_type: str) -> bool:
+        return True
+
+    def is_banned(self, identifier: str, identifier_type: str) -> bool:
+        return False
+
+    def list_banned(self) -> Set[Tuple[str, str]]:
+        return set()
+
+    def apply_changes(self) -> bool:
+        self.applied.append(list(self.staged))
+        return True
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def alert(host: int) -> bytes:
+    return json.dumps({
+        "source_ip": f"192.168.1.{host}", "source_port": 40000,
+        "destination_ip": "192.168.1.10", "destination_port": 1883, "raw": "test",
+    }).encode()
+
+
+async def start(monkeypatch, firewall: SlowFirewall) -> Tuple[MemoryBroker, Worker, QuarantineOrchestrator, asyncio.Task]:
+    monkeypatch.setattr(OrchestratorSettings, "protocols", property(lambda self: []))
+    monkeypatch.setattr(OrchestratorSettings, "networks", property(lambda self: [firewall]))
+    orchestrator = QuarantineOrchestrator(OrchestratorSettings(config_dict={
+        "reconciliation": {"enabled": False},
+        # Never reached by the test, so only the final apply on shutdown activates the bans
+        "coordination": {"apply_interval": 3600},
+        "policies": [{"name": "any", "description": "", "rules": ["true"]}],
+    }))
+    await orchestrator.start()
+    broker = MemoryBroker()
+    settings = WorkerSettings(client_type=ClientType.MEMORY)
+    worker = Worker(settings, orchestrator)
+    worker.mq = MemoryClient(settings, broker)
+    task = asyncio.create_task(worker.run())
+    while not worker.running:
+        await asyncio.sleep(0.01)
+    return broker, worker, orchestrator, task
+
+
+@pytest.mark.asyncio
+async def test_shutdown_quarantines_received_alerts_before_closing(monkeypatch):
+    firewall = SlowFirewall(delay=0.05)
+    broker, worker, orchestrator, task = await start(monkeypatch, firewall)
+
+    for host in range(20, 25):
+        broker.publish("alerts", alert(host))
+    assert await shutdown([worker], worker.pipelines, orchestrator, timeout=5)
+    await asyncio.wait_for(task, timeout=1)
+
+    assert sorted(firewall.staged) == [f"192.168.1.{host}" for host in range(20, 25)]
+    # Staged bans are activated in a final batch rather than left for the next start
+    assert sorted(firewall.applied[-1]) == sorted(firewall.staged)
+    assert firewall.closed
+    assert broker.publish("alerts", alert(30)) == 0
+
+
+@pytest.mark.asyncio
+async def test_shutdown_abandons_bans_past_the_deadline(monkeypatch):
+    firewall = SlowFirewall(delay=1)
+    broker, worker, orchestrator, task = await start(monkeypatch, firewall)
+
+    broker.publish("alerts", alert(20))
+    assert not await shutdown([worker], worker.pipelines, orchestrator, timeout=0.2)
+    await asyncio.wait_for(task, timeout=1)
+
+    assert orchestrator.in_flight == 0
+    # The claim is released so the next alert, on this node or another, retries the ban
+    assert orchestrator.coordinator.claim_ban("192.168.1.20")
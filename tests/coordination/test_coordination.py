@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+import pytest
+from caqes_core.coordination import CoordinationFactory, CoordinationType, Coordinator
+from caqes_core.coordination.local_backend import LocalBackend
+from caqes_core.coordination.sqlite_backend import SQLiteBackend
+from caqes_core.models import QuarantineRecord
+from caqes_core.quarantine.quarantine_store import QuarantineStore
+
+
+@pytest.fixture
+def nodes(tmp_path):
+    path = str(tmp_path / "coordination.db")
+    first, second = SQLiteBackend("node-a", path), SQLiteBackend("node-b", path)
+    yield first, second
+    first.close()
+    second.close()
+
+
+def test_ban_claim_is_exclusive_until_released(nodes):
+    first, second = nodes
+
+    assert first.claim("ban:10.0.0.1", ttl=60)
+    assert not second.claim("ban:10.0.0.1", ttl=60)
+    first.release("ban:10.0.0.1")
+    assert second.claim("ban:10.0.0.1", ttl=60)
+
+
+def test_expired_claim_can_be_taken(nodes):
+    first, second = nodes
+
+    assert first.claim("ban:10.0.0.1", ttl=0.001)
+    time.sleep(0.01)
+    assert second.claim("ban:10.0.0.1", ttl=60)
+
+
+def test_single_leader_per_role(nodes):
+    first, second = nodes
+
+    assert first.acquire_lease("apply", ttl=60)
+    assert first.acquire_lease("apply", ttl=60)
+    assert not second.acquire_lease("apply", ttl=60)
+    assert second.acquire_lease("reconcile", ttl=60)
+
+
+def test_apply_flag_is_taken_once(nodes):
+    first, second = nodes
+
+    first.set_flag("apply:opnsense")
+    second.set_flag("apply:opnsense")
+    assert second.pop_flag("apply:opnsense")
+    assert not first.pop_flag("apply:opnsense")
+
+
+def test_stores_share_quarantine_state(nodes):
+    first, second = nodes
+    store_a, store_b = QuarantineStore(backend=first), QuarantineStore(backend=second)
+    store_a.load()
+    store_b.load()
+
+    store_a.add(QuarantineRecord(ip="10.0.0.1", reason="test"))
+    assert not store_b.is_banned("10.0.0.1")
+    assert [r.ip for r in store_b.refresh()] == ["10.0.0.1"]
+    assert store_b.is_banned("10.0.0.1")
+    assert store_b.refresh() == []
+
+    store_b.remove("10.0.0.1")
+    store_a.refresh()
+    assert not store_a.is_banned("10.0.0.1")
+
+
+@pytest.mark.asyncio
+async def test_store_refreshes_from_another_thread(nodes):
+    first, second = nodes
+    store_a, store_b = QuarantineStore(backend=first), QuarantineStore(backend=second)
+    store_a.load()
+    store_b.load()
+
+    store_a.add(QuarantineRecord(ip="10.0.0.1", reason="test"))
+    await store_a.flushed()
+    # The orchestrator's sync loop refreshes off the event loop, on the connection the loop writes with
+    refreshed = await asyncio.to_thread(store_b.refresh)
+    assert [r.ip for r in refreshed] == ["10.0.0.1"]
+    await asyncio.to_thread(second.claim, "ban:10.0.0.2", 60)
+    assert not first.claim("ban:10.0.0.2", ttl=60)
+
+
+
+@pytest.mark.asyncio
+async def test_changes_made_during_a_refresh_are_kept(nodes):
+    first, second = nodes
+    store_a, store_b = QuarantineStore(backend=first), QuarantineStore(backend=second)
+    store_a.add(QuarantineRecord(ip="10.0.0.1", reason="test"))
+    await store_a.flushed()
+    store_b.load()
+    loaded, resume = threading.Event(), threading.Event()
+    load_records = second.load_records
+
+    def stale_load():
+        records = load_records()
+        loaded.set()
+        resume.wait()
+        return records
+
+    second.load_records = stale_load
+    refresh = asyncio.create_task(asyncio.to_thread(store_b.refresh))
+    while not loaded.is_set():
+        await asyncio.sleep(0.01)
+    # Made and written while the refresh holds the state it loaded before them
+    store_b.add(QuarantineRecord(ip="10.0.0.2", reason="test"))
+    store_b.remove("10.0.0.1")
+    await store_b.flushed()
+    resume.set()
+    await refresh
+
+    assert store_b.is_banned("10.0.0.2")
+    assert not store_b.is_banned("10.0.0.1")
+
+
+def test_coordinator_caches_leadership():
+    now = [0.0]
+    backend = LocalBackend("node-a")
+    calls = []
+    acquire = backend.acquire_lease
+    backend.acquire_lease = lambda role, ttl: calls.append(role) or acquire(role, ttl)
+    coordinator = Coordinator(backend, lease_ttl=15, clock=lambda: now[0])
+
+    assert coordinator.is_leader("apply")
+    now[0] = 4.0
+    assert coordinator.is_leader("apply")
+    now[0] = 6.0
+    assert coordinator.is_leader("apply")
+    assert calls == ["apply", "apply"]
+
+
+def test_coordinator_claims_despite_backend_failure():
+    backend = LocalBackend("node-a")
+    backend.claim = lambda key, ttl: (_ for _ in ()).throw(ConnectionError("down"))
+
+    assert Coordinator(backend).claim_ban("10.0.0.1")
+
+
+def test_factory_creates_backend(tmp_path):
+    backend = CoordinationFactory.create(CoordinationType.SQLITE, "node-a", str(tmp_path / "c.db"), "", "caqes")
+    assert isinstance(backend, SQLiteBackend)
+    backend.close()
+    assert isinstance(CoordinationFactory.create(CoordinationType.LOCAL, "node-a", "", "", "caqes"), LocalBackend)
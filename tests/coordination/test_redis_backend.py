@@ -0,0 +1,146 @@
+import asyncio
+import time
+import pytest
+from typing import Any, Callable, Dict, List, Tuple
+from caqes_core.coordination import redis_backend
+from caqes_core.coordination.redis_backend import RedisBackend
+from caqes_core.models import QuarantineRecord
+from caqes_core.quarantine.quarantine_store import QuarantineStore
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis client commands RedisBackend uses.
+
+    Scripts cannot be evaluated without a server, so the backend's Lua
+    scripts are mapped to Python equivalents with the same semantics.
+    """
+
+    def __init__(self):
+        # Key -> (value, expiry on time.monotonic or None)
+        self.values: Dict[str, Tuple[Any, float | None]] = {}
+        self.hashes: Dict[str, Dict[str, str]] = {}
+        self.scripts: Dict[str, Callable[[List[str], List[Any]], int]] = {
+            redis_backend._ACQUIRE_LEASE: self._acquire_lease,
+            redis_backend._RELEASE_CLAIM: self._release_claim,
+        }
+
+    def get(self, key: str) -> Any:
+        value, expires_at = self.values.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.values.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: str, value: Any, nx: bool = False, px: int | None = None) -> bool | None:
+        if nx and self.get(key) is not None:
+            return None
+        self.values[key] = (str(value), time.monotonic() + px / 1000 if px else None)
+        return True
+
+    def delete(self, *keys: str) -> int:
+        live = [key for key in keys if self.get(key) is not None]
+        for key in live:
+            del self.values[key]
+        return len(live)
+
+    def hset(self, name: str, key: str, value: str) -> int:
+        self.hashes.setdefault(name, {})[key] = value
+        return 1
+
+    def hdel(self, name: str, key: str) -> int:
+        return int(self.hashes.get(name, {}).pop(key, None) is not None)
+
+    def hvals(self, name: str) -> List[str]:
+        return list(self.hashes.get(name, {}).values())
+
+    def register_script(self, source: str) -> Callable[..., int]:
+        script = self.scripts[source]
+        return lambda keys, args: script(keys, args)
+
+    def close(self) -> None:
+        pass
+
+    def _acquire_lease(self, keys: List[str], args: List[Any]) -> int:
+        owner = self.get(keys[0])
+        if owner is None or owner == args[0]:
+            self.set(keys[0], args[0], px=args[1])
+            return 1
+        return 0
+
+    def _release_claim(self, keys: List[str], args: List[Any]) -> int:
+        if self.get(keys[0]) == args[0]:
+            return self.delete(keys[0])
+        return 0
+
+
+@pytest.fixture
+def nodes():
+    server = FakeRedis()
+    return RedisBackend("node-a", "", client=server), RedisBackend("node-b", "", client=server)
+
+
+def test_claim_is_exclusive_and_released_by_its_owner_only(nodes):
+    first, second = nodes
+
+    assert first.claim("ban:10.0.0.1", ttl=60)
+    assert not second.claim("ban:10.0.0.1", ttl=60)
+    second.release("ban:10.0.0.1")
+    assert not second.claim("ban:10.0.0.1", ttl=60)
+    first.release("ban:10.0.0.1")
+    assert second.claim("ban:10.0.0.1", ttl=60)
+
+
+def test_release_after_expiry_keeps_the_new_owners_claim(nodes):
+    first, second = nodes
+
+    assert first.claim("ban:10.0.0.1", ttl=0.001)
+    time.sleep(0.01)
+    assert second.claim("ban:10.0.0.1", ttl=60)
+    first.release("ban:10.0.0.1")
+    assert not first.claim("ban:10.0.0.1", ttl=60)
+
+
+def test_single_leader_per_role(nodes):
+    first, second = nodes
+
+    assert first.acquire_lease("apply", ttl=60)
+    assert first.acquire_lease("apply", ttl=60)
+    assert not second.acquire_lease("apply", ttl=60)
+
+
+@pytest.mark.asyncio
+async def test_store_writes_behind_to_the_shared_state(nodes):
+    first, second = nodes
+    store_a, store_b = QuarantineStore(backend=first), QuarantineStore(backend=second)
+    store_a.load()
+    store_b.load()
+
+    store_a.add(QuarantineRecord(ip="10.0.0.1", reason="test"))
+    assert store_a.is_banned("10.0.0.1")
+    # A refresh before the write lands keeps the local change
+    await asyncio.to_thread(store_a.refresh)
+    assert store_a.is_banned("10.0.0.1")
+
+    await store_a.flushed()
+    assert [r.ip for r in await asyncio.to_thread(store_b.refresh)] == ["10.0.0.1"]
+    store_b.remove("10.0.0.1")
+    await store_b.flushed()
+    await asyncio.to_thread(store_a.refresh)
+    assert not store_a.is_banned("10.0.0.1")
+
+
+@pytest.mark.asyncio
+async def test_failed_writes_are_retried(nodes):
+    first, _ = nodes
+    store = QuarantineStore(backend=first)
+    save = first.save_record
+    first.save_record = lambda record: (_ for _ in ()).throw(ConnectionError("down"))
+
+    store.add(QuarantineRecord(ip="10.0.0.1", reason="test"))
+    with pytest.raises(ConnectionError):
+        await store.flushed()
+    assert first.load_records() == []
+
+    first.save_record = save
+    await store.flushed()
+    assert [r.ip for r in first.load_records()] == ["10.0.0.1"]
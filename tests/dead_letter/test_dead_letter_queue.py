@@ -0,0 +1,111 @@
+import asyncio
+import json
+import pytest
+from typing import List
+from unittest.mock import AsyncMock
+from caqes_core.dead_letter import DeadLetterQueue, DeadLetterSink, FileSink, TopicSink
+from caqes_core.models import Alert
+from caqes_core.mq import ClientType
+from caqes_core.mq.memory.memory_client import MemoryBroker, MemoryClient
+from caqes_core.mq.memory.memory_message import MemoryMessage
+from caqes_core.settings import WorkerSettings
+from caqes_core.worker import Worker
+
+
+class ListSink(DeadLetterSink):
+    def __init__(self):
+        self.entries: List[dict] = []
+
+    async def write(self, entries: List[bytes]) -> None:
+        self.entries.extend(json.loads(entry) for entry in entries)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_counts_rejections_over_the_budget():
+    clock = FakeClock()
+    sink = ListSink()
+    queue = DeadLetterQueue(sink, rate=1.0, burst=2, clock=clock)
+
+    kept = [queue.reject("undecodable", b"not json", ValueError("bad")) for _ in range(5)]
+    clock.now = 1.0
+    kept.append(queue.reject("undecodable", b"not json"))
+    await queue.flush()
+
+    assert kept == [True, True, False, False, False, True]
+    assert queue.status() == {"rejected": {"undecodable": 6}, "written": 3, "dropped": 3}
+    assert sink.entries[0]["error"] == "ValueError: bad"
+    assert sink.entries[0]["payload"] == "not json"
+
+
+@pytest.mark.asyncio
+async def test_payloads_are_truncated_and_validation_errors_summarised():
+    sink = ListSink()
+    queue = DeadLetterQueue(sink, max_payload=4)
+    try:
+        Alert(**{"alert_id": "a"})
+    except ValueError as e:
+        error = e
+
+    queue.reject("invalid", b"\xff\xfe{}{}", error)
+    await queue.flush()
+
+    entry = sink.entries[0]
+    assert entry["payload"] == "\\xff\\xfe{}"
+    assert entry["truncated"] is True
+    assert entry["error"].startswith(f"{error.error_count()} validation error(s), first ")
+
+
+@pytest.mark.asyncio
+async def test_file_sink_rotates(tmp_path):
+    path = tmp_path / "dead_letters.jsonl"
+    sink = FileSink(str(path), max_bytes=20, backup_count=1)
+
+    await sink.write([b"0123456789abcdef\n"] * 3)
+    await sink.close()
+
+    assert path.read_bytes() == b"0123456789abcdef\n"
+    assert (tmp_path / "dead_letters.jsonl.1").read_bytes() == b"0123456789abcdef\n"
+    assert not (tmp_path / "dead_letters.jsonl.2").exists()
+
+
+@pytest.mark.asyncio
+async def test_topic_sink_publishes_each_entry():
+    broker = MemoryBroker()
+    subscriber = MemoryClient(WorkerSettings(), broker)
+    callback = AsyncMock()
+    await subscriber.connect()
+    await subscriber.subscribe("alerts/dead_letter", callback)
+    queue = DeadLetterQueue(TopicSink(MemoryClient(WorkerSettings(), broker), "alerts/dead_letter"))
+    await queue.start()
+
+    queue.reject("empty", b"")
+    await queue.stop()
+    await asyncio.sleep(0.01)
+
+    callback.assert_awaited_once()
+    assert json.loads(callback.await_args.args[0].data)["reason"] == "empty"
+
+
+@pytest.mark.asyncio
+async def test_worker_dead_letters_and_acks_poison_messages():
+    sink = ListSink()
+    queue = DeadLetterQueue(sink)
+    worker = Worker(WorkerSettings(client_type=ClientType.MEMORY), orchestrator=AsyncMock(), dead_letters=queue)
+    messages = [MemoryMessage("alerts", payload) for payload in (b"", b"{not json", b"\xff", b"[1]", b'{"x": 1}')]
+    for message in messages:
+        message.ack = AsyncMock()
+        await worker._handle_alert(message)
+    await queue.flush()
+
+    assert queue.rejected == {"empty": 1, "undecodable": 2, "invalid": 2}
+    assert [entry["worker"] for entry in sink.entries] == [worker.worker_id] * 5
+    for message in messages:
+        message.ack.assert_awaited_once()
@@ -0,0 +1,142 @@
+import asyncio
+import sqlite3
+import pytest
+from typing import Dict, List
+from caqes_core.enrichment import EnrichmentCache, EnrichmentProvider, Enricher
+from caqes_core.enrichment.providers.csv_provider import CsvProvider
+from caqes_core.enrichment.providers.sqlite_provider import SQLiteProvider
+from caqes_core.enrichment.providers.static_provider import StaticProvider
+from caqes_core.models import Alert, DeviceInfo
+from caqes_core.quarantine.quarantine_orchestrator import QuarantineOrchestrator
+from caqes_core.settings import OrchestratorSettings
+
+
+class CountingProvider(EnrichmentProvider):
+    name = "counting"
+
+    def __init__(self, devices: Dict[str, DeviceInfo], delay: float = 0.0, error: Exception | None = None):
+        self.devices = devices
+        self.delay = delay
+        self.error = error
+        self.batches: List[List[str]] = []
+
+    async def lookup_many(self, ips: List[str]) -> Dict[str, DeviceInfo]:
+        self.batches.append(sorted(ips))
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {ip: self.devices[ip] for ip in ips if ip in self.devices}
+
+
+def test_cache_expires_and_caches_misses():
+    now = [0.0]
+    cache = EnrichmentCache(ttl=10, negative_ttl=2, clock=lambda: now[0])
+    cache.put("10.0.0.1", DeviceInfo(ip="10.0.0.1"))
+    cache.put("10.0.0.2", None)
+
+    assert cache.get("10.0.0.2") == (True, None)
+    now[0] = 5
+    assert cache.get("10.0.0.1")[0]
+    assert cache.get("10.0.0.2") == (False, None)
+    now[0] = 11
+    assert cache.get("10.0.0.1") == (False, None)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = EnrichmentCache(max_size=2)
+    for ip in ("10.0.0.1", "10.0.0.2"):
+        cache.put(ip, None)
+    cache.get("10.0.0.1")
+    cache.put("10.0.0.3", None)
+
+    assert cache.get("10.0.0.1")[0]
+    assert not cache.get("10.0.0.2")[0]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_batch():
+    provider = CountingProvider({"10.0.0.1": DeviceInfo(ip="10.0.0.1", vlan="iot")})
+    enricher = Enricher([provider], batch_window=0.01)
+
+    results = await asyncio.gather(*(enricher.lookup(ip) for ip in ("10.0.0.1", "10.0.0.1", "10.0.0.2")))
+    assert [r.vlan if r else None for r in results] == ["iot", "iot", None]
+    assert provider.batches == [["10.0.0.1", "10.0.0.2"]]
+
+    await enricher.lookup("10.0.0.2")
+    assert len(provider.batches) == 1
+
+
+@pytest.mark.asyncio
+async def test_providers_are_merged_in_order():
+    first = CountingProvider({"10.0.0.1": DeviceInfo(ip="10.0.0.1", owner="alice")})
+    second = CountingProvider({"10.0.0.1": DeviceInfo(ip="10.0.0.1", owner="bob", vlan="iot")})
+    enricher = Enricher([first, second], batch_window=0)
+
+    info = await enricher.lookup("10.0.0.1")
+    assert (info.owner, info.vlan) == ("alice", "iot")
+
+
+@pytest.mark.asyncio
+async def test_slow_lookup_times_out_and_warms_cache():
+    provider = CountingProvider({"10.0.0.1": DeviceInfo(ip="10.0.0.1")}, delay=0.05)
+    enricher = Enricher([provider], batch_window=0, timeout=0.01)
+
+    assert await enricher.lookup("10.0.0.1") is None
+    await asyncio.sleep(0.06)
+    assert await enricher.lookup("10.0.0.1") is not None
+    assert enricher.timeouts == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_provider_does_not_cache_miss():
+    provider = CountingProvider({}, error=RuntimeError("down"))
+    enricher = Enricher([provider], batch_window=0)
+
+    assert await enricher.lookup("10.0.0.1") is None
+    assert await enricher.lookup("10.0.0.1") is None
+    assert len(provider.batches) == 2
+
+
+@pytest.mark.asyncio
+async def test_csv_and_sqlite_inventories(tmp_path):
+    csv_path = tmp_path / "assets.csv"
+    csv_path.write_text("ip,mac,device_type,owner\n10.0.0.1,aa:bb:cc:dd:ee:ff,camera,alice\n")
+    db_path = tmp_path / "assets.db"
+    with sqlite3.connect(db_path) as db:
+        db.execute("CREATE TABLE assets (ip TEXT, vlan TEXT, extra TEXT)")
+        db.execute("INSERT INTO assets VALUES ('10.0.0.1', 'iot', 'ignored'), ('10.0.0.2', 'lan', NULL)")
+
+    found = await CsvProvider(str(csv_path)).lookup_many(["10.0.0.1", "10.0.0.9"])
+    assert found == {"10.0.0.1": DeviceInfo(ip="10.0.0.1", mac="aa:bb:cc:dd:ee:ff", device_type="camera", owner="alice")}
+    provider = SQLiteProvider(str(db_path))
+    found = await provider.lookup_many(["10.0.0.1", "10.0.0.2"])
+    await provider.close()
+    assert found["10.0.0.1"] == DeviceInfo(ip="10.0.0.1", vlan="iot")
+    assert found["10.0.0.2"].vlan == "lan"
+
+
+@pytest.mark.asyncio
+async def test_policies_see_device_context():
+    orchestrator = QuarantineOrchestrator(OrchestratorSettings(config_dict={
+        "dry_run": True,
+        "enrichment": {"enabled": True, "providers": [
+            {"type": "static", "devices": {"10.0.0.1": {"vlan": "iot", "mac": "aa:bb:cc:dd:ee:ff"}}}
+        ]},
+        "policies": [{"name": "iot", "description": "", "rules": ["device['vlan'] == 'iot'"]}],
+    }))
+    alert = dict(source_port=40000, destination_ip="192.168.1.10", destination_port=22, priority="1",
+                 timestamp="2025-01-01T00:00:00", classification="Misc activity", raw="raw")
+
+    await orchestrator.quarantine(Alert(source_ip="10.0.0.1", **alert))
+    await orchestrator.quarantine(Alert(source_ip="10.0.0.2", **alert))
+
+    assert orchestrator.policy_hits == {"iot": 1}
+    assert orchestrator.is_banned("aa:bb:cc:dd:ee:ff")
+    await orchestrator.enricher.close()
+
+
+@pytest.mark.asyncio
+async def test_static_provider():
+    provider = StaticProvider({"10.0.0.1": {"owner": "alice"}})
+
+    assert await provider.lookup_many(["10.0.0.1", "10.0.0.2"]) == {"10.0.0.1": DeviceInfo(ip="10.0.0.1", owner="alice")}
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from typing import Optional, Set, Tuple
+from caqes_core.budget import MemoryBudget
+from caqes_core.health import HealthServer
+from caqes_core.mq import ClientType
+from caqes_core.profiling import Profiler
+from caqes_core.quarantine import ProtocolIntegration
+from caqes_core.quarantine.dispatch import IntegrationLane
+from caqes_core.quarantine.quarantine_orchestrator import QuarantineOrchestrator
+from caqes_core.scheduling import PriorityScheduler
+from caqes_core.settings import OrchestratorSettings, WorkerSettings
+from caqes_core.settings.dispatch_settings import DispatchSettings
+from caqes_core.worker import Worker
+
+
+class FakeIntegration(ProtocolIntegration):
+    name = "fake"
+
+    def __init__(self, healthy: bool = True):
+        self.healthy = healthy
+
+    def ban(self, ip_address: str, reason: str, expire_at: Optional[str] = None) -> bool:
+        return True
+
+    def unban(self, identifier: str, identifier_type: str) -> bool:
+        return True
+
+    def is_banned(self, identifier: str, identifier_type: str) -> bool:
+        return False
+
+    def list_banned(self) -> Set[Tuple[str, str]]:
+        return set()
+
+    def health_check(self) -> bool:
+        return self.healthy
+
+
+async def get(port: int, path: str, method: str = "GET") -> Tuple[int, dict]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+@pytest_asyncio.fixture
+async def pipeline():
+    integration = FakeIntegration()
+    orchestrator = QuarantineOrchestrator(OrchestratorSettings())
+    orchestrator.protocols = [integration]
+    orchestrator.lanes = {"fake": IntegrationLane(integration, DispatchSettings())}
+    scheduler = PriorityScheduler(orchestrator.quarantine)
+    worker = Worker(WorkerSettings(client_type=ClientType.MEMORY), orchestrator, scheduler=scheduler)
+    task = asyncio.create_task(worker.run())
+    server = HealthServer(orchestrator, [worker], scheduler=scheduler, host="127.0.0.1", port=0)
+    await server.start()
+    while not worker.running:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+    yield server, worker, integration
+    await server.stop()
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_live_and_ready(pipeline):
+    server, _, _ = pipeline
+
+    assert await get(server.port, "/livez") == (200, {"live": True})
+    assert await get(server.port, "/readyz") == (200, {"ready": True})
+
+
+@pytest.mark.asyncio
+async def test_not_ready_when_integration_unreachable(pipeline):
+    server, _, integration = pipeline
+    integration.healthy = False
+    server.reachable = await server.orchestrator.check_integrations(1)
+
+    assert await get(server.port, "/readyz") == (503, {"ready": False})
+    assert (await get(server.port, "/livez"))[0] == 200
+
+
+@pytest.mark.asyncio
+async def test_not_live_once_worker_stops(pipeline):
+    server, worker, _ = pipeline
+    worker.running = False
+
+    assert await get(server.port, "/livez") == (503, {"live": False})
+
+
+@pytest.mark.asyncio
+async def test_status_reports_saturation(pipeline):
+    server, _, _ = pipeline
+
+    status, body = await get(server.port, "/status?verbose=1")
+    assert status == 200
+    assert body["scheduler"]["depths"] == {"1": 0, "2": 0, "3": 0, "4": 0}
+    assert body["scheduler"]["consumer_lag"] == 0
+    assert body["quarantine"] == {"in_flight_bans": 0, "quarantined": 0, "policy_hits": {}, "unmatched": 0, "protected": 0,
+                                  "shadow": {}, "dry_run": False}
+    assert body["integrations"]["fake"]["circuit_breaker"] == "closed"
+    assert body["integrations"]["fake"]["reachable"] is True
+    assert body["workers"][0]["connected"] is True
+
+
+@pytest.mark.asyncio
+async def test_unknown_path(pipeline):
+    server, _, _ = pipeline
+
+    assert (await get(server.port, "/metrics"))[0] == 404
+
+
+@pytest.mark.asyncio
+async def test_profile_endpoint_runs_one_window_at_a_time(pipeline, tmp_path):
+    server, _, _ = pipeline
+    assert (await get(server.port, "/profile"))[0] == 404
+    server.profiler = Profiler(str(tmp_path), interval=0.001)
+
+    status, body = await get(server.port, "/profile?mode=sampling&seconds=0.2", method="POST")
+    assert status == 202 and body["path"].endswith(".folded")
+    assert (await get(server.port, "/profile?seconds=1", method="POST"))[0] == 409
+    assert (await get(server.port, "/profile"))[1]["running"] == "sampling"
+    await server.profiler.stop()
+
+    assert (await get(server.port, "/profile?mode=perf", method="POST"))[0] == 400
+    assert (await get(server.port, "/profile?seconds=3600", method="POST"))[0] == 400
+    assert (await get(server.port, "/profile"))[1]["last_profile"] == body["path"]
+
+
+@pytest.mark.asyncio
+async def test_memory_endpoint_reports_budget(pipeline):
+    server, _, _ = pipeline
+    assert (await get(server.port, "/memory"))[0] == 404
+    server.memory_budget = MemoryBudget(1024 ** 3, rss=lambda: 2 * 1024 ** 3)
+    server.memory_budget.track("alerts_pending", lambda: 7)
+    server.memory_budget.check()
+
+    status, body = await get(server.port, "/memory")
+    assert status == 200
+    assert body["exceeded"] and body["counts"] == {"alerts_pending": 7}
+    assert (await get(server.port, "/status"))[1]["memory"]["limit_bytes"] == 1024 ** 3
+    assert (await get(server.port, "/memory/snapshot"))[0] == 405
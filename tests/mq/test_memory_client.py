@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from caqes_core.mq.memory.memory_client import MemoryBroker, MemoryClient
+from caqes_core.settings.worker_settings import WorkerSettings
+
+
+@pytest.mark.asyncio
+async def test_publish_fans_out_to_matching_subscribers():
+    broker = MemoryBroker()
+    clients = [MemoryClient(WorkerSettings(), broker) for _ in range(2)]
+    callbacks = [AsyncMock() for _ in clients]
+    for client, callback in zip(clients, callbacks):
+        await client.connect()
+        await client.subscribe("alerts/#", callback)
+
+    assert broker.publish("alerts/ids", b"{}") == 2
+    assert broker.publish("other", b"{}") == 0
+    await asyncio.sleep(0.01)
+
+    for callback in callbacks:
+        callback.assert_awaited_once()
+        assert callback.await_args.args[0].data == b"{}"
+
+
+@pytest.mark.asyncio
+async def test_shared_subscription_round_robin():
+    broker = MemoryBroker()
+    clients = [MemoryClient(WorkerSettings(), broker) for _ in range(2)]
+    callbacks = [AsyncMock() for _ in clients]
+    for client, callback in zip(clients, callbacks):
+        await client.connect()
+        await client.subscribe("$share/caqes/alerts", callback)
+
+    for _ in range(4):
+        assert broker.publish("alerts", b"{}") == 1
+    await asyncio.sleep(0.01)
+
+    assert [callback.await_count for callback in callbacks] == [2, 2]
+
+
+@pytest.mark.asyncio
+async def test_subscribe_not_connected():
+    client = MemoryClient(WorkerSettings(), MemoryBroker())
+
+    with pytest.raises(RuntimeError):
+        await client.subscribe("alerts", AsyncMock())
+
+
+@pytest.mark.asyncio
+async def test_close_detaches_from_broker():
+    broker = MemoryBroker()
+    client = MemoryClient(WorkerSettings(), broker)
+    await client.connect()
+    await client.subscribe("alerts", AsyncMock())
+
+    await client.close()
+
+    assert broker.publish("alerts", b"{}") == 0
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_keeps_other_topics_and_drain_waits_for_callbacks():
+    broker = MemoryBroker()
+    client = MemoryClient(WorkerSettings(), broker)
+    await client.connect()
+    handled = []
+
+    async def slow(msg):
+        await asyncio.sleep(0.05)
+        handled.append(msg.topic)
+
+    await client.subscribe("alerts", slow)
+    await client.subscribe("ids/#", slow)
+    broker.publish("alerts", b"{}")
+    await client.unsubscribe("alerts")
+    await client.drain()
+
+    assert handled == ["alerts"]
+    assert client.subscriptions == ["ids/#"]
+    assert broker.publish("alerts", b"{}") == 0
+    assert broker.publish("ids/suricata", b"{}") == 1
@@ -3,7 +3,7 @@ import pytest
 import pytest_asyncio
 from unittest.mock import AsyncMock, MagicMock, Mock, patch
 from caqes_core.mq.mqtt.mqtt_client import MqttClient
-from settings.worker_settings import WorkerSettings
+from caqes_core.settings.worker_settings import WorkerSettings
 
 
 @pytest_asyncio.fixture
@@ -11,7 +11,7 @@ async def mqtt_client():
     """
     Fixture that creates a mock MQTT client instance
     """
-    client = MqttClient()
+    client = MqttClient(WorkerSettings())
     client.client = Mock()
     return client
 
@@ -30,7 +30,7 @@ async def test_connect_success(mqtt_client: MqttClient):
         "max_retries": 3,
         "retry_delay": 0.1,
     }
-    mqtt_client.settings = MQSettings(**mqtt_settings)
+    mqtt_client.settings = WorkerSettings(**mqtt_settings)
     mqtt_client.loop = asyncio.get_event_loop()
 
     # Set up the mock to trigger on_connect callback
@@ -64,7 +64,7 @@ async def test_connect_failure(mqtt_client: MqttClient):
         "max_retries": 3,
         "retry_delay": 0.1,
     }
-    mqtt_client.settings = MQSettings(**mqtt_settings)
+    mqtt_client.settings = WorkerSettings(**mqtt_settings)
     mqtt_client.loop = asyncio.get_event_loop()
 
     def mock_connect(*args, **kwargs):
@@ -94,7 +94,7 @@ async def test_connect_retry_success_last(mqtt_client):
         "max_retries": 3,
         "retry_delay": 0.1,
     }
-    mqtt_client.settings = MQSettings(**mqtt_settings)
+    mqtt_client.settings = WorkerSettings(**mqtt_settings)
     mqtt_client.loop = asyncio.get_event_loop()
 
     retry_count = 0  # Initialize retry count
@@ -122,8 +122,8 @@ async def test_close(mqtt_client):
     Test the close method
     """
     # Mock the client methods
-    mqtt_client.client.loop_stop = AsyncMock()
-    mqtt_client.client.disconnect = AsyncMock()
+    mqtt_client.client.loop_stop = Mock()
+    mqtt_client.client.disconnect = Mock()
 
     await mqtt_client.close()
 
@@ -135,14 +135,45 @@ async def test_close(mqtt_client):
 async def test_subscribe_success(mqtt_client):
     # Set up connected state
     mqtt_client.connected = True
-    mqtt_client.client.subscribe = AsyncMock()
+    mqtt_client.client.subscribe = Mock()
     callback = AsyncMock()
 
     await mqtt_client.subscribe("test/topic", callback)
 
     mqtt_client.client.subscribe.assert_called_once_with("test/topic")
-    assert mqtt_client.callback == callback
+    mqtt_client.client.message_callback_add.assert_called_once()
+    assert mqtt_client.callbacks == {"test/topic": callback}
+
+
+@pytest.mark.asyncio
+async def test_subscribe_keeps_a_callback_per_topic(mqtt_client):
+    mqtt_client.connected = True
+    callbacks = {"ids/suricata/#": AsyncMock(), "$share/caqes/ids/zeek": AsyncMock()}
+
+    for topic, callback in callbacks.items():
+        await mqtt_client.subscribe(topic, callback)
+
+    assert mqtt_client.callbacks == callbacks
+    assert mqtt_client.subscriptions == list(callbacks)
+    assert [c.args[0] for c in mqtt_client.client.message_callback_add.call_args_list] == ["ids/suricata/#", "ids/zeek"]
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_removes_callback_once_acknowledged(mqtt_client):
+    mqtt_client.connected = True
+    mqtt_client.loop = asyncio.get_running_loop()
+    await mqtt_client.subscribe("$share/caqes/ids/zeek", AsyncMock())
+
+    def unsubscribe(topic):
+        mqtt_client._on_unsubscribe(None, None, 7)
+        return 0, 7
+    mqtt_client.client.unsubscribe = Mock(side_effect=unsubscribe)
+
+    await mqtt_client.unsubscribe("$share/caqes/ids/zeek")
 
+    mqtt_client.client.message_callback_remove.assert_called_once_with("ids/zeek")
+    assert mqtt_client.callbacks == {}
+    assert mqtt_client.subscriptions == []
 
 @pytest.mark.asyncio
 async def test_subscribe_not_connected(mqtt_client: MqttClient):
@@ -160,7 +191,7 @@ async def test_subscribe_not_connected(mqtt_client: MqttClient):
 
     assert str(excinfo.value) == "Not connected to MQTT broker"
     mqtt_client.client.subscribe.assert_not_called()
-    assert mqtt_client.callback is None  # or whatever default value.
+    assert mqtt_client.callbacks == {}
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,81 @@
+import asyncio
+import pstats
+import threading
+import pytest
+from caqes_core.profiling import ProfileMode, Profiler, stage_timings, timed
+
+
+@pytest.fixture
+def timings():
+    stage_timings.reset()
+    yield stage_timings
+    stage_timings.enabled = False
+    stage_timings.reset()
+
+
+@timed("sync_stage")
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+@timed("async_stage")
+async def sleep_then(value: str) -> str:
+    await asyncio.sleep(0.01)
+    return value
+
+
+@pytest.mark.asyncio
+async def test_stages_are_timed_only_when_enabled(timings):
+    assert add(1, 2) == 3
+    assert await sleep_then("a") == "a"
+    assert timings.snapshot() == {}
+
+    timings.enabled = True
+    assert add(1, 2) == 3
+    assert await sleep_then("b") == "b"
+    assert await sleep_then("c") == "c"
+
+    stages = timings.snapshot()
+    assert stages["sync_stage"]["count"] == 1
+    assert stages["async_stage"]["count"] == 2
+    assert stages["async_stage"]["max_ms"] >= 10
+
+
+def busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.mark.asyncio
+async def test_sampling_profile_writes_folded_stacks_of_every_thread(timings, tmp_path):
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_loop, args=(stop,), name="busy")
+    thread.start()
+    profiler = Profiler(str(tmp_path), interval=0.001)
+    try:
+        path = profiler.start(ProfileMode.SAMPLING, 0.2)
+        with pytest.raises(RuntimeError):
+            profiler.start(ProfileMode.CPROFILE, 1)
+        await profiler._task
+    finally:
+        stop.set()
+        thread.join()
+
+    lines = path.read_text().splitlines()
+    _, _, count = lines[0].rpartition(" ")
+    assert int(count) > 0
+    assert any(line.startswith("busy;") and "busy_loop (" in line for line in lines)
+    assert profiler.last_profile == path
+    # Stage timings are switched back off once the window is over
+    assert not timings.enabled
+
+
+@pytest.mark.asyncio
+async def test_cprofile_window_cut_short_is_still_written(tmp_path):
+    profiler = Profiler(str(tmp_path))
+    path = profiler.start(ProfileMode.CPROFILE, 60)
+    await asyncio.sleep(0.05)
+    await profiler.stop()
+
+    assert path.suffix == ".prof"
+    assert pstats.Stats(str(path)).total_calls > 0
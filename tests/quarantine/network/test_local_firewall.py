@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import pytest
+from caqes_core.quarantine import integration_factory
+
+
+class FakeCommand:
+    """Records the commands an integration runs instead of touching the host firewall."""
+
+    def __init__(self, outputs=None, delay: float = 0.0):
+        self.calls = []
+        self.outputs = outputs or {}
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def __call__(self, args, input=None):
+        time.sleep(self.delay)
+        with self.lock:
+            self.calls.append((list(args), input))
+        output = self.outputs.get(tuple(args), "")
+        if isinstance(output, Exception):
+            raise output
+        return output
+
+    def scripts(self):
+        return [input for _, input in self.calls if input]
+
+
+def test_nftables_batches_concurrent_bans():
+    nft = integration_factory.create("network", "nftables")
+    nft._run = FakeCommand(delay=0.05)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert all(pool.map(lambda i: nft.ban(f"10.0.0.{i}", "test"), range(1, 9)))
+
+    setup, *batches = nft._run.scripts()
+    assert "add table inet caqes" in setup
+    assert "add rule inet caqes forward ip saddr @quarantine_ip4 drop" in setup
+    assert len(batches) < 8
+    elements = [line for script in batches for line in script.splitlines()]
+    assert sorted(elements) == sorted(
+        f"add element inet caqes quarantine_ip4 {{ 10.0.0.{i} }}" for i in range(1, 9))
+
+
+def test_nftables_sets_kernel_timeouts_and_lists_entries():
+    listing = {"nftables": [{"metainfo": {}}, {"set": {"elem": ["10.0.0.1", {"elem": {"val": "10.0.0.2", "timeout": 60}}]}}]}
+    nft = integration_factory.create("network", "nftables", manage_rules=False)
+    empty = json.dumps({"nftables": []})
+    nft._run = FakeCommand(outputs={
+        ("-j", "list", "set", "inet", "caqes", "quarantine_ip4"): json.dumps(listing),
+        ("-j", "list", "set", "inet", "caqes", "quarantine_ip6"): empty,
+        ("-j", "list", "set", "inet", "caqes", "quarantine_mac"): empty,
+    })
+
+    expire_at = (datetime.now(timezone.utc) + timedelta(seconds=120)).isoformat()
+    assert nft.ban("fd00::1", "test", expire_at=expire_at)
+
+    setup, ban = nft._run.scripts()
+    assert "chain" not in setup
+    assert ban.startswith("add element inet caqes quarantine_ip6 { fd00::1 timeout 11")
+    assert nft.list_banned() == {("10.0.0.1", "ip"), ("10.0.0.2", "ip")}
+    assert nft.is_banned("10.0.0.2", "ip")
+
+
+def test_nftables_unban_of_missing_element_succeeds():
+    nft = integration_factory.create("network", "nftables")
+    missing = RuntimeError("nft delete element failed: Error: Could not process rule: No such file or directory")
+    nft._run = FakeCommand(outputs={("delete", "element", "inet", "caqes", "quarantine_ip4", "{ 10.0.0.1 }"): missing})
+
+    assert nft.unban("10.0.0.1", "ip")
+    assert not nft.unban("10.0.0.1", "peerhost")
+
+
+def test_ipset_bans_by_mac_with_restore():
+    ipset = integration_factory.create("network", "ipset")
+    ipset._run = FakeCommand(outputs={("save", "caqes_mac"): "create caqes_mac hash:mac timeout 0\nadd caqes_mac aa:bb:cc:dd:ee:ff timeout 0\n"})
+    ipset._neighbour_mac = lambda ip: "aa:bb:cc:dd:ee:ff"
+
+    assert ipset.ban("192.168.1.20", "test", action="mac")
+
+    setup, ban = ipset._run.scripts()
+    assert "create caqes_ip6 hash:ip family inet6 timeout 0" in setup
+    assert ban == "add caqes_mac aa:bb:cc:dd:ee:ff timeout 0\n"
+    assert all(args[:2] == ["-exist", "restore"] for args, input in ipset._run.calls if input)
+    assert ipset.ban_target("192.168.1.20") == ("aa:bb:cc:dd:ee:ff", "mac")
+    assert ipset.list_banned() == {("aa:bb:cc:dd:ee:ff", "mac")}
+
+    assert ipset.unban("aa:bb:cc:dd:ee:ff", "mac")
+    assert ipset._run.calls[-1][0] == ["-exist", "del", "caqes_mac", "aa:bb:cc:dd:ee:ff"]
+    assert ipset.ban_target("192.168.1.20") == ("192.168.1.20", "ip")
+
+
+def test_failed_commit_fails_the_ban():
+    ipset = integration_factory.create("network", "ipset")
+    ipset._run = FakeCommand(outputs={("-exist", "restore"): RuntimeError("ipset restore failed")})
+
+    with pytest.raises(RuntimeError):
+        ipset.ban("10.0.0.1", "test")
+    assert not ipset.health_check()
+
+
+def test_ipset_mac_entries_match_in_any_case():
+    ipset = integration_factory.create("network", "ipset")
+    ipset._run = FakeCommand(outputs={("save", "caqes_mac"): "add caqes_mac AA:BB:CC:DD:EE:FF timeout 0\n"})
+
+    assert ipset.is_banned("aa:bb:cc:dd:ee:ff", "mac")
+    assert ipset.is_banned("AA:BB:CC:DD:EE:FF", "mac")
+    assert ipset.list_banned() == {("aa:bb:cc:dd:ee:ff", "mac")}
+
+
+def test_only_the_latest_ban_targets_are_tracked():
+    ipset = integration_factory.create("network", "ipset", max_tracked_bans=2)
+    ipset._run = FakeCommand()
+    ipset._neighbour_mac = lambda ip: f"aa:bb:cc:dd:ee:0{ip[-1]}"
+
+    for host in range(1, 4):
+        assert ipset.ban(f"10.0.0.{host}", "test", action="mac")
+
+    assert ipset.ban_target("10.0.0.1") == ("10.0.0.1", "ip")
+    assert ipset.ban_target("10.0.0.3") == ("aa:bb:cc:dd:ee:03", "mac")
+    assert len(ipset._banned_content) == 2
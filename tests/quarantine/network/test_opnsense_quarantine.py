@@ -1,11 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 from pytest_httpserver import HTTPServer
-from quarantine.integrations.network.opnsense import OPNSenseIntegration
+from caqes_core.quarantine.integrations.network.opnsense import OPNSenseIntegration
 
 @pytest.fixture
 def opnsense_module(httpserver: HTTPServer) -> OPNSenseIntegration:
     settings = {
-        'base_url': httpserver.url_for("/api"),
+        'base_url': httpserver.url_for("/"),
         'api_key': "test_key",
         'api_secret': "test_secret",
     }
@@ -53,4 +54,29 @@ def test_ban_by_mac_success(mock_opnsense_server, opnsense_module):
 
 def test_ban_by_ip_fallback(mock_opnsense_server, opnsense_module):
     """Test falling back to IP ban when MAC retrieval fails."""
-    pass
\ No newline at end of file
+    pass
+
+def test_ban_targets_are_bounded_and_safe_across_threads(mock_opnsense_server, opnsense_module):
+    """Concurrent bans and unbans keep only the latest ban targets."""
+    arp = [{"ip": f"10.0.0.{host}", "mac": f"AA:BB:CC:DD:EE:{host:02X}"} for host in range(1, 41)]
+    mock_opnsense_server.expect_request("/api/diagnostics/interface/getArp").respond_with_json({"rows": arp})
+    mock_opnsense_server.expect_request("/api/firewall/alias/getAliasUUID/").respond_with_json({"uuid": "1"})
+    mock_opnsense_server.expect_request("/api/firewall/alias/set", method="POST").respond_with_json({})
+    mock_opnsense_server.expect_request("/api/firewall/filter/apply", method="POST").respond_with_json({})
+    mock_opnsense_server.expect_request(
+        "/api/firewall/alias_util/delete/quarantine_iot", method="POST").respond_with_json({})
+    opnsense_module.max_tracked_bans = 5
+
+    def ban_then_unban(host: int) -> bool:
+        ip = f"10.0.0.{host}"
+        if not opnsense_module.ban(ip, "test"):
+            return False
+        return host % 2 == 0 or opnsense_module.unban(f"AA:BB:CC:DD:EE:{host:02X}", "mac")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert all(pool.map(ban_then_unban, range(1, 41)))
+
+    assert len(opnsense_module._banned_content) <= 5
+    assert all(int(ip.rsplit(".", 1)[1]) % 2 == 0 for ip in opnsense_module._banned_content)
+    banned = next(iter(opnsense_module._banned_content))
+    assert opnsense_module.ban_target(banned) == (opnsense_module._banned_content[banned].lower(), "mac")
@@ -0,0 +1,95 @@
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+from caqes_core.quarantine.integrations.protocol.emqx import EMQXIntegration
+
+CLIENTS = [
+    {"clientid": "sensor-1", "ip_address": "10.0.0.5", "connected": True},
+    {"clientid": "sensor-2", "ip_address": "10.0.0.5", "connected": True},
+    {"clientid": "camera-1", "ip_address": "10.0.0.6", "connected": True},
+]
+
+
+@pytest.fixture
+def emqx(httpserver: HTTPServer):
+    clients = list(CLIENTS)
+
+    def list_clients(request: Request) -> Response:
+        data = [c for c in clients if request.args.get("ip_address") in (None, c["ip_address"])]
+        return Response(json.dumps({"data": data, "meta": {"hasnext": False}}), mimetype="application/json")
+
+    httpserver.expect_request("/api/v5/clients", method="GET").respond_with_handler(list_clients)
+    httpserver.expect_request("/api/v5/banned", method="POST").respond_with_json({})
+    httpserver.expect_request("/api/v5/clients/sensor-1", method="DELETE").respond_with_data(status=204)
+    httpserver.expect_request("/api/v5/clients/sensor-2", method="DELETE").respond_with_data(status=204)
+    integration = EMQXIntegration(base_url=httpserver.url_for("/api/v5"), api_key="key", api_secret="secret")
+    return integration, clients
+
+
+def requests_to(httpserver: HTTPServer, path: str, method: str = "GET") -> list:
+    return [request for request, _ in httpserver.log if request.path == path and request.method == method]
+
+
+def test_clientid_ban_bans_and_kicks_every_client_of_the_ip(httpserver, emqx):
+    integration, _ = emqx
+
+    assert integration.ban("10.0.0.5", "test", action="clientid")
+
+    banned = [request.json for request in requests_to(httpserver, "/api/v5/banned", "POST")]
+    assert [(b["as"], b["who"]) for b in banned] == [("clientid", "sensor-1"), ("clientid", "sensor-2")]
+    assert len(requests_to(httpserver, "/api/v5/clients/sensor-1", "DELETE")) == 1
+    assert len(requests_to(httpserver, "/api/v5/clients/sensor-2", "DELETE")) == 1
+    assert integration.ban_targets("10.0.0.5") == [("sensor-1", "clientid"), ("sensor-2", "clientid")]
+    assert integration.ban_target("10.0.0.5") == ("sensor-1", "clientid")
+
+
+def test_snapshot_is_shared_between_lookups(httpserver, emqx):
+    integration, _ = emqx
+
+    assert integration.client_ids("10.0.0.5") == ["sensor-1", "sensor-2"]
+    assert integration.get_client_info("10.0.0.6")["clientid"] == "camera-1"
+    assert len(requests_to(httpserver, "/api/v5/clients")) == 1
+
+
+def test_new_clients_are_fetched_incrementally(httpserver, emqx):
+    integration, clients = emqx
+    integration.client_cache_ttl = 0
+    integration.client_ids("10.0.0.5")
+
+    clients.append({"clientid": "plug-1", "ip_address": "10.0.0.7", "connected": True})
+    assert integration.client_ids("10.0.0.7") == ["plug-1"]
+
+    refresh = requests_to(httpserver, "/api/v5/clients")[1]
+    assert "gte_connected_at" in refresh.args
+    assert integration.client_ids("10.0.0.5") == ["sensor-1", "sensor-2"]
+
+
+def test_unknown_ip_falls_back_to_peerhost(httpserver, emqx):
+    integration, _ = emqx
+
+    assert integration.ban("10.0.0.9", "test", action="clientid")
+
+    banned = requests_to(httpserver, "/api/v5/banned", "POST")
+    assert [(b.json["as"], b.json["who"]) for b in banned] == [("peerhost", "10.0.0.9")]
+    # The snapshot missed the IP, so it was looked up on its own
+    assert requests_to(httpserver, "/api/v5/clients")[-1].args["ip_address"] == "10.0.0.9"
+    assert integration.ban_targets("10.0.0.9") == [("10.0.0.9", "peerhost")]
+
+
+def test_ban_targets_are_bounded_and_safe_across_threads(httpserver, emqx):
+    integration, _ = emqx
+    integration.max_tracked_bans = 5
+    httpserver.expect_request(re.compile("/api/v5/banned/peerhost/.*"), method="DELETE").respond_with_data(status=204)
+
+    def ban_then_unban(host: int) -> bool:
+        ip = f"10.0.1.{host}"
+        return integration.ban(ip, "test") and (host % 2 == 0 or integration.unban(ip, "peerhost"))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert all(pool.map(ban_then_unban, range(1, 41)))
+
+    assert len(integration._banned_as) <= 5
+    assert all(int(ip.rsplit(".", 1)[1]) % 2 == 0 for ip in integration._banned_as)
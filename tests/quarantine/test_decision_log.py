@@ -0,0 +1,78 @@
+import json
+import pytest
+from caqes_core.loggers.decision_logger import DecisionLogger
+from caqes_core.models import Alert
+from caqes_core.quarantine.quarantine_orchestrator import QuarantineOrchestrator
+from caqes_core.settings import OrchestratorSettings
+
+
+def make_alert(ip: str = "10.0.0.1", port: int = 22) -> Alert:
+    return Alert(source_ip=ip, source_port=40000, destination_ip="192.168.1.10", destination_port=port,
+                 priority="1", timestamp="2025-01-01T00:00:00", classification="Misc activity", raw="raw")
+
+
+def read(path) -> list:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_decisions_are_buffered_until_flush(tmp_path):
+    path = tmp_path / "decisions.jsonl"
+    decisions = DecisionLogger(str(path), buffer_size=3)
+
+    decisions.log("ban", source_ip="10.0.0.1")
+    decisions.log("ban", source_ip="10.0.0.2")
+    assert not path.exists() or path.read_text() == ""
+    decisions.log("ban", source_ip="10.0.0.3")
+    assert [d["source_ip"] for d in read(path)] == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+
+    decisions.log("ban", source_ip="10.0.0.4")
+    decisions.close()
+    assert decisions.written == 4
+
+
+@pytest.mark.asyncio
+async def test_dry_run_logs_without_calling_integrations(tmp_path):
+    path = tmp_path / "decisions.jsonl"
+    orchestrator = QuarantineOrchestrator(OrchestratorSettings(config_dict={
+        "dry_run": True,
+        "protocol": [{"type": "dryrun"}],
+        "decision_log": {"path": str(path)},
+        "policies": [
+            {"name": "ssh", "description": "", "rules": ["destination_port == 22"]},
+            {"name": "any", "description": "", "rules": ["true"]},
+        ],
+    }))
+    await orchestrator.start()
+
+    await orchestrator.quarantine(make_alert())
+    await orchestrator.quarantine(make_alert())
+    await orchestrator.stop()
+
+    assert orchestrator.lanes == {}
+    assert orchestrator.protocols[0].banned == set()
+    decisions = read(path)
+    assert [d["decision"] for d in decisions] == ["would_ban", "already_banned"]
+    assert decisions[0]["matched"] == ["ssh", "any"]
+    assert decisions[0]["dry_run"] is True
+
+
+@pytest.mark.asyncio
+async def test_shadow_policies_are_compared(tmp_path):
+    path = tmp_path / "decisions.jsonl"
+    orchestrator = QuarantineOrchestrator(OrchestratorSettings(config_dict={
+        "dry_run": True,
+        "decision_log": {"path": str(path)},
+        "policies": [{"name": "ssh", "description": "", "rules": ["destination_port == 22"]}],
+        "shadow_policies": [{"name": "web", "description": "", "rules": ["destination_port in [22, 443]"]}],
+    }))
+    await orchestrator.start()
+
+    await orchestrator.quarantine(make_alert("10.0.0.1", 22))
+    await orchestrator.quarantine(make_alert("10.0.0.2", 443))
+    await orchestrator.quarantine(make_alert("10.0.0.3", 80))
+    await orchestrator.stop()
+
+    assert orchestrator.shadow_stats == {"both_ban": 1, "shadow_only": 1, "both_pass": 1}
+    shadow = [d for d in read(path) if d["decision"] == "shadow"]
+    assert shadow == [{**shadow[0], "outcome": "shadow_only", "source_ip": "10.0.0.2",
+                       "policy": None, "shadow_policy": "web"}]
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+import pytest
+from typing import Optional, Set, Tuple
+from caqes_core.quarantine import ProtocolIntegration
+from caqes_core.quarantine.dispatch import BanJob, CircuitBreaker, IntegrationLane
+from caqes_core.settings.dispatch_settings import DispatchSettings
+
+
+class FakeIntegration(ProtocolIntegration):
+    name = "fake"
+
+    def __init__(self, delays=(0.0,), results=(True,)):
+        self.delays = list(delays)
+        self.results = list(results)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def ban(self, ip_address: str, reason: str, expire_at: Optional[str] = None) -> bool:
+        with self.lock:
+            index = min(self.calls, len(self.delays) - 1)
+            result = self.results[min(self.calls, len(self.results) - 1)]
+            self.calls += 1
+        time.sleep(self.delays[index])
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def unban(self, identifier: str, identifier_type: str) -> bool:
+        return True
+
+    def is_banned(self, identifier: str, identifier_type: str) -> bool:
+        return False
+
+    def list_banned(self) -> Set[Tuple[str, str]]:
+        return set()
+
+
+def lane_for(integration, **settings) -> IntegrationLane:
+    return IntegrationLane(integration, DispatchSettings(retry_backoff=0, **settings))
+
+
+@pytest.mark.asyncio
+async def test_ban_succeeds():
+    lane = lane_for(FakeIntegration())
+
+    assert await lane.submit(BanJob("10.0.0.1", "test")) is True
+    assert lane.status()["succeeded"] == 1
+    await lane.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_attempts_are_retried():
+    integration = FakeIntegration(results=[RuntimeError("boom"), False, True])
+    lane = lane_for(integration, max_attempts=3)
+
+    assert await lane.submit(BanJob("10.0.0.1", "test")) is True
+    assert integration.calls == 3
+    await lane.stop()
+
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_slow_integration():
+    lane = lane_for(FakeIntegration(delays=[1.0]), deadline=0.1)
+
+    started = time.monotonic()
+    assert await lane.submit(BanJob("10.0.0.1", "test")) is False
+    assert time.monotonic() - started < 0.5
+    assert lane.status()["timeouts"] == 1
+    await lane.stop()
+
+
+@pytest.mark.asyncio
+async def test_hedged_call_wins_over_slow_call():
+    integration = FakeIntegration(delays=[1.0, 0.0])
+    lane = lane_for(integration, hedge_after=0.05, deadline=0.5)
+
+    assert await lane.submit(BanJob("10.0.0.1", "test")) is True
+    assert lane.status()["hedged"] == 1
+    await lane.stop()
+
+
+@pytest.mark.asyncio
+async def test_lanes_are_isolated():
+    slow = lane_for(FakeIntegration(delays=[0.5]))
+    fast = lane_for(FakeIntegration())
+
+    slow_ban = slow.submit(BanJob("10.0.0.1", "test"))
+    started = time.monotonic()
+    assert await fast.submit(BanJob("10.0.0.1", "test")) is True
+    assert time.monotonic() - started < 0.2
+    assert not slow_ban.done()
+
+    await slow_ban
+    await asyncio.gather(slow.stop(), fast.stop())
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    now = [0.0]
+    breaker = CircuitBreaker(threshold=2, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    now[0] = 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # Only one trial call at a time
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_lets_the_next_one_through():
+    now = [0.0]
+    lane = lane_for(FakeIntegration(delays=[0.5]))
+    lane.breaker = CircuitBreaker(threshold=1, reset_timeout=10, clock=lambda: now[0])
+    lane.breaker.record_failure()
+    now[0] = 10
+
+    lane.submit(BanJob("10.0.0.1", "test"))
+    while not lane.breaker._trial_in_flight:
+        await asyncio.sleep(0.01)
+    await lane.stop()
+
+    assert lane.breaker.state == CircuitBreaker.HALF_OPEN
+    assert lane.breaker.allow()
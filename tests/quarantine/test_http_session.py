@@ -0,0 +1,59 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from caqes_core.quarantine.http_session import PooledSession
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Status codes answered in turn, 200 once exhausted
+    statuses = []
+
+    def _answer(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        status = self.statuses.pop(0) if self.statuses else 200
+        self.server.requests.append((self.command, status))
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    do_GET = do_POST = _answer
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    Handler.statuses = []
+
+
+def test_connections_are_reused(server):
+    _, url = server
+    session = PooledSession()
+
+    for _ in range(3):
+        assert session.get(f"{url}/banned").status_code == 200
+    session.post(f"{url}/banned", json={})
+
+    assert session.pool_stats() == {"pools": 1, "connections_opened": 1, "requests": 4, "idle_connections": 1}
+
+
+def test_only_idempotent_requests_are_retried(server):
+    httpd, url = server
+    session = PooledSession(retries=2, retry_backoff=0)
+
+    Handler.statuses = [503, 503]
+    assert session.get(f"{url}/banned").status_code == 200
+    Handler.statuses = [503]
+    assert session.post(f"{url}/banned", json={}).status_code == 503
+
+    assert [status for _, status in httpd.requests] == [503, 503, 200, 503]
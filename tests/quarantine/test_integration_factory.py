@@ -0,0 +1,59 @@
+import importlib
+import subprocess
+import sys
+import pytest
+from importlib.metadata import EntryPoint
+from caqes_core.quarantine import ProtocolIntegration, integration_factory
+from caqes_core.quarantine.integration_factory import IntegrationFactory
+
+
+class PluginIntegration(ProtocolIntegration):
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def ban(self, ip_address, reason, expire_at=None):
+        return True
+
+    def unban(self, identifier, identifier_type):
+        return True
+
+    def is_banned(self, identifier, identifier_type):
+        return False
+
+    def list_banned(self):
+        return set()
+
+
+def test_importing_quarantine_does_not_import_integrations():
+    code = (
+        "import sys, caqes_core.quarantine\n"
+        "assert 'caqes_core.quarantine.integrations.protocol.emqx' not in sys.modules\n"
+        "assert 'requests' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, env={"PYTHONPATH": "src"})
+
+
+def test_create_imports_builtin_on_demand():
+    integration = integration_factory.create("protocol", "emqx", base_url="http://localhost", api_key="", api_secret="")
+
+    assert integration.name == "emqx"
+    assert "emqx" in integration_factory.available("protocol")
+
+
+def test_create_loads_entry_point(monkeypatch):
+    entry_point = EntryPoint(name="protocol.plugin", value=f"{__name__}:PluginIntegration",
+                             group="caqes.integrations")
+    module = importlib.import_module("caqes_core.quarantine.integration_factory")
+    monkeypatch.setattr(module, "entry_points", lambda group: [entry_point])
+    factory = IntegrationFactory()
+
+    assert "plugin" in factory.available("protocol")
+    integration = factory.create("protocol", "plugin", option=1)
+    assert isinstance(integration, PluginIntegration)
+    assert integration.name == "plugin"
+    assert integration.kwargs == {"option": 1}
+
+
+def test_unknown_integration():
+    with pytest.raises(ValueError):
+        integration_factory.create("network", "missing")
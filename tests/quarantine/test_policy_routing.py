@@ -0,0 +1,127 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Set, Tuple
+from caqes_core.models import Alert
+from caqes_core.quarantine import NetworkIntegration, ProtocolIntegration
+from caqes_core.quarantine.quarantine_orchestrator import QuarantineOrchestrator
+from caqes_core.settings import OrchestratorSettings
+
+
+class FakeBroker(ProtocolIntegration):
+    name = "broker"
+    actions = ("peerhost", "clientid")
+
+    def __init__(self):
+        self.bans: List[Tuple[str, Optional[str], Optional[str]]] = []
+        self.unbans: List[Tuple[str, str]] = []
+
+    def ban(self, ip_address: str, reason: str, expire_at: Optional[str] = None, action: Optional[str] = None) -> bool:
+        self.bans.append((ip_address, action, expire_at))
+        return True
+
+    def unban(self, identifier: str, identifier_type: str) -> bool:
+        self.unbans.append((identifier, identifier_type))
+        return True
+
+    def is_banned(self, identifier: str, identifier_type: str) -> bool:
+        return False
+
+    def list_banned(self) -> Set[Tuple[str, str]]:
+        return set()
+
+
+class FakeFirewall(NetworkIntegration):
+    name = "firewall"
+
+    def __init__(self):
+        self.bans: List[Tuple[str, Optional[str]]] = []
+        self.unbans: List[Tuple[str, str]] = []
+
+    def ban(self, ip_address: str, reason: str, expire_at: Optional[str] = None, action: Optional[str] = None) -> bool:
+        self.bans.append((ip_address, action))
+        return True
+
+    def unban(self, identifier: str, identifier_type: str) -> bool:
+        self.unbans.append((identifier, identifier_type))
+        return True
+
+    def is_banned(self, identifier: str, identifier_type: str) -> bool:
+        return False
+
+    def list_banned(self) -> Set[Tuple[str, str]]:
+        return set()
+
+
+def make_alert(ip: str, port: int) -> Alert:
+    return Alert(source_ip=ip, source_port=40000, destination_ip="192.168.1.10", destination_port=port,
+                 priority="1", timestamp="2025-01-01T00:00:00", classification="Misc activity", raw="raw")
+
+
+@pytest.fixture
+def integrations(monkeypatch):
+    broker, firewall = FakeBroker(), FakeFirewall()
+    monkeypatch.setattr(OrchestratorSettings, "protocols", property(lambda self: [broker]))
+    monkeypatch.setattr(OrchestratorSettings, "networks", property(lambda self: [firewall]))
+    return broker, firewall
+
+
+def orchestrator_for(policies) -> QuarantineOrchestrator:
+    return QuarantineOrchestrator(OrchestratorSettings(config_dict={
+        "reconciliation": {"enabled": False},
+        "policies": policies,
+    }))
+
+
+@pytest.mark.asyncio
+async def test_bans_go_only_to_routed_integrations(integrations):
+    broker, firewall = integrations
+    orchestrator = orchestrator_for([
+        {"name": "mqtt", "description": "", "rules": ["destination_port == 1883"], "ban_duration": 600,
+         "actions": [{"integration": "broker", "action": "clientid", "ban_duration": 60}]},
+        {"name": "any", "description": "", "rules": ["true"]},
+    ])
+    await orchestrator.start()
+
+    await orchestrator.quarantine(make_alert("10.0.0.1", 1883))
+    await orchestrator.quarantine(make_alert("10.0.0.2", 22))
+    assert await orchestrator.drain(timeout=5)
+    await orchestrator.stop()
+
+    assert [(ip, action) for ip, action, _ in broker.bans] == [("10.0.0.1", "clientid"), ("10.0.0.2", None)]
+    assert firewall.bans == [("10.0.0.2", None)]
+    record = orchestrator.store.get("10.0.0.1")
+    assert set(record.targets) == {"broker"}
+    assert record.expire_at == record.banned_at + timedelta(seconds=60)
+    assert broker.bans[0][2] == record.expire_at.isoformat()
+
+
+@pytest.mark.asyncio
+async def test_routed_bans_expire_separately(integrations):
+    broker, firewall = integrations
+    orchestrator = orchestrator_for([
+        {"name": "any", "description": "", "rules": ["true"], "ban_duration": 3600,
+         "actions": [{"integration": "broker", "ban_duration": 1}, {"integration": "firewall", "action": "ip"}]},
+    ])
+    await orchestrator.start()
+    await orchestrator.quarantine(make_alert("10.0.0.1", 22))
+    assert await orchestrator.drain(timeout=5)
+
+    record = orchestrator.store.get("10.0.0.1")
+    for route in record.routes.values():
+        route.expire_at -= timedelta(seconds=1)
+    assert await orchestrator._lift_bans([record]) == []
+    await orchestrator.stop()
+
+    assert broker.unbans == [("10.0.0.1", "peerhost")]
+    assert firewall.unbans == []
+    remaining = orchestrator.store.get("10.0.0.1")
+    assert set(remaining.targets) == set(remaining.routes) == {"firewall"}
+    assert remaining.next_expiry() > datetime.now(timezone.utc) + timedelta(seconds=3000)
+
+
+def test_actions_are_validated_at_startup(integrations):
+    with pytest.raises(ValueError, match="unknown integration"):
+        orchestrator_for([{"name": "p", "description": "", "rules": ["true"], "actions": [{"integration": "nope"}]}])
+    with pytest.raises(ValueError, match="supported actions are ip"):
+        orchestrator_for([{"name": "p", "description": "", "rules": ["true"],
+                           "actions": [{"integration": "firewall", "action": "clientid"}]}])
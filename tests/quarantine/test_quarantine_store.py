@@ -0,0 +1,117 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from typing import List
+from caqes_core.models import BanTarget, QuarantineRecord
+from caqes_core.quarantine.quarantine_store import QuarantineStore
+from caqes_core.quarantine.unban_scheduler import UnbanScheduler
+
+
+def make_record(ip="192.168.1.50", mac=None, expires_in=None) -> QuarantineRecord:
+    record = QuarantineRecord(ip=ip, mac=mac, reason="test",
+                              targets={"emqx": BanTarget(identifier=ip, identifier_type="peerhost")})
+    if expires_in is not None:
+        record.expire_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
+    return record
+
+
+def test_lookup_by_ip_and_mac():
+    store = QuarantineStore()
+    store.add(make_record(mac="AA:BB:CC:DD:EE:FF"))
+
+    assert store.is_banned("192.168.1.50")
+    assert store.is_banned("aa:bb:cc:dd:ee:ff")
+    assert not store.is_banned("192.168.1.51")
+
+
+def test_expired_record_is_not_banned():
+    store = QuarantineStore()
+    store.add(make_record(expires_in=-1))
+
+    assert not store.is_banned("192.168.1.50")
+    assert [r.ip for r in store.expired()] == ["192.168.1.50"]
+
+
+def test_state_survives_restart(tmp_path):
+    path = str(tmp_path / "state" / "quarantine.db")
+    store = QuarantineStore(path)
+    store.load()
+    store.add(make_record(ip="10.0.0.1", mac="aa:bb:cc:dd:ee:01", expires_in=60))
+    store.add(make_record(ip="10.0.0.2"))
+    store.remove("10.0.0.2")
+    store.close()
+
+    restarted = QuarantineStore(path)
+    records = restarted.load()
+
+    assert [r.ip for r in records] == ["10.0.0.1"]
+    assert restarted.get("aa:bb:cc:dd:ee:01").targets["emqx"].identifier == "10.0.0.1"
+
+
+@pytest.mark.asyncio
+async def test_changes_are_written_behind_in_one_batch(tmp_path, monkeypatch):
+    path = str(tmp_path / "quarantine.db")
+    store = QuarantineStore(path)
+    store.load()
+    batches: List[List[str]] = []
+    write = store._write
+    monkeypatch.setattr(store, "_write", lambda pending: batches.append(sorted(pending)) or write(pending))
+
+    # Made on the event loop, nothing is written until it yields
+    for host in range(1, 4):
+        store.add(make_record(ip=f"10.0.0.{host}"))
+    store.remove("10.0.0.3")
+    assert batches == []
+    await store.flushed()
+
+    assert batches == [["10.0.0.1", "10.0.0.2", "10.0.0.3"]]
+    store.close()
+    assert sorted(r.ip for r in QuarantineStore(path).load()) == ["10.0.0.1", "10.0.0.2"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_lifts_due_bans_in_one_batch():
+    store = QuarantineStore()
+    batches: List[List[str]] = []
+
+    async def unban(records):
+        batches.append(sorted(r.ip for r in records))
+        for record in records:
+            store.remove(record.ip)
+        return []
+
+    scheduler = UnbanScheduler(store, unban, batch_window=0.05)
+    for ip, expires_in in [("10.0.0.1", 0.01), ("10.0.0.2", 0.02), ("10.0.0.3", 60)]:
+        record = make_record(ip=ip, expires_in=expires_in)
+        store.add(record)
+        scheduler.schedule(record)
+
+    scheduler.start()
+    await asyncio.sleep(0.2)
+    await scheduler.stop()
+
+    assert batches == [["10.0.0.1", "10.0.0.2"]]
+    assert store.is_banned("10.0.0.3")
+
+
+@pytest.mark.asyncio
+async def test_scheduler_skips_superseded_entries():
+    store = QuarantineStore()
+    lifted = []
+
+    async def unban(records):
+        lifted.extend(records)
+        return []
+
+    scheduler = UnbanScheduler(store, unban, batch_window=0)
+    record = make_record(expires_in=0.01)
+    store.add(record)
+    scheduler.schedule(record)
+    # Re-ban with a later expiry before the first one is due
+    store.add(make_record(expires_in=60))
+
+    scheduler.start()
+    await asyncio.sleep(0.1)
+    await scheduler.stop()
+
+    assert lifted == []
@@ -0,0 +1,136 @@
+import asyncio
+import time
+import pytest
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Set, Tuple
+from caqes_core.models import BanTarget, QuarantineRecord
+from caqes_core.quarantine import ProtocolIntegration
+from caqes_core.quarantine.quarantine_store import QuarantineStore
+from caqes_core.quarantine.reconciler import Reconciler
+
+
+class FakeIntegration(ProtocolIntegration):
+    name = "fake"
+
+    def __init__(self, remote: Set[Tuple[str, str]]):
+        self.remote = set(remote)
+        self.list_calls = 0
+        self.bans = []
+        self.unbans = []
+
+    def ban(self, ip_address: str, reason: str, expire_at: Optional[str] = None) -> bool:
+        self.bans.append(ip_address)
+        self.remote.add((ip_address, "peerhost"))
+        return True
+
+    def unban(self, identifier: str, identifier_type: str) -> bool:
+        self.unbans.append(identifier)
+        self.remote.discard((identifier, identifier_type))
+        return True
+
+    def is_banned(self, identifier: str, identifier_type: str) -> bool:
+        return (identifier, identifier_type) in self.remote
+
+    def list_banned(self) -> Set[Tuple[str, str]]:
+        self.list_calls += 1
+        return set(self.remote)
+
+
+def add_record(store: QuarantineStore, ip: str, targeted: bool = True, expired: bool = False) -> None:
+    record = QuarantineRecord(ip=ip, reason="test")
+    if targeted:
+        record.targets["fake"] = BanTarget(identifier=ip, identifier_type="peerhost")
+    if expired:
+        record.expire_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    store.add(record)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_applies_only_the_delta(tmp_path):
+    store = QuarantineStore(path=str(tmp_path / "quarantine.db"))
+    store.load()
+    add_record(store, "10.0.0.1")                  # in sync
+    add_record(store, "10.0.0.2")                  # missing remotely
+    add_record(store, "10.0.0.3", targeted=False)  # ban never succeeded
+    add_record(store, "10.0.0.4", expired=True)    # left to the scheduler
+    integration = FakeIntegration({("10.0.0.1", "peerhost"), ("10.0.0.9", "peerhost")})
+    reconciler = Reconciler(store, lambda: [integration], prune_unknown=True)
+
+    [report] = await reconciler.reconcile()
+
+    assert sorted(report.rebanned) == ["10.0.0.2", "10.0.0.3"]
+    assert report.pruned == [("10.0.0.9", "peerhost")]
+    assert sorted(integration.bans) == ["10.0.0.2", "10.0.0.3"]
+    assert store.get("10.0.0.3").targets["fake"].identifier == "10.0.0.3"
+
+
+@pytest.mark.asyncio
+async def test_reconcile_in_steady_state_only_lists():
+    store = QuarantineStore()
+    add_record(store, "10.0.0.1")
+    integration = FakeIntegration({("10.0.0.1", "peerhost")})
+    reconciler = Reconciler(store, lambda: [integration])
+
+    await reconciler.reconcile()
+
+    assert integration.list_calls == 1
+    assert integration.bans == [] and integration.unbans == []
+
+
+@pytest.mark.asyncio
+async def test_reconcile_keeps_unknown_entries_without_prune():
+    store = QuarantineStore()
+    integration = FakeIntegration({("10.0.0.9", "peerhost")})
+    reconciler = Reconciler(store, lambda: [integration], prune_unknown=False)
+
+    [report] = await reconciler.reconcile()
+
+    assert report.pruned == []
+    assert integration.unbans == []
+
+
+@pytest.mark.asyncio
+async def test_reconcile_never_prunes_without_persisted_state():
+    # After a restart an in-memory store is empty, every remote ban would look unknown
+    store = QuarantineStore()
+    integration = FakeIntegration({("10.0.0.9", "peerhost")})
+    reconciler = Reconciler(store, lambda: [integration], prune_unknown=True)
+
+    [report] = await reconciler.reconcile()
+
+    assert report.pruned == []
+    assert integration.unbans == []
+
+
+@pytest.mark.asyncio
+async def test_reconcile_leaves_bans_in_flight_alone(tmp_path):
+    store = QuarantineStore(path=str(tmp_path / "quarantine.db"))
+    store.load()
+    # Landed on one integration and still dispatching to this one
+    add_record(store, "10.0.0.1", targeted=False)
+    # Landed here, not recorded yet
+    integration = FakeIntegration({("10.0.0.2", "peerhost")})
+    reconciler = Reconciler(store, lambda: [integration], prune_unknown=True,
+                            in_flight=lambda: {"10.0.0.1", "10.0.0.2"})
+
+    [report] = await reconciler.reconcile()
+
+    assert report.rebanned == [] and report.pruned == []
+    assert integration.bans == [] and integration.unbans == []
+
+
+@pytest.mark.asyncio
+async def test_leadership_check_does_not_block_the_loop():
+    def slow_lease() -> bool:
+        time.sleep(0.2)
+        return False
+
+    reconciler = Reconciler(QuarantineStore(), lambda: [FakeIntegration(set())], is_leader=slow_lease)
+    reconcile = asyncio.create_task(reconciler.reconcile())
+    ticks = 0
+    while not reconcile.done():
+        ticks += 1
+        await asyncio.sleep(0.01)
+
+    assert await reconcile == []
+    assert ticks > 5
@@ -0,0 +1,188 @@
+import asyncio
+import time
+import pytest
+from typing import List, Optional, Set, Tuple
+from caqes_core.models import Alert
+from caqes_core.quarantine import NetworkIntegration
+from caqes_core.quarantine.quarantine_orchestrator import QuarantineOrchestrator
+from caqes_core.scheduling import PriorityScheduler
+from caqes_core.settings import OrchestratorSettings
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_alert(priority: str, source_ip: str = "192.168.1.50") -> Alert:
+    return Alert(source_ip=source_ip, source_port=40000, destination_ip="192.168.1.10",
+                 destination_port=1883, priority=priority, raw="test")
+
+
+async def drain(scheduler: PriorityScheduler, count: int) -> List[str]:
+    return [(await scheduler.next()).priority for _ in range(count)]
+
+
+async def noop(alert: Alert) -> None:
+    pass
+
+
+@pytest.mark.asyncio
+async def test_weighted_fair_dequeue():
+    scheduler = PriorityScheduler(noop, weights=[3, 1], max_wait=60)
+    for _ in range(4):
+        scheduler.submit(make_alert("1"))
+        scheduler.submit(make_alert("2"))
+
+    order = await drain(scheduler, 4)
+
+    assert order.count("1") == 3 and order.count("2") == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_and_out_of_range_priorities_are_least_urgent():
+    scheduler = PriorityScheduler(noop, weights=[1, 1, 1])
+
+    assert scheduler.level(make_alert("high")) == 2
+    assert scheduler.level(make_alert("9")) == 2
+    assert scheduler.level(make_alert("0")) == 0
+
+
+@pytest.mark.asyncio
+async def test_starvation_protection_serves_overdue_alerts():
+    clock = FakeClock()
+    scheduler = PriorityScheduler(noop, weights=[100, 1], max_wait=5, clock=clock)
+    scheduler.submit(make_alert("2"))
+    clock.now = 10
+    for _ in range(5):
+        scheduler.submit(make_alert("1"))
+
+    assert (await scheduler.next()).priority == "2"
+
+
+@pytest.mark.asyncio
+async def test_overdue_backlog_gets_only_a_bounded_share():
+    clock = FakeClock()
+    scheduler = PriorityScheduler(noop, weights=[100, 1], max_wait=5, overdue_every=4, clock=clock)
+    for _ in range(100):
+        scheduler.submit(make_alert("2"))
+    # The whole backlog is overdue by the time urgent alerts arrive
+    clock.now = 10
+    for _ in range(8):
+        scheduler.submit(make_alert("1"))
+
+    served = await drain(scheduler, 8)
+    # Only one dequeue in four is handed to the overdue backlog, priority 1 keeps the rest
+    assert served == ["2", "1", "1", "1", "2", "1", "1", "1"]
+
+    clock.now = 20
+    for _ in range(8):
+        scheduler.submit(make_alert("1"))
+    assert (await drain(scheduler, 8)).count("1") == 6
+
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_less_urgent_alerts():
+    scheduler = PriorityScheduler(noop, weights=[1, 1], max_queue_size=2)
+    assert scheduler.submit(make_alert("2"))
+    assert scheduler.submit(make_alert("2"))
+
+    assert scheduler.submit(make_alert("1"))
+    assert not scheduler.submit(make_alert("2"))
+
+    assert len(scheduler) == 2
+    assert scheduler.dropped == 2
+    assert sorted(await drain(scheduler, 2)) == ["1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_consumers_hand_alerts_to_handler():
+    handled = []
+
+    async def handler(alert: Alert) -> None:
+        handled.append(alert.priority)
+
+    scheduler = PriorityScheduler(handler, concurrency=2)
+    scheduler.start()
+    scheduler.submit(make_alert("1"))
+    scheduler.submit(make_alert("3"))
+    await asyncio.sleep(0.01)
+    await scheduler.stop()
+
+    assert sorted(handled) == ["1", "3"]
+    assert len(scheduler) == 0
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_queued_and_running_alerts():
+    handled = []
+
+    async def handler(alert: Alert) -> None:
+        await asyncio.sleep(0.05)
+        handled.append(alert.priority)
+
+    scheduler = PriorityScheduler(handler, concurrency=1)
+    scheduler.start()
+    assert await scheduler.drain(timeout=0)
+    for priority in ("1", "2", "3"):
+        scheduler.submit(make_alert(priority))
+
+    assert not await scheduler.drain(timeout=0.01)
+    assert await scheduler.drain(timeout=1)
+    await scheduler.stop()
+
+    assert handled == ["1", "2", "3"]
+
+
+class SlowFirewall(NetworkIntegration):
+    name = "firewall"
+
+    def __init__(self):
+        self.bans: List[str] = []
+
+    def ban(self, ip_address: str, reason: str, expire_at: Optional[str] = None) -> bool:
+        time.sleep(0.01)
+        self.bans.append(ip_address)
+        return True
+
+    def unban(self, identifier: str, identifier_type: str) -> bool:
+        return True
+
+    def is_banned(self, identifier: str, identifier_type: str) -> bool:
+        return False
+
+    def list_banned(self) -> Set[Tuple[str, str]]:
+        return set()
+
+
+@pytest.mark.asyncio
+async def test_concurrency_covers_the_integration_calls(monkeypatch):
+    firewall = SlowFirewall()
+    monkeypatch.setattr(OrchestratorSettings, "protocols", property(lambda self: []))
+    monkeypatch.setattr(OrchestratorSettings, "networks", property(lambda self: [firewall]))
+    orchestrator = QuarantineOrchestrator(OrchestratorSettings(config_dict={
+        "reconciliation": {"enabled": False},
+        "policies": [{"name": "any", "description": "", "rules": ["true"]}],
+    }))
+    await orchestrator.start()
+    scheduler = PriorityScheduler(orchestrator.quarantine, concurrency=2, max_wait=60)
+    scheduler.start()
+
+    for host in range(40):
+        scheduler.submit(make_alert("4", f"10.0.4.{host}"))
+    await asyncio.sleep(0.05)
+    for host in range(2):
+        scheduler.submit(make_alert("1", f"10.0.1.{host}"))
+    in_flight = []
+    while len(firewall.bans) < 42:
+        in_flight.append(orchestrator.in_flight)
+        await asyncio.sleep(0.005)
+    await scheduler.stop()
+    await orchestrator.stop()
+
+    # No backlog builds up on the lane, so urgent alerts overtake the queued ones
+    assert max(in_flight) <= 2
+    assert {"10.0.1.0", "10.0.1.1"} <= set(firewall.bans[:12])
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import pytest
+from typing import List, Optional
+from caqes_core.mq import ClientType
+from caqes_core.mq.memory.memory_client import MemoryBroker, MemoryClient
+from caqes_core.scheduling import PriorityScheduler
+from caqes_core.settings import WorkerSettings
+from caqes_core.worker import Worker
+
+ALERT = {
+    "source_ip": "192.168.1.50",
+    "source_port": 51234,
+    "destination_ip": "192.168.1.10",
+    "destination_port": 1883,
+    "raw": "test",
+}
+
+EVE_ALERT = {
+    "event_type": "alert", "src_ip": "192.168.1.60", "src_port": 1, "dest_ip": "192.168.1.10", "dest_port": 22,
+    "alert": {"signature": "ssh brute force", "category": "Attempted Administrator Privilege Gain", "severity": 1},
+}
+
+
+class RecordingOrchestrator:
+    """Stands in for the orchestrator, recording the policy set each alert was judged by."""
+
+    def __init__(self, policies: List[str]):
+        self.policies = policies
+        self.calls = []
+        self.running = 0
+        self.peak = 0
+
+    def policy_set(self, names: List[str]) -> List[str]:
+        unknown = set(names) - set(self.policies)
+        if unknown:
+            raise ValueError(f"Unknown policies {sorted(unknown)}")
+        return [name for name in self.policies if name in names]
+
+    async def quarantine(self, alert, policies: Optional[List[str]] = None) -> None:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        self.calls.append((str(alert.source_ip), policies))
+
+
+async def run_worker(settings: WorkerSettings, orchestrator, broker: MemoryBroker,
+                     scheduler: Optional[PriorityScheduler] = None):
+    worker = Worker(settings, orchestrator, scheduler=scheduler)
+    worker.mq = MemoryClient(settings, broker)
+    task = asyncio.create_task(worker.run())
+    while not worker.running:
+        await asyncio.sleep(0.01)
+    return worker, task
+
+
+@pytest.mark.asyncio
+async def test_each_subscription_has_its_own_decoder_and_policies():
+    broker = MemoryBroker()
+    orchestrator = RecordingOrchestrator(["default", "critical"])
+    settings = WorkerSettings(client_type=ClientType.MEMORY, subscriptions=[
+        {"topic": "ids/suricata/#", "format": "suricata", "policies": ["critical"], "concurrency": 1},
+        {"topic": "sensors/+/alerts"},
+    ])
+    worker, task = await run_worker(settings, orchestrator, broker)
+
+    broker.publish("ids/suricata/eve", json.dumps(EVE_ALERT).encode())
+    broker.publish("sensors/plug-1/alerts", json.dumps(ALERT).encode())
+    while broker.pending() or any(pipeline.pending for pipeline in worker.pipelines):
+        await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert sorted(orchestrator.calls) == [("192.168.1.50", None), ("192.168.1.60", ["critical"])]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_budget_per_subscription():
+    broker = MemoryBroker()
+    orchestrator = RecordingOrchestrator(["default"])
+    settings = WorkerSettings(client_type=ClientType.MEMORY, subscriptions=[{"topic": "alerts", "concurrency": 2}])
+    worker, task = await run_worker(settings, orchestrator, broker)
+
+    for _ in range(6):
+        broker.publish("alerts", json.dumps(ALERT).encode())
+    while broker.pending() or worker.pipelines[0].pending:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert len(orchestrator.calls) == 6
+    assert orchestrator.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_overlapping_subscriptions_handle_a_message_once():
+    broker = MemoryBroker()
+    orchestrator = RecordingOrchestrator(["default", "critical"])
+    settings = WorkerSettings(client_type=ClientType.MEMORY, subscriptions=[
+        {"topic": "alerts/critical", "policies": ["critical"]},
+        {"topic": "alerts/#"},
+    ])
+    worker, task = await run_worker(settings, orchestrator, broker)
+
+    assert broker.publish("alerts/critical", json.dumps(ALERT).encode()) == 2
+    while broker.pending() or any(pipeline.pending for pipeline in worker.pipelines):
+        await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert orchestrator.calls == [("192.168.1.50", ["critical"])]
+
+
+@pytest.mark.asyncio
+async def test_policy_subscriptions_share_the_scheduler():
+    broker = MemoryBroker()
+    orchestrator = RecordingOrchestrator(["default", "critical"])
+    scheduler = PriorityScheduler(orchestrator.quarantine, concurrency=2)
+    scheduler.start()
+    settings = WorkerSettings(client_type=ClientType.MEMORY, subscriptions=[
+        {"topic": "alerts/critical", "policies": ["critical"]},
+        {"topic": "alerts/#"},
+    ])
+    worker, task = await run_worker(settings, orchestrator, broker, scheduler)
+
+    assert all(pipeline.scheduler is scheduler and not pipeline.owns_scheduler for pipeline in worker.pipelines)
+    for topic in ["alerts/critical", "alerts/other"] * 3:
+        broker.publish(topic, json.dumps(ALERT).encode())
+    while broker.pending() or any(pipeline.pending for pipeline in worker.pipelines):
+        await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await scheduler.stop()
+
+    # Each alert is judged by its own subscription's policies, within the one concurrency budget
+    assert sorted(policies or [] for _, policies in orchestrator.calls) == [[]] * 3 + [["critical"]] * 3
+    assert orchestrator.peak == 2
+
+
+def test_unknown_policy_rejected():
+    settings = WorkerSettings(subscriptions=[{"topic": "alerts", "policies": ["missing"]}])
+
+    with pytest.raises(ValueError, match="missing"):
+        settings.pipelines(RecordingOrchestrator(["default"]))